@@ -0,0 +1,180 @@
+"""
+AIMD controller for the number of checks in flight.
+
+A fixed concurrency is either too low for a good uplink or, once raised,
+so high that the machine runs out of sockets and the network queues up:
+connects time out and good proxies get reported dead. ``AdaptiveLimit``
+watches what each window of checks went through and moves the limit the way
+TCP moves its congestion window. It doubles the limit while nothing
+degrades (slow start), adds a fixed step once it has backed off at least
+once, and multiplies it by ``decrease`` as soon as it sees congestion.
+
+Congestion is any of:
+
+* a local resource error (EMFILE, ENOBUFS, EADDRNOTAVAIL...), which says
+  nothing about the proxy; those checks are retried;
+* a timeout rate clearly above the lowest one seen (dead proxies time out at
+  any concurrency, so only the excess counts);
+* a median latency of working proxies well above the lowest one seen.
+"""
+import errno
+import ssl
+import statistics
+import time
+from collections import namedtuple
+
+DEFAULT_INITIAL_LIMIT = 50
+DEFAULT_MIN_LIMIT = 4
+DEFAULT_WINDOW = 1.0
+DEFAULT_MIN_SAMPLES = 20
+
+# The socket could not even be created or bound here: not the proxy's fault
+LOCAL_ERRNOS = frozenset(
+    getattr(errno, name) for name in ("EMFILE", "ENFILE", "ENOBUFS", "ENOMEM", "EADDRNOTAVAIL", "EADDRINUSE")
+    if hasattr(errno, name)
+)
+
+# Descriptors left for the database, the log and the rest of the process
+RESERVED_DESCRIPTORS = 64
+
+ControllerStats = namedtuple("ControllerStats", "limit throughput timeout_rate latency")
+
+
+class LocalResourceError(Exception):
+    """
+    A check failed because of this machine, not because of the proxy.
+    """
+
+
+def is_local_resource_error(error):
+    # SSLError reuses errno for OpenSSL's own codes
+    return isinstance(error, OSError) and not isinstance(error, ssl.SSLError) and error.errno in LOCAL_ERRNOS
+
+
+def descriptor_budget():
+    """
+    Sockets this process can have open at once: the soft ``RLIMIT_NOFILE``
+    minus ``RESERVED_DESCRIPTORS``. None where there is no such limit (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return None
+    return max(2, soft - RESERVED_DESCRIPTORS)
+
+
+def format_stats(stats):
+    text = f"limit {stats.limit} | {stats.throughput:.0f} checks/s | {stats.timeout_rate:.0%} timeouts"
+    if stats.latency is not None:
+        text += f" | p50 {stats.latency * 1000:.0f} ms"
+    return text
+
+
+def combine_stats(stats):
+    """
+    One ``ControllerStats`` for several checkers running side by side.
+    """
+    stats = list(stats)
+    throughput = sum(s.throughput for s in stats)
+    latencies = [s.latency for s in stats if s.latency is not None]
+    return ControllerStats(
+        limit=sum(s.limit for s in stats),
+        throughput=throughput,
+        timeout_rate=(sum(s.timeout_rate * s.throughput for s in stats) / throughput) if throughput else 0.0,
+        latency=statistics.median(latencies) if latencies else None,
+    )
+
+
+class AdaptiveLimit:
+    """
+    Feed it every finished check with ``record``; ``update`` returns the
+    limit to use from now on.
+    """
+
+    def __init__(self, max_limit, min_limit=DEFAULT_MIN_LIMIT, initial=DEFAULT_INITIAL_LIMIT,
+                 increase=16, decrease=0.7, window=DEFAULT_WINDOW, min_samples=DEFAULT_MIN_SAMPLES,
+                 timeout_margin=0.1, latency_factor=2.0, clock=time.monotonic):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = max(self.min_limit, min(initial, self.max_limit))
+        self.increase = increase
+        self.decrease = decrease
+        self.window = window
+        self.min_samples = min_samples
+        self.timeout_margin = timeout_margin
+        self.latency_factor = latency_factor
+        self.clock = clock
+        self.slow_start = True
+        self.timeout_floor = None
+        self.latency_floor = None
+        self.stats = ControllerStats(self.limit, 0.0, 0.0, None)
+        self._window_started = clock()
+        self._reset_window()
+
+    def _reset_window(self):
+        self._completed = 0
+        self._timeouts = 0
+        self._local_errors = 0
+        self._latencies = []
+
+    def record(self, outcome, elapsed=None):
+        """
+        ``outcome`` is "working", "failed", "timeout" or "local".
+        """
+        if outcome == "local":
+            self._local_errors += 1
+            return
+        self._completed += 1
+        if outcome == "timeout":
+            self._timeouts += 1
+        elif outcome == "working" and elapsed is not None:
+            self._latencies.append(elapsed)
+
+    def update(self, saturated=True):
+        """
+        Closes the window once it is long and full enough; returns the limit.
+        ``saturated`` is False while the input, not the limit, holds checks back,
+        in which case the limit is not raised.
+        """
+        now = self.clock()
+        elapsed = now - self._window_started
+        if self._local_errors:
+            # React fast, but only once per burst of errors
+            if elapsed < self.window / 4:
+                return self.limit
+        elif elapsed < self.window or self._completed < self.min_samples:
+            return self.limit
+
+        timeout_rate = self._timeouts / self._completed if self._completed else 0.0
+        latency = statistics.median(self._latencies) if self._latencies else None
+        congested = bool(self._local_errors)
+        if self._completed >= self.min_samples:
+            if self.timeout_floor is not None and timeout_rate > self.timeout_floor + self.timeout_margin:
+                congested = True
+            self.timeout_floor = self._floor(self.timeout_floor, timeout_rate)
+        if latency is not None:
+            if self.latency_floor is not None and latency > self.latency_floor * self.latency_factor:
+                congested = True
+            self.latency_floor = self._floor(self.latency_floor, latency)
+
+        if congested:
+            self.slow_start = False
+            self.limit = max(self.min_limit, int(self.limit * self.decrease))
+        elif saturated:
+            step = self.limit if self.slow_start else self.increase
+            self.limit = min(self.max_limit, self.limit + step)
+        self.stats = ControllerStats(self.limit, self._completed / max(elapsed, 1e-9), timeout_rate, latency)
+        self._window_started = now
+        self._reset_window()
+        return self.limit
+
+    @staticmethod
+    def _floor(floor, value):
+        # Lowest value seen, drifting slowly up so one lucky window is not
+        # the baseline forever
+        if floor is None or value < floor:
+            return value
+        return floor + (value - floor) * 0.05
@@ -0,0 +1,98 @@
+"""
+Fixed vs adaptive concurrency against local fake proxies behind a simulated uplink.
+
+    python benchmarks/bench_adaptive_concurrency.py --proxies 3000 --capacity 100 --fd-limit 300
+
+The uplink adds queueing delay once more than ``--capacity`` checks are in
+flight and fails connects with EMFILE above ``--fd-limit``. A share of the
+proxies are dead (they refuse the handshake). "false dead" counts live proxies
+that were reported failed.
+"""
+import argparse
+import asyncio
+import errno
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adaptive_concurrency import format_stats  # noqa: E402
+from async_checker import AsyncProxyChecker  # noqa: E402
+from fake_proxies import FakeProxyFarm  # noqa: E402
+
+
+class SimulatedUplink:
+    def __init__(self, checker, capacity, fd_limit, rtt):
+        self.capacity = capacity
+        self.fd_limit = fd_limit
+        self.rtt = rtt
+        self.in_flight = 0
+        self.peak = 0
+        self._open = checker._open
+        self._check = checker.check
+        checker._open = self.open
+        checker.check = self.check
+
+    async def check(self, proxy):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            return await self._check(proxy)
+        finally:
+            self.in_flight -= 1
+
+    async def open(self, ip, port):
+        if self.in_flight > self.fd_limit:
+            raise OSError(errno.EMFILE, "Too many open files")
+        # Queueing delay grows with the load above what the link carries
+        await asyncio.sleep(self.rtt * (1 + max(0, self.in_flight - self.capacity) / self.capacity * 4))
+        return await self._open(ip, port)
+
+
+def run(proxies, live, args, concurrency, adaptive):
+    checker = AsyncProxyChecker(
+        "socks5", concurrency=concurrency, adaptive=adaptive, judges=["http://judge.test/get"],
+        connect_timeout=args.timeout, read_timeout=args.timeout,
+    )
+    uplink = SimulatedUplink(checker, args.capacity, args.fd_limit, args.rtt)
+    started = time.perf_counter()
+    results = asyncio.run(checker.run(proxies))
+    elapsed = time.perf_counter() - started
+    working = sum("is working" in result for result in results)
+    false_dead = sum(1 for result in results if "is working" not in result and result.split(" ", 1)[0] in live)
+    name = f"adaptive (max {concurrency})" if adaptive else f"fixed {concurrency}"
+    line = (f"{name:>20}: {elapsed:6.2f}s, {working / elapsed:7.1f} working/s, "
+            f"{false_dead:4d} false dead, peak {uplink.peak} in flight")
+    if adaptive:
+        line += f", last window: {format_stats(checker.controller.stats)}"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--proxies", type=int, default=3000)
+    parser.add_argument("--dead", type=float, default=0.5, help="share of dead proxies")
+    parser.add_argument("--latency", type=float, default=0.05, help="proxy-side latency")
+    parser.add_argument("--rtt", type=float, default=0.05, help="uplink round trip when idle")
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--fd-limit", type=int, default=300)
+    parser.add_argument("--timeout", type=float, default=0.5)
+    parser.add_argument("--fixed", type=int, nargs="+", default=[5, 100, 1000])
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)  # per-proxy failures are expected here
+
+    dead_count = int(args.proxies * args.dead)
+    with FakeProxyFarm() as farm:
+        live = {p.address for p in farm.add("socks5", count=args.proxies - dead_count, latency=args.latency)}
+        dead = [p.address for p in farm.add("socks5", count=dead_count, reject=True)]
+        proxies = [proxy for pair in zip(sorted(live), dead) for proxy in pair]
+        proxies += sorted(live)[len(dead):]
+        for concurrency in args.fixed:
+            run(proxies, live, args, concurrency, adaptive=False)
+        run(proxies, live, args, max(args.fixed), adaptive=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Checks per second of the asyncio engine against local fake proxies.
+
+    python benchmarks/bench_async_checker.py --proxies 2000 --latency 0.05
+
+With ``--bundled-judge`` the checks go through ``judge_server`` instead of
+being answered by the fake proxies themselves.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_checker import check_proxies  # noqa: E402
+from fake_proxies import FakeProxyFarm  # noqa: E402
+from judge_server import start_judge_server  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--proxies", type=int, default=1000)
+    parser.add_argument("--protocol", default="socks5", choices=["http", "socks4", "socks5"])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--bundled-judge", action="store_true")
+    args = parser.parse_args()
+
+    judges = ["http://judge.test/get"]
+    if args.bundled_judge:
+        server, judge = start_judge_server()
+        judges = [judge]
+    with FakeProxyFarm() as farm:
+        proxies = [p.address for p in farm.add(args.protocol, count=args.proxies, latency=args.latency)]
+        started = time.perf_counter()
+        results = check_proxies(
+            proxies, args.protocol, concurrency=args.concurrency, judges=judges
+        )
+        elapsed = time.perf_counter() - started
+    if args.bundled_judge:
+        server.shutdown()
+
+    working = sum("is working" in result for result in results)
+    print(f"{len(results)} checks ({working} working) in {elapsed:.2f}s "
+          f"-> {len(results) / elapsed:.0f} checks/s at concurrency {args.concurrency}")
+
+
+if __name__ == "__main__":
+    main()
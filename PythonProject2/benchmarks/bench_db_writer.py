@@ -0,0 +1,47 @@
+"""
+Rows per second: per-row save_to_database vs the batched DatabaseWriter.
+
+    python benchmarks/bench_db_writer.py --rows 5000 --threads 8
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import proxy_checker_core  # noqa: E402
+
+
+def run(rows, threads):
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for i in range(rows):
+            executor.submit(proxy_checker_core.save_to_database, f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}:80", "Testland")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for label, batched in (("per-row save_to_database", False), ("DatabaseWriter", True)):
+            proxy_checker_core.DB_NAME = os.path.join(directory, f"{label.split()[0]}.db")
+            proxy_checker_core.setup_database()
+            started = time.perf_counter()
+            if batched:
+                proxy_checker_core.start_database_writer()
+            run(args.rows, args.threads)
+            if batched:
+                proxy_checker_core.stop_database_writer()
+            elapsed = time.perf_counter() - started
+            print(f"{label:>26}: {args.rows} rows in {elapsed:.2f}s -> {args.rows / elapsed:.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
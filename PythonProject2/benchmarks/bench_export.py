@@ -0,0 +1,90 @@
+"""
+Export speed, file size and memory from a large proxies database.
+
+    python benchmarks/bench_export.py --rows 1000000
+
+Fills a temporary database, then exports it as plain text (the old
+``save_sorted_proxies`` after a full fetch), JSONL, CSV and packed binary,
+and reads the binary file back through the memory map.
+"""
+import argparse
+import os
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import proxy_checker_core  # noqa: E402
+from proxy_export import ProxyColumns, export_rows  # noqa: E402
+
+COUNTRIES = ["Germany", "France", "United States", "Brazil", "Japan", "Unknown"]
+PROTOCOLS = ["http", "socks4", "socks5"]
+
+
+def fill(rows):
+    conn = sqlite3.connect(proxy_checker_core.DB_NAME)
+    now = time.time()
+    conn.executemany(
+        "INSERT INTO proxies (ip_port, country, ip, port, protocol, alive, last_checked, last_latency, success_rate) "
+        "VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?)",
+        (
+            (f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}:{1080 + i % 7}", COUNTRIES[i % len(COUNTRIES)],
+             f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}", 1080 + i % 7, PROTOCOLS[i % 3], now,
+             0.05 + (i % 1000) / 1000, (i % 100) / 100)
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def timed(name, path, export):
+    started = time.perf_counter()
+    count = export()
+    elapsed = time.perf_counter() - started
+    # Second pass for memory: tracing slows everything down several times
+    tracemalloc.start()
+    export()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:>14}: {count:8d} rows in {elapsed:6.2f}s, {os.path.getsize(path) / 2 ** 20:7.1f} MB file, "
+          f"peak Python allocations {peak / 2 ** 20:6.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        proxy_checker_core.use_database(os.path.join(work_dir, "proxies.db"))
+        proxy_checker_core.setup_database()
+        fill(args.rows)
+
+        def text():
+            conn = sqlite3.connect(proxy_checker_core.DB_NAME)
+            proxies = [row[0] for row in conn.execute("SELECT ip_port FROM proxies WHERE alive = 1")]
+            conn.close()
+            proxy_checker_core.save_sorted_proxies(os.path.join(work_dir, "proxies.txt"), proxies)
+            return len(proxies)
+
+        timed("text (fetchall)", os.path.join(work_dir, "proxies.txt"), text)
+        for fmt in ("jsonl", "csv", "bin"):
+            path = os.path.join(work_dir, f"proxies.{fmt}")
+            timed(fmt, path, lambda: export_rows(proxy_checker_core.iter_proxy_rows(), path)[0])
+
+        started = time.perf_counter()
+        with ProxyColumns(os.path.join(work_dir, "proxies.bin")) as export:
+            latencies = export.column("latency_ms")
+            fast = sum(1 for latency in latencies if latency < 200)
+        print(f"{'mmap scan':>14}: {len(export)} latencies read in {time.perf_counter() - started:6.2f}s "
+              f"({fast} under 200 ms)")
+        print(f"{'max RSS':>14}: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
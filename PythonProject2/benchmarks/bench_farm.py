@@ -0,0 +1,288 @@
+"""
+End-to-end ``process_file`` benchmark against a simulated proxy farm, saved as JSON.
+
+    python benchmarks/bench_farm.py --proxies 3000 --latency lognormal:0.05:0.6 --drop-rate 0.05 \\
+        --dead 2000 --black-holes 200 -o farm.json --compare farm-before.json
+
+The farm runs in its own processes: HTTP, SOCKS4 and SOCKS5 fake proxies,
+closed ports, and black-hole ports whose connects never complete. So the peak
+RSS and open descriptors reported are the checker's own. Every connection
+draws its latency from ``--latency`` and is dropped with ``--drop-rate``,
+both from a fixed ``--seed``. Geo lookups are answered locally and the
+database is a temporary file, so nothing leaves the machine and two runs on
+the same machine compare.
+
+Latency distributions: ``fixed:S``, ``uniform:LOW:HIGH``, ``exp:MEAN`` and
+``lognormal:MEDIAN:SIGMA``, all in seconds.
+"""
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import proxy_checker_core  # noqa: E402
+from fake_proxies import FakeProxyFarm, black_hole_ports, closed_ports  # noqa: E402
+from judges import JudgePool  # noqa: E402
+from latency import LatencyHistogram, parse_latency  # noqa: E402
+
+PROTOCOLS = ("http", "socks4", "socks5")
+DISTRIBUTIONS = {
+    "fixed": lambda rng, value: lambda: value,
+    "uniform": lambda rng, low, high: lambda: rng.uniform(low, high),
+    "exp": lambda rng, mean: lambda: rng.expovariate(1 / mean),
+    "lognormal": lambda rng, median, sigma: lambda: rng.lognormvariate(math.log(median), sigma),
+}
+
+
+def latency_sampler(spec, rng):
+    name, *params = spec.split(":")
+    if name not in DISTRIBUTIONS:
+        raise ValueError(f"unknown distribution {name!r}")
+    return DISTRIBUTIONS[name](rng, *(float(param) for param in params))
+
+
+def latency_spec(spec):
+    try:
+        latency_sampler(spec, random.Random())()
+    except (TypeError, ValueError) as e:
+        raise argparse.ArgumentTypeError(f"bad latency distribution {spec!r}: {e}")
+    return spec
+
+
+def serve_farm(counts, latency, drop_rate, black_holes, seed, conn):
+    random.seed(seed)  # drop decisions
+    sampler = latency_sampler(latency, random.Random(seed))
+    with FakeProxyFarm() as farm:
+        live = {protocol: [p.address for p in farm.add(protocol, count, latency=sampler, drop_rate=drop_rate)]
+                for protocol, count in counts.items()}
+        holes, sockets = black_hole_ports(black_holes)
+        conn.send((live, holes))
+        conn.recv()
+        for sock in sockets:
+            sock.close()
+
+
+def open_fds():
+    for path in ("/proc/self/fd", "/dev/fd"):
+        if os.path.isdir(path):
+            return len(os.listdir(path))
+    return None
+
+
+def rss_bytes():
+    """
+    Current resident set size where /proc has it, else the peak so far.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class ResourceSampler(threading.Thread):
+    """
+    Peak RSS and open descriptors of this process while a run goes on.
+    """
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_rss = None
+        self.peak_fds = None
+        self._stop_event = threading.Event()
+
+    def sample(self):
+        rss, fds = rss_bytes(), open_fds()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+        if fds is not None:
+            self.peak_fds = max(self.peak_fds or 0, fds)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.sample()
+
+
+def measure(name, protocol, proxies, args, work_dir):
+    random.Random(args.seed).shuffle(proxies)
+    path = os.path.join(work_dir, f"{name}.txt")
+    with open(path, "w") as f:
+        f.write("\n".join(proxies))
+    sampler = ResourceSampler()
+    sampler.start()
+    started = time.perf_counter()
+    results = proxy_checker_core.process_file(
+        path, protocol, checkpoint=False, concurrency=args.concurrency,
+        connect_timeout=args.timeout, read_timeout=args.timeout,
+        adaptive=args.adaptive, prefilter=args.prefilter,
+    )
+    elapsed = time.perf_counter() - started
+    sampler.stop()
+    latencies = LatencyHistogram()
+    for result in results:
+        latency = parse_latency(result)
+        if latency is not None:
+            latencies.add(latency)
+    p50, p99 = latencies.percentile(50), latencies.percentile(99)
+    return {
+        "name": name,
+        "protocol": protocol,
+        "checks": len(results),
+        "working": sum("is working" in result for result in results),
+        "seconds": round(elapsed, 3),
+        "checks_per_second": round(len(results) / elapsed, 1),
+        "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+        "latency_p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+        "peak_rss_mb": round(sampler.peak_rss / 2 ** 20, 1) if sampler.peak_rss else None,
+        "peak_open_fds": sampler.peak_fds,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def describe(run):
+    text = (f"{run['name']:>7}: {run['checks']} checks ({run['working']} working) in {run['seconds']:.2f}s, "
+            f"{run['checks_per_second']:.0f} checks/s")
+    if run["latency_p50_ms"] is not None:
+        text += f", p50 {run['latency_p50_ms']:.0f} ms, p99 {run['latency_p99_ms']:.0f} ms"
+    if run["peak_rss_mb"] is not None:
+        text += f", peak RSS {run['peak_rss_mb']:.0f} MB"
+    if run["peak_open_fds"] is not None:
+        text += f", peak {run['peak_open_fds']} fds"
+    return text
+
+
+def compare(report, path):
+    with open(path) as f:
+        before = json.load(f)
+    if before.get("config") != report["config"]:
+        print(f"note: {path} was run with a different configuration")
+    runs = {run["name"]: run for run in before.get("runs", [])}
+    for run in report["runs"]:
+        old = runs.get(run["name"])
+        if old is None:
+            continue
+        changes = []
+        for key, label in (("checks_per_second", "checks/s"), ("latency_p99_ms", "p99"),
+                           ("peak_rss_mb", "RSS"), ("peak_open_fds", "fds")):
+            if run.get(key) and old.get(key):
+                changes.append(f"{label} {run[key] / old[key]:.2f}x")
+        print(f"{run['name']:>7} vs {before.get('commit') or path}: {', '.join(changes)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--proxies", type=int, default=3000, help="live proxies, split between the protocols")
+    parser.add_argument("--protocols", nargs="+", choices=PROTOCOLS, default=list(PROTOCOLS))
+    parser.add_argument("--auto", action="store_true", help="one mixed list checked with protocol auto")
+    parser.add_argument("--latency", type=latency_spec, default="lognormal:0.05:0.6")
+    parser.add_argument("--drop-rate", type=float, default=0.05, help="share of connections dropped")
+    parser.add_argument("--dead", type=int, default=2000, help="closed ports")
+    parser.add_argument("--black-holes", type=int, default=200, help="ports whose connects hang")
+    parser.add_argument("--farms", type=int, default=2, help="processes serving the farm")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=2.0, help="connect and read timeouts")
+    parser.add_argument("--adaptive", action="store_true")
+    parser.add_argument("--prefilter", action="store_true")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare with")
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)  # per-proxy failures are expected here
+
+    context = multiprocessing.get_context("spawn")
+    farms = []
+    live = {protocol: [] for protocol in args.protocols}
+    dead = []
+    for index in range(args.farms):
+        share = lambda total: total // args.farms + (index < total % args.farms)  # noqa: E731
+        counts = {protocol: share(args.proxies // len(args.protocols)) for protocol in args.protocols}
+        parent, child = context.Pipe()
+        process = context.Process(
+            target=serve_farm, daemon=True,
+            args=(counts, args.latency, args.drop_rate, share(args.black_holes), args.seed + index, child)
+        )
+        process.start()
+        farms.append((process, parent))
+        farm_live, farm_dead = parent.recv()
+        for protocol, addresses in farm_live.items():
+            live[protocol] += addresses
+        dead += farm_dead
+    # Only once every farm is listening, or a farm could reuse a port handed out as closed
+    dead += closed_ports(args.dead)
+
+    runs = []
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            proxy_checker_core.use_database(os.path.join(work_dir, "proxies.db"))
+            proxy_checker_core.setup_database()
+            proxy_checker_core.judge_pool = JudgePool(["http://judge.test/get"])
+            proxy_checker_core.real_ip = ""  # no detection over the network
+            proxy_checker_core.get_country_by_ip = lambda ip: "Localland"
+            if args.auto:
+                mixed = [proxy for addresses in live.values() for proxy in addresses] + dead
+                runs.append(measure("auto", "auto", mixed, args, work_dir))
+                print(describe(runs[-1]))
+            else:
+                for index, protocol in enumerate(args.protocols):
+                    proxies = live[protocol] + dead[index::len(args.protocols)]
+                    runs.append(measure(protocol, protocol, proxies, args, work_dir))
+                    print(describe(runs[-1]))
+    finally:
+        for process, conn in farms:
+            conn.send(None)
+            process.join()
+
+    checks = sum(run["checks"] for run in runs)
+    seconds = sum(run["seconds"] for run in runs)
+    report = {
+        "benchmark": "farm",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "runs": runs,
+        "total": {"checks": checks, "seconds": round(seconds, 3),
+                  "checks_per_second": round(checks / seconds, 1) if seconds else None},
+    }
+    print(f"  total: {checks} checks in {seconds:.2f}s, {report['total']['checks_per_second']} checks/s")
+    if args.compare:
+        compare(report, args.compare)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Offline GeoIP lookups per second over a synthetic range table.
+
+    python benchmarks/bench_geoip.py --ranges 300000 --lookups 1000000
+"""
+import argparse
+import os
+import random
+import socket
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geoip import GeoIPDatabase  # noqa: E402
+
+
+def build_database(count, rng):
+    step = (1 << 32) // count
+    countries = [f"Country {i}" for i in range(250)]
+    return GeoIPDatabase(
+        (i * step, i * step + rng.randrange(step), rng.choice(countries)) for i in range(count)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ranges", type=int, default=300000)
+    parser.add_argument("--lookups", type=int, default=1000000)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    started = time.perf_counter()
+    database = build_database(args.ranges, rng)
+    print(f"Built {len(database)} ranges in {time.perf_counter() - started:.2f}s")
+
+    ips = [socket.inet_ntoa(struct.pack("!I", rng.getrandbits(32))) for _ in range(args.lookups)]
+    lookup = database.lookup
+    started = time.perf_counter()
+    found = sum(1 for ip in ips if lookup(ip))
+    elapsed = time.perf_counter() - started
+    print(f"{args.lookups} lookups ({found} hits) in {elapsed:.2f}s "
+          f"-> {elapsed / args.lookups * 1e6:.2f} us/lookup")
+
+
+if __name__ == "__main__":
+    main()
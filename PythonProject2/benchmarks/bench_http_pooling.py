@@ -0,0 +1,102 @@
+"""
+HTTP check throughput: a fresh connection per request (the old requests.get
+calls) vs pooled per-worker sessions, plus the engine's full and
+tunnel-only modes. Runs against local stub proxies and a local stand-in for
+the ip-api.com geo endpoint, which counts the TCP connections it accepts.
+
+    python benchmarks/bench_http_pooling.py --proxies 300 --workers 16
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+import proxy_checker_core  # noqa: E402
+from async_checker import check_proxies  # noqa: E402
+from country_cache import CountryCache  # noqa: E402
+from fake_proxies import FakeProxyFarm  # noqa: E402
+from judges import JudgePool  # noqa: E402
+
+
+class GeoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+
+    def handle(self):
+        GeoHandler.connections += 1
+        super().handle()
+
+    def do_GET(self):
+        body = json.dumps({"country": "Localland"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run_threaded(proxies, workers):
+    GeoHandler.connections = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda proxy: proxy_checker_core.check_proxy(proxy, "http"), proxies))
+    elapsed = time.perf_counter() - started
+    working = sum("is working" in result for result in results)
+    return working, elapsed, GeoHandler.connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--proxies", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    geo = ThreadingHTTPServer(("127.0.0.1", 0), GeoHandler)
+    threading.Thread(target=geo.serve_forever, daemon=True).start()
+    proxy_checker_core.GEO_API_URL = f"http://127.0.0.1:{geo.server_address[1]}/json/{{ip}}"
+    proxy_checker_core.judge_pool = JudgePool(["http://judge.test/get"])
+    # Every stub lives on 127.0.0.1: keep the country cache from hiding geo traffic
+    proxy_checker_core.country_cache = CountryCache(None, ttl=0)
+
+    with tempfile.TemporaryDirectory() as directory, FakeProxyFarm() as farm:
+        proxy_checker_core.DB_NAME = os.path.join(directory, "proxies.db")
+        proxy_checker_core.setup_database()
+        proxies = [p.address for p in farm.add("http", count=args.proxies)]
+
+        pooled = proxy_checker_core.get_http_session
+        proxy_checker_core.get_http_session = requests.Session  # new session per call, like requests.get
+        rows = [("fresh connection per call", *run_threaded(proxies, args.workers))]
+        proxy_checker_core.get_http_session = pooled
+        rows.append(("pooled per-worker sessions", *run_threaded(proxies, args.workers)))
+
+        for mode in ("full", "connect"):
+            GeoHandler.connections = 0
+            started = time.perf_counter()
+            results = check_proxies(proxies, "http", check_mode=mode, judges=["http://judge.test/get"],
+                                    country_lookup=proxy_checker_core.get_country_by_ip)
+            elapsed = time.perf_counter() - started
+            working = sum("is working" in result for result in results)
+            rows.append((f"asyncio engine, {mode} mode", working, elapsed, GeoHandler.connections))
+    geo.shutdown()
+
+    for label, working, elapsed, connections in rows:
+        print(f"{label:>28}: {working}/{args.proxies} working in {elapsed:.2f}s "
+              f"-> {args.proxies / elapsed:.0f} checks/s, {connections} geo connections")
+
+
+if __name__ == "__main__":
+    main()
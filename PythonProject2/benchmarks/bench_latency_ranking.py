@@ -0,0 +1,49 @@
+"""
+Fastest-first ranking: streaming LatencyRanking vs collecting and sorting.
+
+    python benchmarks/bench_latency_ranking.py --results 1000000 --top 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from latency import LatencyRanking, format_latency, parse_latency  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--results", type=int, default=1000000)
+    parser.add_argument("--top", type=int, default=10000)
+    args = parser.parse_args()
+    rng = random.Random(42)
+    results = [
+        f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}:8080 is working | Country: Testland"
+        + format_latency(rng.lognormvariate(-1, 1), rng.uniform(0.005, 0.1))
+        for i in range(args.results)
+    ]
+
+    started = time.perf_counter()
+    collected = [(parse_latency(result), result.split(" ", 1)[0]) for result in results]
+    collected.sort()
+    sorted_top = [proxy for _, proxy in collected[:args.top]]
+    sort_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    ranking = LatencyRanking(size=args.top)
+    for result in results:
+        ranking.add_result(result)
+    ranked_top = [proxy for proxy, _ in ranking.fastest()]
+    ranking_elapsed = time.perf_counter() - started
+
+    assert len(ranked_top) == len(sorted_top)
+    print(f"collect + sort: {sort_elapsed:.2f}s, holds {len(collected)} entries")
+    print(f"LatencyRanking: {ranking_elapsed:.2f}s, holds {len(ranking)} entries, "
+          f"p50={ranking.histogram.percentile(50) * 1000:.0f} ms p90={ranking.histogram.percentile(90) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
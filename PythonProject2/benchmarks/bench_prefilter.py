@@ -0,0 +1,70 @@
+"""
+Two-stage funnel vs full checks on a local mix of live, closed and filtered ports.
+
+    python benchmarks/bench_prefilter.py --live 200 --closed 2000 --filtered 100
+
+Closed ports refuse at once. "Filtered" ports are listeners with a full
+backlog that never accept, so connects to them hang like they do against a
+firewall that drops packets.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_checker import AsyncProxyChecker  # noqa: E402
+from fake_proxies import FakeProxyFarm, black_hole_ports, closed_ports  # noqa: E402
+from prefilter import FunnelCounters  # noqa: E402
+
+
+def run(proxies, args, prefilter):
+    funnel = FunnelCounters()
+    checker = AsyncProxyChecker(
+        "socks5", concurrency=args.concurrency, judges=["http://judge.test/get"],
+        connect_timeout=args.timeout, read_timeout=args.timeout,
+        prefilter=prefilter, prefilter_timeout=args.scan_timeout, funnel=funnel,
+    )
+    started = time.perf_counter()
+    results = asyncio.run(checker.run(proxies))
+    elapsed = time.perf_counter() - started
+    working = sum("is working" in result for result in results)
+    name = "two-stage" if prefilter else "full checks"
+    print(f"{name:>11}: {elapsed:6.2f}s, {len(results) / elapsed:7.0f} verdicts/s, {working} working")
+    print(f"{'':>13}{funnel}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--live", type=int, default=200)
+    parser.add_argument("--closed", type=int, default=2000)
+    parser.add_argument("--filtered", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=200, help="second-stage concurrency")
+    parser.add_argument("--timeout", type=float, default=3.0, help="full-check timeouts")
+    parser.add_argument("--scan-timeout", type=float, default=1.0)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)  # per-proxy failures are expected here
+
+    with FakeProxyFarm() as farm:
+        live = [p.address for p in farm.add("socks5", count=args.live, latency=0.02)]
+        filtered, sockets = black_hole_ports(args.filtered)
+        dead = closed_ports(args.closed) + filtered
+        # Spread the live proxies through the list like in a scraped one
+        step = max(1, len(dead) // max(1, len(live)))
+        proxies = []
+        for i, proxy in enumerate(live):
+            proxies += dead[i * step:(i + 1) * step] + [proxy]
+        proxies += dead[len(live) * step:]
+        try:
+            run(proxies, args, prefilter=False)
+            run(proxies, args, prefilter=True)
+        finally:
+            for sock in sockets:
+                sock.close()
+
+
+if __name__ == "__main__":
+    main()
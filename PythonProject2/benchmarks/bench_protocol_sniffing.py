@@ -0,0 +1,72 @@
+"""
+One pass per protocol vs a single "auto" pass over a mixed list.
+
+    python benchmarks/bench_protocol_sniffing.py --live 300 --dead 1500
+
+The list mixes live HTTP, SOCKS4 and SOCKS5 fake proxies with closed ports,
+like a scraped list whose protocol is unknown. "connects" counts every
+connection the checker opened or tried to open.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_checker import AsyncProxyChecker  # noqa: E402
+from fake_proxies import FakeProxyFarm, closed_ports  # noqa: E402
+
+PROTOCOLS = ("http", "socks4", "socks5")
+
+
+def check(proxies, protocol, args):
+    checker = AsyncProxyChecker(protocol, concurrency=args.concurrency, judges=["http://judge.test/get"],
+                                connect_timeout=args.timeout, read_timeout=args.timeout)
+    opened = 0
+    open_connection = checker._open
+
+    async def counted_open(ip, port):
+        nonlocal opened
+        opened += 1
+        return await open_connection(ip, port)
+
+    checker._open = counted_open
+    results = asyncio.run(checker.run(proxies))
+    return {result.split(" ", 1)[0] for result in results if "is working" in result}, opened
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--live", type=int, default=300, help="live proxies, split between the protocols")
+    parser.add_argument("--dead", type=int, default=1500, help="closed ports")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=3.0)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)  # per-proxy failures are expected here
+
+    with FakeProxyFarm() as farm:
+        live = []
+        for protocol in PROTOCOLS:
+            live += [p.address for p in farm.add(protocol, count=args.live // len(PROTOCOLS))]
+        proxies = live + closed_ports(args.dead)
+
+        started = time.perf_counter()
+        working, connects = set(), 0
+        for protocol in PROTOCOLS:
+            found, opened = check(proxies, protocol, args)
+            working |= found
+            connects += opened
+        elapsed = time.perf_counter() - started
+        print(f"{'per protocol':>12}: {elapsed:6.2f}s, {connects:6d} connects, {len(working)} working")
+
+        started = time.perf_counter()
+        working, connects = check(proxies, "auto", args)
+        elapsed = time.perf_counter() - started
+        print(f"{'auto':>12}: {elapsed:6.2f}s, {connects:6d} connects, {len(working)} working")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Streaming reader throughput and memory on a synthetic list, plus the overlap
+between the repo's own http.txt, socks4.txt and socks5.txt.
+
+    python benchmarks/bench_proxy_input.py --lines 2000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from proxy_input import InputStats, iter_proxies, iter_proxy_file  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000000)
+    parser.add_argument("--unique", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as file:
+        for i in range(args.lines):
+            n = i % args.unique
+            file.write(f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}:{8000 + n % 7}\n")
+        path = file.name
+    try:
+        stats = InputStats()
+        started = time.perf_counter()
+        first_at = None
+        for _ in iter_proxy_file(path, stats):
+            if first_at is None:
+                first_at = time.perf_counter() - started
+        elapsed = time.perf_counter() - started
+
+        # Separate pass: tracemalloc slows the reader down considerably
+        tracemalloc.start()
+        for _ in iter_proxy_file(path):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.unlink(path)
+    print(f"{stats} in {elapsed:.2f}s -> {stats.lines / elapsed:.0f} lines/s, "
+          f"first proxy after {first_at * 1000:.2f} ms, peak {peak / 2**20:.1f} MiB")
+
+    stats = InputStats()
+    repo_lists = [os.path.join(os.path.dirname(ROOT), name) for name in ("http.txt", "socks4.txt", "socks5.txt")]
+
+    def all_lines():
+        for name in repo_lists:
+            if os.path.exists(name):
+                with open(name) as file:
+                    yield from file
+
+    unique = sum(1 for _ in iter_proxies(all_lines(), stats))
+    print(f"Repo lists combined: {stats} -> {unique} unique endpoints")
+
+
+if __name__ == "__main__":
+    main()
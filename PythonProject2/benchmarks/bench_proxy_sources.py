@@ -0,0 +1,78 @@
+"""
+Whole-search time: the old sequential per-link loop vs fetch_sources, against
+a local server that serves fixture list pages with an artificial delay.
+
+    python benchmarks/bench_proxy_sources.py --sources 40 --delay 0.2
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+from proxy_sources import fetch_sources  # noqa: E402
+
+
+def make_handler(delay, proxies_per_page):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            page = int(self.path.strip("/") or 0)
+            rows = "".join(
+                f"<tr><td>10.{page}.{i >> 8 & 255}.{i & 255}</td><td>{8000 + i % 100}</td></tr>"
+                for i in range(proxies_per_page)
+            )
+            body = f"<html><body><table>{rows}</table></body></html>".encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def sequential(links):
+    # The loop ProxySearchThread used before: one request at a time, raw lines
+    proxies = []
+    for link in links:
+        resp = requests.get(link, timeout=10)
+        if resp.status_code == 200:
+            proxies.extend(resp.text.strip().split("\n"))
+    return proxies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sources", type=int, default=40)
+    parser.add_argument("--delay", type=float, default=0.2)
+    parser.add_argument("--proxies-per-page", type=int, default=300)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.delay, args.proxies_per_page))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    links = [f"http://127.0.0.1:{server.server_address[1]}/{i}" for i in range(args.sources)]
+    try:
+        started = time.perf_counter()
+        old = sequential(links)
+        old_elapsed = time.perf_counter() - started
+        started = time.perf_counter()
+        new = fetch_sources(links)
+        new_elapsed = time.perf_counter() - started
+    finally:
+        server.shutdown()
+
+    print(f"sequential: {old_elapsed:.2f}s, {len(old)} raw lines (HTML included)")
+    print(f"concurrent: {new_elapsed:.2f}s, {len(new)} unique proxies "
+          f"-> {old_elapsed / new_elapsed:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+GUI result rendering: one QTextEdit.append per result vs batched ResultsTable.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_results_view.py --results 50000
+
+Both views are shown and the event loop is drained after every batch, so the
+times include layout and repaint.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication, QTextEdit  # noqa: E402
+
+from latency import format_latency  # noqa: E402
+from results_view import ResultBuffer, ResultsTable  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--results", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=500, help="results per timer tick")
+    parser.add_argument("--history", type=int, default=10000)
+    args = parser.parse_args()
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = [
+        f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}:8080 is working | Country: Testland"
+        + format_latency((i % 997) / 1000, 0.01)
+        for i in range(args.results)
+    ]
+
+    text = QTextEdit()
+    text.show()
+    started = time.perf_counter()
+    for i, result in enumerate(results, 1):
+        text.append(result)
+        if i % args.batch == 0:
+            app.processEvents()
+    app.processEvents()
+    append_elapsed = time.perf_counter() - started
+    text.close()
+
+    table = ResultsTable(history=args.history)
+    table.show()
+    buffer = ResultBuffer()
+    table.follow(buffer, "http")
+    started = time.perf_counter()
+    for i, result in enumerate(results, 1):
+        buffer.emit(result)
+        if i % args.batch == 0:
+            table.flush()
+            app.processEvents()
+    table.finish()
+    app.processEvents()
+    table_elapsed = time.perf_counter() - started
+
+    print(f"QTextEdit.append: {append_elapsed:.2f}s ({args.results / append_elapsed:,.0f} results/s)")
+    print(f"ResultsTable:     {table_elapsed:.2f}s ({args.results / table_elapsed:,.0f} results/s), "
+          f"{table.results_model.rowCount()} rows kept")
+
+
+if __name__ == "__main__":
+    main()
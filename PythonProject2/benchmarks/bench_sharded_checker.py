@@ -0,0 +1,72 @@
+"""
+Throughput of sharded checking from 1 to N worker processes.
+
+The fake proxies run in their own processes so the farm is not what limits
+the measurement.
+
+    python benchmarks/bench_sharded_checker.py --proxies 2000 --rounds 5 --max-processes 4
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_proxies import FakeProxyFarm  # noqa: E402
+from sharded_checker import check_sharded, default_processes  # noqa: E402
+
+
+def serve_farm(protocol, count, latency, conn):
+    with FakeProxyFarm() as farm:
+        conn.send([p.address for p in farm.add(protocol, count=count, latency=latency)])
+        conn.recv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--proxies", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5, help="times every proxy is checked per run")
+    parser.add_argument("--protocol", default="socks5", choices=["http", "socks4", "socks5"])
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=300, help="checks in flight per process")
+    parser.add_argument("--farms", type=int, default=4, help="processes serving fake proxies")
+    parser.add_argument("--max-processes", type=int, default=default_processes())
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    farms, proxies = [], []
+    for _ in range(args.farms):
+        parent, child = context.Pipe()
+        process = context.Process(
+            target=serve_farm, daemon=True,
+            args=(args.protocol, args.proxies // args.farms, args.latency, child)
+        )
+        process.start()
+        farms.append((process, parent))
+        proxies += parent.recv()
+    proxies *= args.rounds
+
+    baseline = None
+    try:
+        for processes in range(1, args.max_processes + 1):
+            started = time.perf_counter()
+            results = check_sharded(
+                proxies, args.protocol, processes=processes, concurrency=args.concurrency,
+                judges=["http://judge.test/get"]
+            )
+            elapsed = time.perf_counter() - started
+            working = sum("is working" in result for result in results)
+            rate = len(results) / elapsed
+            baseline = baseline or rate
+            print(f"{processes} process(es): {len(results)} checks ({working} working) in {elapsed:.2f}s "
+                  f"-> {rate:.0f} checks/s, {rate / baseline:.2f}x")
+    finally:
+        for process, conn in farms:
+            conn.send(None)
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
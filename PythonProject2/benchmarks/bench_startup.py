@@ -0,0 +1,65 @@
+"""
+Startup time: fresh-interpreter imports of the entry points, optionally a full GUI start.
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --gui --exe dist/proxy_checker_gui.exe
+
+``--gui`` starts the script offscreen and ``--exe`` the PyInstaller build; both
+quit as soon as the event loop is up (PROXY_CHECKER_EXIT_AFTER_STARTUP).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODULES = ("proxy_checker_core", "proxy_checker_cli", "proxy_checker_gui")
+HEAVY = ("PyQt5", "bs4", "requests", "socks")
+
+
+def time_command(command, runs, env=None):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def loaded_heavy(module):
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return output.stdout.strip() or "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--gui", action="store_true", help="also time a full offscreen GUI start")
+    parser.add_argument("--exe", help="frozen proxy_checker_gui executable to time")
+    args = parser.parse_args()
+
+    baseline = time_command([sys.executable, "-c", "pass"], args.runs)
+    print(f"interpreter: {baseline * 1000:.0f} ms")
+    for module in MODULES:
+        elapsed = time_command([sys.executable, "-c", f"import {module}"], args.runs)
+        print(f"import {module}: {elapsed * 1000:.0f} ms (+{(elapsed - baseline) * 1000:.0f} ms), "
+              f"heavy modules loaded: {loaded_heavy(module)}")
+
+    env = dict(os.environ, PROXY_CHECKER_EXIT_AFTER_STARTUP="1")
+    if args.gui:
+        gui_env = dict(env, QT_QPA_PLATFORM=env.get("QT_QPA_PLATFORM", "offscreen"))
+        elapsed = time_command([sys.executable, "proxy_checker_gui.py"], args.runs, gui_env)
+        print(f"GUI start (script): {elapsed * 1000:.0f} ms")
+    if args.exe:
+        elapsed = time_command([os.path.abspath(args.exe)], args.runs, env)
+        print(f"GUI start ({os.path.basename(args.exe)}): {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Checker result strings as records.
+
+``AsyncProxyChecker`` reports every proxy as one line such as
+``1.2.3.4:80 is working | Country: Germany | Latency: 246 ms (connect 12 ms)``.
+``result_record`` turns it into a dict for the CLI's JSON lines, the GUI's
+result table and exports.
+"""
+import re
+import time
+
+_TIMING_RE = re.compile(r"(connect|TTFB) (\d+) ms")
+
+
+def result_record(result, protocol, checked_at=None):
+    """
+    Checker result string as a JSON-ready dict.
+    """
+    proxy, _, rest = result.partition(" ")
+    record = {"proxy": proxy, "protocol": protocol, "checked_at": round(checked_at or time.time(), 3)}
+    if rest.startswith("failed: "):
+        record["status"] = "failed"
+        record["error"] = rest[len("failed: "):]
+        return record
+    record["status"] = "working"
+    for part in rest.split(" | ")[1:]:
+        name, _, value = part.partition(": ")
+        if name == "Protocol":
+            record["protocol"] = value
+        elif name == "Country":
+            record["country"] = value
+        elif name == "Anonymity":
+            record["anonymity"] = value
+        elif name == "Cached":
+            record["cached"] = True
+        elif name == "Latency":
+            record["latency_ms"] = int(value.split(" ", 1)[0])
+            for timing, ms in _TIMING_RE.findall(value):
+                record[f"{timing.lower()}_ms"] = int(ms)
+    return record
@@ -0,0 +1,140 @@
+"""
+Bounded LRU cache with TTL for IP -> country results.
+
+Entries are mirrored to the ``country_cache`` table so a restart starts warm
+and the sort/download step never needs the network for IPs seen before.
+While a check run has a ``DatabaseWriter`` going, stores are queued to it and
+committed with the run's other rows; otherwise each thread reuses its own
+connection.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_SIZE = 100000
+DEFAULT_TTL = 7 * 24 * 3600
+
+STORE_COUNTRY = "INSERT OR REPLACE INTO country_cache (ip, country, updated_at) VALUES (?, ?, ?)"
+
+
+class CountryCache:
+    def __init__(self, db_path=None, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL, writer=None):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.ttl = ttl
+        # Returns the active DatabaseWriter for this database, or None
+        self.writer = writer
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._table_ready = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _connect(self):
+        # One connection per thread: lookups run on the checker's executor threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._table_ready:
+            conn.execute('''CREATE TABLE IF NOT EXISTS country_cache (
+                ip TEXT PRIMARY KEY,
+                country TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )''')
+            conn.commit()
+            self._table_ready = True
+        return conn
+
+    def _remember(self, ip, country, stored_at):
+        self._entries[ip] = (country, stored_at)
+        self._entries.move_to_end(ip)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def setup(self):
+        """
+        Creates the table and warms memory with the freshest stored entries.
+        """
+        if not self.db_path:
+            return
+        try:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT ip, country, updated_at FROM country_cache WHERE updated_at >= ? "
+                "ORDER BY updated_at DESC LIMIT ?",
+                (time.time() - self.ttl, self.max_size)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Failed to load country cache: {e}")
+            return
+        with self._lock:
+            for ip, country, stored_at in reversed(rows):
+                self._remember(ip, country, stored_at)
+        logging.info(f"Country cache warmed with {len(rows)} entries")
+
+    def _load_from_db(self, ip):
+        if not self.db_path:
+            return None
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT country, updated_at FROM country_cache WHERE ip = ?", (ip,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"Failed to read country cache for {ip}: {e}")
+            return None
+        return row
+
+    def get(self, ip):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(ip)
+            if entry and now - entry[1] < self.ttl:
+                self._entries.move_to_end(ip)
+                self.hits += 1
+                return entry[0]
+        row = self._load_from_db(ip)
+        with self._lock:
+            if row and now - row[1] < self.ttl:
+                self._remember(ip, row[0], row[1])
+                self.hits += 1
+                return row[0]
+            self._entries.pop(ip, None)
+            self.misses += 1
+        return None
+
+    def put(self, ip, country):
+        now = time.time()
+        with self._lock:
+            self._remember(ip, country, now)
+        if not self.db_path:
+            return
+        try:
+            writer = self.writer() if self.writer else None
+            if writer is not None:
+                if not self._table_ready:
+                    self._connect()  # a batch with a missing table would roll back the run's rows too
+                writer.execute(STORE_COUNTRY, (ip, country, now))
+                return
+            conn = self._connect()
+            conn.execute(STORE_COUNTRY, (ip, country, now))
+            conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Failed to store country for {ip}: {e}")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
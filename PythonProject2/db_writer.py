@@ -0,0 +1,97 @@
+"""
+Single-connection SQLite writer.
+
+Worker threads only enqueue statements; one background thread owns the
+connection (WAL mode) and commits them in batches, flushing when a batch is
+full or the flush interval has passed. ``close()`` drains the queue, so no
+queued row is lost on shutdown.
+"""
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+from metrics import REGISTRY, stage_timer
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 0.5
+
+_STOP = object()
+
+DB_WRITE_SECONDS = stage_timer("db_write")
+ROWS_WRITTEN = REGISTRY.counter("db_rows_written", "Rows committed by the database writer")
+
+
+class DatabaseWriter(threading.Thread):
+    def __init__(self, db_path, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        super().__init__(name="DatabaseWriter", daemon=True)
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.batches_written = 0
+        self._queue = queue.Queue()
+
+    def execute(self, sql, params=()):
+        self._queue.put((sql, params))
+
+    def flush(self):
+        """
+        Blocks until everything queued so far is committed.
+        """
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(_STOP)
+        self.join()
+
+    def _write_batch(self, conn, batch):
+        # Consecutive rows for the same statement go through one executemany
+        start = 0
+        started = time.perf_counter()
+        try:
+            while start < len(batch):
+                sql = batch[start][0]
+                end = start
+                while end < len(batch) and batch[end][0] == sql:
+                    end += 1
+                conn.executemany(sql, [params for _, params in batch[start:end]])
+                start = end
+            conn.commit()
+            self.rows_written += len(batch)
+            self.batches_written += 1
+            ROWS_WRITTEN.inc(len(batch))
+            DB_WRITE_SECONDS.observe(time.perf_counter() - started)
+        except sqlite3.Error as e:
+            conn.rollback()
+            logging.error(f"Failed to write batch of {len(batch)} rows: {e}")
+
+    def run(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        stopping = False
+        while not stopping:
+            batch = []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(conn, batch)
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+        logging.info(f"Database writer stopped after {self.rows_written} rows in {self.batches_written} batches")
@@ -0,0 +1,271 @@
+"""
+Local fake proxies for tests and benchmarks.
+
+Every server speaks just enough HTTP/SOCKS4/SOCKS5 for the checker to finish
+a handshake. Requests for loopback targets (such as the bundled
+``judge_server``) are relayed for real; anything else is answered by the
+fake itself with a judge-shaped JSON body, so no traffic ever leaves the
+loopback interface.
+"""
+import asyncio
+import json
+import random
+import socket
+import threading
+from urllib.parse import urlsplit
+
+LOCAL_HOSTS = ("127.0.0.1", "localhost")
+
+
+def _parse_head(head):
+    lines = head.decode("latin-1").split("\r\n")
+    headers = []
+    for line in lines[1:]:
+        if ":" in line:
+            name, _, value = line.partition(":")
+            headers.append((name.strip(), value.strip()))
+    return lines[0], headers
+
+
+def _judge_response(headers):
+    body = json.dumps({"origin": "127.0.0.1", "headers": dict(headers)}).encode()
+    return (
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+        + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+        + body
+    )
+
+
+async def _pipe(reader, writer):
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _relay(client_reader, client_writer, host, port, first_bytes=b""):
+    upstream_reader, upstream_writer = await asyncio.open_connection(host, port)
+    if first_bytes:
+        upstream_writer.write(first_bytes)
+    await asyncio.gather(
+        _pipe(client_reader, upstream_writer), _pipe(upstream_reader, client_writer)
+    )
+
+
+class FakeProxy:
+    def __init__(self, protocol, latency=0.0, reject=False, anonymity="elite", drop_rate=0.0):
+        self.protocol = protocol
+        # Seconds before answering; a callable is asked again for every connection
+        self.latency = latency
+        self.reject = reject
+        # Share of connections closed at once without a word
+        self.drop_rate = drop_rate
+        # For plain HTTP forwarding: "elite", "anonymous" (adds Via) or
+        # "transparent" (also adds X-Forwarded-For with the client address)
+        self.anonymity = anonymity
+        self.connections = 0
+        self.requests = []
+        self.server = None
+        self.port = None
+
+    @property
+    def address(self):
+        return f"127.0.0.1:{self.port}"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            if self.drop_rate and random.random() < self.drop_rate:
+                return
+            latency = self.latency() if callable(self.latency) else self.latency
+            if latency:
+                await asyncio.sleep(latency)
+            if self.protocol == "http":
+                await self.handle_http(reader, writer)
+            elif self.protocol == "socks4":
+                await self.handle_socks4(reader, writer)
+            else:
+                await self.handle_socks5(reader, writer)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def tunnel(self, reader, writer, host, port):
+        if host in LOCAL_HOSTS:
+            await _relay(reader, writer, host, port)
+            return
+        head = await reader.readuntil(b"\r\n\r\n")
+        writer.write(_judge_response(_parse_head(head)[1]))
+        await writer.drain()
+
+    def forwarded_headers(self, headers, client_ip):
+        headers = [(name, value) for name, value in headers if name.lower() != "proxy-authorization"]
+        if self.anonymity in ("anonymous", "transparent"):
+            headers.append(("Via", "1.1 fake-proxy"))
+        if self.anonymity == "transparent":
+            headers.append(("X-Forwarded-For", client_ip))
+        return headers
+
+    async def handle_http(self, reader, writer):
+        head = await reader.readuntil(b"\r\n\r\n")
+        request_line, headers = _parse_head(head)
+        if len(request_line.split(" ", 2)) != 3:
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            return
+        self.requests.append(request_line)
+        if self.reject:
+            writer.write(b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n")
+            return
+        method, target, version = request_line.split(" ", 2)
+        if method == "CONNECT":
+            host, _, port = target.rpartition(":")
+            writer.write(b"HTTP/1.1 200 Connection established\r\n\r\n")
+            await writer.drain()
+            await self.tunnel(reader, writer, host, int(port))
+            return
+        headers = self.forwarded_headers(headers, writer.get_extra_info("peername")[0])
+        url = urlsplit(target)
+        if url.hostname in LOCAL_HOSTS:
+            path = url.path or "/"
+            if url.query:
+                path += "?" + url.query
+            request = f"{method} {path} {version}\r\n" + "".join(f"{n}: {v}\r\n" for n, v in headers) + "\r\n"
+            await _relay(reader, writer, url.hostname, url.port or 80, request.encode())
+            return
+        writer.write(_judge_response(headers))
+        await writer.drain()
+
+    async def handle_socks4(self, reader, writer):
+        header = await reader.readexactly(8)
+        await reader.readuntil(b"\x00")
+        if header[0] != 4:
+            writer.write(bytes([0, 0x5B]) + bytes(6))
+            return
+        host = ".".join(str(b) for b in header[4:8])
+        if header[4:7] == b"\x00\x00\x00" and header[7]:
+            host = (await reader.readuntil(b"\x00"))[:-1].decode()
+        port = int.from_bytes(header[2:4], "big")
+        self.requests.append(f"{host}:{port}")
+        status = 0x5B if self.reject else 0x5A
+        writer.write(bytes([0, status]) + header[2:8])
+        await writer.drain()
+        if not self.reject:
+            await self.tunnel(reader, writer, host, port)
+
+    async def handle_socks5(self, reader, writer):
+        version, count = await reader.readexactly(2)
+        if version != 5:
+            return
+        await reader.readexactly(count)
+        writer.write(b"\x05\x00")
+        await writer.drain()
+        _, _, _, atyp = await reader.readexactly(4)
+        if atyp == 1:
+            host = ".".join(str(b) for b in await reader.readexactly(4))
+        elif atyp == 3:
+            length = (await reader.readexactly(1))[0]
+            host = (await reader.readexactly(length)).decode()
+        else:
+            host = (await reader.readexactly(16)).hex()
+        port = int.from_bytes(await reader.readexactly(2), "big")
+        self.requests.append(f"{host}:{port}")
+        status = 0x02 if self.reject else 0x00
+        writer.write(bytes([5, status, 0, 1, 127, 0, 0, 1, 0, 0]))
+        await writer.drain()
+        if not self.reject:
+            await self.tunnel(reader, writer, host, port)
+
+
+class FakeProxyFarm:
+    """
+    Runs fake proxies on a private event loop in a background thread.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.proxies = []
+
+    def add(self, protocol, count=1, latency=0.0, reject=False, anonymity="elite", drop_rate=0.0):
+        async def start_all():
+            started = [FakeProxy(protocol, latency, reject, anonymity, drop_rate) for _ in range(count)]
+            for proxy in started:
+                await proxy.start()
+            return started
+
+        started = asyncio.run_coroutine_threadsafe(start_all(), self.loop).result()
+        self.proxies.extend(started)
+        return started
+
+    def close(self):
+        async def stop_all():
+            for proxy in self.proxies:
+                proxy.server.close()
+            pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(stop_all(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def closed_ports(count):
+    """
+    Loopback addresses nothing listens on: connects are refused at once.
+    """
+    sockets = []
+    try:
+        # All bound at once, so no port is handed out twice
+        for _ in range(count):
+            sock = socket.socket()
+            sockets.append(sock)
+            sock.bind(("127.0.0.1", 0))
+        return [f"127.0.0.1:{sock.getsockname()[1]}" for sock in sockets]
+    finally:
+        for sock in sockets:
+            sock.close()
+
+
+def black_hole_ports(count):
+    """
+    ``(addresses, sockets)`` of listeners whose accept queue is full, so
+    connects hang like against a firewall that drops packets. Keep the
+    sockets open for as long as the ports are needed.
+    """
+    listeners, fillers, addresses = [], [], []
+    for _ in range(count):
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(0)
+        port = listener.getsockname()[1]
+        # Fill the accept queue so further SYNs are dropped
+        for _ in range(2):
+            filler = socket.socket()
+            filler.setblocking(False)
+            filler.connect_ex(("127.0.0.1", port))
+            fillers.append(filler)
+        listeners.append(listener)
+        addresses.append(f"127.0.0.1:{port}")
+    return addresses, listeners + fillers
@@ -0,0 +1,118 @@
+"""
+Offline IPv4 -> country lookup.
+
+Ranges are kept in three parallel arrays (start, end, country index), sorted
+by start address, so a lookup is a single binary search with no allocation.
+"""
+import csv
+import ipaddress
+import logging
+import socket
+import struct
+from array import array
+from bisect import bisect_right
+
+_unpack_ip = struct.Struct("!I").unpack
+
+
+def ip_to_int(ip):
+    return _unpack_ip(socket.inet_aton(ip))[0]
+
+
+def _parse_address(value):
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    return int(ipaddress.IPv4Address(value))
+
+
+class GeoIPDatabase:
+    def __init__(self, ranges=()):
+        self.starts = array("I")
+        self.ends = array("I")
+        self.codes = array("H")
+        self.countries = []
+        self._country_index = {}
+        if ranges:
+            self.build(ranges)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _index_of(self, country):
+        index = self._country_index.get(country)
+        if index is None:
+            index = self._country_index[country] = len(self.countries)
+            self.countries.append(country)
+        return index
+
+    def build(self, ranges):
+        """
+        ``ranges`` is an iterable of (start_int, end_int, country).
+        """
+        rows = sorted((start, end, self._index_of(country)) for start, end, country in ranges)
+        self.starts = array("I", (row[0] for row in rows))
+        self.ends = array("I", (row[1] for row in rows))
+        self.codes = array("H", (row[2] for row in rows))
+        return self
+
+    def lookup(self, ip):
+        try:
+            address = ip_to_int(ip)
+        except (OSError, TypeError):
+            return None
+        position = bisect_right(self.starts, address) - 1
+        if position >= 0 and address <= self.ends[position]:
+            return self.countries[self.codes[position]]
+        return None
+
+    @classmethod
+    def from_csv(cls, path):
+        """
+        Accepts ``start,end,country`` rows (dotted or integer addresses) or
+        ``cidr,country`` rows. Header, IPv6 and malformed rows are skipped.
+        """
+        def ranges():
+            with open(path, newline="", encoding="utf-8") as file:
+                for row in csv.reader(file):
+                    try:
+                        if len(row) >= 3:
+                            yield _parse_address(row[0]), _parse_address(row[1]), row[2].strip()
+                        elif len(row) == 2:
+                            network = ipaddress.IPv4Network(row[0].strip(), strict=False)
+                            yield int(network.network_address), int(network.broadcast_address), row[1].strip()
+                    except ValueError:
+                        continue
+
+        return cls().build(ranges())
+
+    @classmethod
+    def from_mmdb(cls, path):
+        """
+        Reads a MaxMind country database. Requires the optional ``maxminddb`` package.
+        """
+        try:
+            import maxminddb
+        except ImportError:
+            raise ImportError("Reading .mmdb files requires the 'maxminddb' package")
+
+        def ranges():
+            with maxminddb.open_database(path) as reader:
+                for network, record in reader:
+                    if network.version != 4 or not record:
+                        continue
+                    country = (record.get("country") or record.get("registered_country") or {})
+                    name = country.get("names", {}).get("en") or country.get("iso_code")
+                    if name:
+                        yield int(network.network_address), int(network.broadcast_address), name
+
+        return cls().build(ranges())
+
+
+def load_database(path):
+    if path.lower().endswith(".mmdb"):
+        database = GeoIPDatabase.from_mmdb(path)
+    else:
+        database = GeoIPDatabase.from_csv(path)
+    logging.info(f"Loaded {len(database)} GeoIP ranges from {path}")
+    return database
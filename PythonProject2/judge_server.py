@@ -0,0 +1,68 @@
+"""
+Bundled proxy judge.
+
+Answers every GET with the client address it sees and the headers it
+received, in the same shape as httpbin.org/get, so checks and benchmarks can
+run fully offline:
+
+    python judge_server.py --port 8899
+"""
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# socketserver listens with a backlog of 5; a check run opens hundreds of
+# judge connections at once and the rest would be refused as "timed out"
+LISTEN_BACKLOG = 1024
+
+
+class JudgeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "ProxyJudge/1.0"
+
+    def do_GET(self):
+        body = json.dumps({
+            "origin": self.client_address[0],
+            "headers": dict(self.headers.items()),
+            "url": self.path,
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class JudgeServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+
+def start_judge_server(host="127.0.0.1", port=0):
+    """
+    Serves the judge from a daemon thread; returns the server and its URL.
+    """
+    server = JudgeServer((host, port), JudgeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/get"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local proxy judge server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    args = parser.parse_args()
+    server = JudgeServer((args.host, args.port), JudgeHandler)
+    print(f"Judge listening on http://{args.host}:{args.port}/get")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
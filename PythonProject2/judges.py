@@ -0,0 +1,75 @@
+"""
+Judge endpoints and anonymity classification.
+
+A judge is any URL that echoes back the caller's address and the request
+headers it received (httpbin.org/get, or the bundled ``judge_server``).
+"""
+import itertools
+import json
+import logging
+import threading
+
+DEFAULT_JUDGES = ["https://httpbin.org/get"]
+
+# Headers a proxy adds when it announces itself or forwards the client address
+PROXY_HEADERS = (
+    "via", "forwarded", "x-forwarded-for", "x-forwarded-host", "x-real-ip", "client-ip",
+    "x-client-ip", "x-proxy-id", "proxy-connection", "x-originating-ip", "forwarded-for",
+)
+
+TRANSPARENT = "transparent"
+ANONYMOUS = "anonymous"
+ELITE = "elite"
+
+
+class JudgePool:
+    """
+    Round-robin over the configured judge URLs.
+    """
+
+    def __init__(self, urls=None):
+        self.urls = [url.strip() for url in (urls or DEFAULT_JUDGES) if url.strip()]
+        if not self.urls:
+            raise ValueError("At least one judge URL is required")
+        self._cycle = itertools.cycle(self.urls)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.urls)
+
+    def next(self):
+        with self._lock:
+            return next(self._cycle)
+
+
+def classify_anonymity(judge_body, real_ip=None, proxy_ip=None):
+    """
+    ``judge_body`` is the decoded judge JSON (``origin`` and ``headers``).
+    """
+    headers = {name.lower(): str(value) for name, value in (judge_body.get("headers") or {}).items()}
+    origin = str(judge_body.get("origin") or "")
+    if real_ip:
+        forwarded = " ".join(value for name, value in headers.items() if name in PROXY_HEADERS)
+        if real_ip in forwarded or (real_ip in origin and origin != proxy_ip):
+            return TRANSPARENT
+    if any(name in PROXY_HEADERS for name in headers):
+        return ANONYMOUS
+    return ELITE
+
+
+def detect_real_ip(judges, timeout=5):
+    """
+    Asks the judges directly (no proxy) which address we connect from.
+    """
+    import urllib.request
+
+    for url in judges:
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                origin = json.loads(response.read().decode()).get("origin")
+            if origin:
+                # httpbin may report "client, proxy" chains; the first is ours
+                return origin.split(",")[0].strip()
+        except Exception as e:
+            logging.error(f"Failed to detect real IP via {url}: {e}")
+    return None
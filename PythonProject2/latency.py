@@ -0,0 +1,118 @@
+"""
+Latency breakdown of a check and fastest-first ranking of working proxies.
+
+Every working result carries ``| Latency: <total> ms (connect .., TTFB ..)``.
+``LatencyRanking`` consumes results as they stream in: a bounded heap keeps
+the K fastest proxies and a log-bucket histogram tracks percentiles over all
+of them. The heap answers "keep only the N fastest" when saving from the GUI
+and the CLI's ``--fastest``; a full saved list sorts every working proxy and
+takes just the percentile cutoff from the histogram.
+"""
+import heapq
+import itertools
+import math
+import re
+from collections import namedtuple
+
+DEFAULT_RANKING_SIZE = 10000
+
+# connect: TCP connect to the proxy; ttfb: first byte of the judge response;
+# total: whole check. All in seconds, None when not measured.
+CheckTimings = namedtuple("CheckTimings", "connect ttfb total")
+
+_LATENCY_RE = re.compile(r" \| Latency: (\d+) ms")
+
+
+def format_latency(total, connect=None, ttfb=None):
+    text = f" | Latency: {total * 1000:.0f} ms"
+    parts = []
+    if connect is not None:
+        parts.append(f"connect {connect * 1000:.0f} ms")
+    if ttfb is not None:
+        parts.append(f"TTFB {ttfb * 1000:.0f} ms")
+    if parts:
+        text += f" ({', '.join(parts)})"
+    return text
+
+
+def parse_latency(result):
+    """
+    Total latency in seconds from a result string, ``None`` if it has none.
+    """
+    match = _LATENCY_RE.search(result)
+    return int(match.group(1)) / 1000 if match else None
+
+
+class LatencyHistogram:
+    """
+    Log-scale histogram: ~5% relative error from 1 ms up to minutes in a few
+    hundred buckets, whatever the number of samples.
+    """
+
+    def __init__(self, base=0.001, growth=1.05):
+        self.base = base
+        self.log_growth = math.log(growth)
+        self.buckets = {}
+        self.count = 0
+
+    def add(self, seconds):
+        index = 0 if seconds <= self.base else int(math.log(seconds / self.base) / self.log_growth) + 1
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+
+    def percentile(self, percent):
+        """
+        Upper bound of the latency below which ``percent`` of samples fall.
+        """
+        if not self.count:
+            return None
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return self.base * math.exp(index * self.log_growth)
+        return math.inf
+
+
+class LatencyRanking:
+    """
+    Streaming top-K of the fastest working proxies.
+    """
+
+    def __init__(self, size=DEFAULT_RANKING_SIZE):
+        self.size = size
+        self.histogram = LatencyHistogram()
+        self._heap = []  # max-heap on latency via negation
+        self._order = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def add(self, proxy, latency):
+        self.histogram.add(latency)
+        entry = (-latency, next(self._order), proxy)
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, entry)
+        elif latency < -self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def add_result(self, result):
+        """
+        Feeds one checker result string; returns True if it was ranked.
+        """
+        if "is working" not in result:
+            return False
+        latency = parse_latency(result)
+        if latency is None:
+            return False
+        self.add(result.split(" ", 1)[0], latency)
+        return True
+
+    def fastest(self, percentile=100):
+        """
+        ``(proxy, latency)`` fastest first, limited to the given percentile.
+        """
+        cutoff = self.histogram.percentile(percentile) if percentile < 100 else math.inf
+        ranked = sorted((-negated, order, proxy) for negated, order, proxy in self._heap)
+        return [(proxy, latency) for latency, _, proxy in ranked if latency <= cutoff]
@@ -0,0 +1,302 @@
+"""
+Counters, gauges and latency histograms for check runs.
+
+The checker records where each check spends its time (parse, connect,
+handshake, judge, geo, DB write) into the process-wide ``REGISTRY``. Reading
+it costs nothing while a run goes on: ``serve_metrics`` answers Prometheus
+scrapes on a local port, and ``SnapshotWriter`` dumps the registry as JSON
+every few seconds. ``profiled`` wraps a block in cProfile for the runs where
+the per-stage numbers are not enough.
+
+Sharded runs record the checks of each worker process in that process'
+registry; the parent only sees its own stages (DB write).
+"""
+import bisect
+import cProfile
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+
+# Seconds; a check stage takes from well under a millisecond to the deadline
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15)
+DEFAULT_SNAPSHOT_INTERVAL = 10.0
+STAGES = ("parse", "sniff", "connect", "handshake", "judge", "geo", "db_write")
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+    def samples(self, name, labels):
+        yield f"{name}_total{_label_text(labels)}", self.value
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+    def snapshot(self):
+        return self.value
+
+    def samples(self, name, labels):
+        yield f"{name}{_label_text(labels)}", self.value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextlib.contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def quantile(self, q):
+        """
+        Upper bound of the bucket holding the ``q`` quantile, None if empty.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+    def samples(self, name, labels):
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            le = "+Inf" if bound == float("inf") else repr(float(bound))
+            yield f"{name}_bucket{_label_text(labels + (('le', le),))}", seen
+        yield f"{name}_sum{_label_text(labels)}", self.sum
+        yield f"{name}_count{_label_text(labels)}", self.count
+
+
+class MetricsRegistry:
+    """
+    Metrics by name and labels; asking twice for the same one returns the same object.
+    """
+
+    def __init__(self, prefix="proxy_checker"):
+        self.prefix = prefix
+        self.started = time.time()
+        self._metrics = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, labels, **options):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = cls(**options)
+                    self._help.setdefault(name, help_text)
+        return metric
+
+    def counter(self, name, help_text="", **labels):
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text="", **labels):
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS, **labels):
+        return self._get(Histogram, name, help_text, labels, buckets=buckets)
+
+    def snapshot(self):
+        """
+        JSON-ready dict: ``{name: value}``, or ``{name: {label=value,...: value}}`` with labels.
+        """
+        metrics = {}
+        for (name, labels), metric in list(self._metrics.items()):
+            if labels:
+                key = ",".join(f"{label}={value}" for label, value in labels)
+                metrics.setdefault(name, {})[key] = metric.snapshot()
+            else:
+                metrics[name] = metric.snapshot()
+        return {"time": round(time.time(), 3), "uptime": round(time.time() - self.started, 3), "metrics": metrics}
+
+    def prometheus_text(self):
+        lines = []
+        described = set()
+        for (name, labels), metric in sorted(self._metrics.items(), key=lambda item: item[0]):
+            full_name = f"{self.prefix}_{name}"
+            if name not in described:
+                described.add(name)
+                if self._help.get(name):
+                    lines.append(f"# HELP {full_name} {self._help[name]}")
+                lines.append(f"# TYPE {full_name} {metric.kind}")
+            for sample, value in metric.samples(full_name, labels):
+                lines.append(f"{sample} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def stage_timer(stage, registry=None):
+    """
+    Histogram of the seconds one check stage takes.
+    """
+    return (registry or REGISTRY).histogram("stage_seconds", "Time spent in one stage of a check", stage=stage)
+
+
+class ThroughputGauge:
+    """
+    Events per second over the last ``window``, kept in a gauge.
+    """
+
+    def __init__(self, gauge, window=1.0, clock=time.monotonic):
+        self.gauge = gauge
+        self.window = window
+        self.clock = clock
+        self._count = 0
+        self._started = clock()
+
+    def add(self, count=1):
+        self._count += count
+        now = self.clock()
+        if now - self._started >= self.window:
+            self.gauge.set(round(self._count / (now - self._started), 3))
+            self._count = 0
+            self._started = now
+
+
+def serve_metrics(port, registry=None, host="127.0.0.1"):
+    """
+    Serves ``/metrics`` (Prometheus text) and ``/metrics.json`` from a daemon
+    thread; returns the server, stop it with ``shutdown()``.
+    """
+    # Imported here: it pulls in the email package, which the app start does not need
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    registry = registry or REGISTRY
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body = registry.prometheus_text().encode()
+                content_type = "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body = json.dumps(registry.snapshot()).encode()
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # scrapes would flood the log
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="MetricsServer", daemon=True).start()
+    logging.info("Serving metrics on http://%s:%s/metrics", host, server.server_address[1])
+    return server
+
+
+class SnapshotWriter(threading.Thread):
+    """
+    Rewrites ``path`` with a JSON snapshot every ``interval`` seconds and once more on ``stop()``.
+    """
+
+    def __init__(self, path, interval=DEFAULT_SNAPSHOT_INTERVAL, registry=None):
+        super().__init__(name="SnapshotWriter", daemon=True)
+        self.path = path
+        self.interval = interval
+        self.registry = registry or REGISTRY
+        self._stop_event = threading.Event()
+
+    def write(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.registry.snapshot(), f, indent=1)
+        # Readers never see a half-written file
+        os.replace(temp_path, self.path)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                logging.error("Failed to write metrics snapshot %s: %s", self.path, e)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.write()
+
+
+@contextlib.contextmanager
+def profiled(path):
+    """
+    cProfile stats of the block, written to ``path``; does nothing if ``path`` is empty.
+    Only the calling thread is profiled, which is where the event loop runs.
+    """
+    if not path:
+        yield
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
+        logging.info("Profile written to %s", path)
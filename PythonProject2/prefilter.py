@@ -0,0 +1,166 @@
+"""
+First stage of a two-stage check: a plain TCP connect scan.
+
+Most entries of a scraped list are dead, and a full check spends a worker
+slot and a whole handshake on each of them. ``TcpPrefilter`` only opens and
+closes a socket, with far more connects in flight than the verification
+stage runs. It is an async iterable of the proxies whose port answered, so
+``AsyncProxyChecker.run`` starts verifying the first open ports while the
+scan is still going through the list. Ports that refuse or time out are
+reported to ``on_closed`` and never reach the second stage. A connect that
+fails because of this machine (EMFILE, ENOBUFS...) says nothing about the
+port, so that proxy is passed on and the second stage retries it.
+"""
+import asyncio
+import time
+
+from adaptive_concurrency import LocalResourceError, is_local_resource_error
+from proxy_input import split_endpoint
+
+DEFAULT_SCAN_CONCURRENCY = 2000
+DEFAULT_SCAN_TIMEOUT = 1.5
+
+_DONE = object()
+
+
+class StageCounter:
+    """
+    Items through one stage and their rate since the first one started.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.count = 0
+        self.passed = 0
+        self.started = None
+        self.finished = None
+
+    def start(self):
+        if self.started is None:
+            self.started = self.clock()
+
+    def add(self, passed):
+        self.count += 1
+        self.passed += bool(passed)
+        self.finished = self.clock()
+
+    @property
+    def rate(self):
+        if self.started is None or self.finished is None or self.finished <= self.started:
+            return 0.0
+        return self.count / (self.finished - self.started)
+
+
+class FunnelCounters:
+    def __init__(self, clock=time.monotonic):
+        self.scan = StageCounter(clock)  # passed: port answered
+        self.verify = StageCounter(clock)  # passed: proxy works
+
+    def __str__(self):
+        return (f"scan: {self.scan.count} ({self.scan.passed} open) at {self.scan.rate:.0f}/s | "
+                f"verify: {self.verify.count} ({self.verify.passed} working) at {self.verify.rate:.0f}/s")
+
+
+async def probe(host, port, timeout):
+    """
+    Opens and closes a TCP connection; returns None or the reason it failed.
+    Raises ``LocalResourceError`` if the socket could not be opened here.
+    """
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except asyncio.TimeoutError:
+        return "connect timed out"
+    except ConnectionRefusedError:
+        return "connection refused"
+    except OSError as e:
+        if is_local_resource_error(e):
+            raise LocalResourceError(e) from e
+        return str(e) or type(e).__name__
+    writer.close()
+    return None
+
+
+class TcpPrefilter:
+    """
+    ``async for proxy in TcpPrefilter(proxies, on_closed)`` yields the proxies
+    whose port accepted a connection, in the order the scan finds them.
+
+    ``on_closed(proxy, reason)`` is awaited for every proxy that failed the
+    scan. Proxies the scan cannot parse are passed on, and the second stage
+    reports them.
+    """
+
+    def __init__(self, proxies, on_closed, concurrency=DEFAULT_SCAN_CONCURRENCY,
+                 timeout=DEFAULT_SCAN_TIMEOUT, counters=None, ahead=None):
+        self.proxies = proxies
+        self.on_closed = on_closed
+        self.concurrency = max(1, int(concurrency))
+        self.timeout = timeout
+        self.counters = counters if counters is not None else FunnelCounters()
+        # Open ports waiting for the second stage; a full queue pauses the scan
+        self.ahead = ahead or self.concurrency
+        self._tasks = []
+
+    def __aiter__(self):
+        return self._passed()
+
+    def cancel(self):
+        for task in self._tasks:
+            task.cancel()
+
+    async def _passed(self):
+        pending = asyncio.Queue(maxsize=self.concurrency * 2)
+        passed = asyncio.Queue(maxsize=self.ahead)
+        scanners_left = self.concurrency
+
+        async def feed():
+            try:
+                if hasattr(self.proxies, "__aiter__"):
+                    async for proxy in self.proxies:
+                        await pending.put(proxy)
+                else:
+                    for proxy in self.proxies:
+                        await pending.put(proxy)
+            finally:
+                await pending.put(_DONE)
+
+        async def scanner():
+            nonlocal scanners_left
+            try:
+                while True:
+                    proxy = await pending.get()
+                    if proxy is _DONE:
+                        pending.put_nowait(_DONE)
+                        return
+                    self.counters.scan.start()
+                    try:
+                        host, port = split_endpoint(proxy)
+                    except (ValueError, TypeError):
+                        host = port = None
+                    try:
+                        reason = await probe(host, port, self.timeout) if host and port else None
+                    except LocalResourceError:
+                        reason = None  # unknown: the full check retries it and backs off
+                    self.counters.scan.add(reason is None)
+                    if reason is None:
+                        await passed.put(proxy)
+                    else:
+                        await self.on_closed(proxy, reason)
+            finally:
+                scanners_left -= 1
+                if not scanners_left:
+                    await passed.put(_DONE)
+
+        self._tasks = [asyncio.create_task(feed())]
+        self._tasks += [asyncio.create_task(scanner()) for _ in range(self.concurrency)]
+        try:
+            while True:
+                proxy = await passed.get()
+                if proxy is _DONE:
+                    break
+                yield proxy
+        finally:
+            self.cancel()
+        for task in self._tasks:
+            if task.done() and not task.cancelled() and task.exception():
+                raise task.exception()
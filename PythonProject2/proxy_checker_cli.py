@@ -0,0 +1,244 @@
+"""
+Headless proxy checker: no Qt, streams results as JSON lines.
+
+    python proxy_checker_cli.py check http.txt socks5.txt --working-only
+    python proxy_checker_cli.py check list.txt --protocol socks5 -o results.jsonl
+    python proxy_checker_cli.py daemon http.txt --interval 1800 --incremental
+    python proxy_checker_cli.py export fast.bin --protocol socks5 --max-latency 500
+
+The protocol is taken from ``--protocol`` or from file names such as
+``socks4.txt``; ``--protocol auto`` finds out which one each proxy speaks. ``daemon`` re-checks the files every ``--interval`` seconds
+until SIGINT/SIGTERM, finishing the current pass cleanly.
+
+``--metrics-port`` serves Prometheus metrics on localhost while the command
+runs, ``--metrics-json`` keeps a JSON snapshot of them on disk, and
+``--profile-dir`` writes cProfile stats for every checked file.
+
+``--fastest N`` lists each file's N fastest working proxies on stderr once
+it is checked; the ranking streams along, so memory does not grow with the
+list.
+
+``export`` streams working proxies from the database to a packed binary
+(``.bin``), JSONL or CSV file, see ``proxy_export``.
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+import metrics
+import proxy_checker_core
+import proxy_export
+from adaptive_concurrency import format_stats
+from async_checker import CancelToken, DEFAULT_CONCURRENCY, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from check_results import result_record
+from judges import JudgePool
+from latency import LatencyRanking
+from prefilter import DEFAULT_SCAN_TIMEOUT, FunnelCounters
+
+PROTOCOLS = ("http", "socks4", "socks5")
+
+
+class JsonlWriter:
+    """
+    Progress-signal stand-in that writes one JSON object per result.
+    """
+
+    def __init__(self, stream, protocol, working_only=False, ranking=None):
+        self.stream = stream
+        self.protocol = protocol
+        self.working_only = working_only
+        self.ranking = ranking
+        self.working = 0
+        self.checked = 0
+
+    def emit(self, result):
+        self.checked += 1
+        working = "is working" in result
+        self.working += working
+        if working and self.ranking is not None:
+            self.ranking.add_result(result)
+        if working or not self.working_only:
+            self.stream.write(json.dumps(result_record(result, self.protocol), ensure_ascii=False) + "\n")
+            self.stream.flush()
+
+
+def file_protocol(path, protocol=None):
+    if protocol:
+        return protocol
+    name = os.path.splitext(os.path.basename(path))[0].lower()
+    if name in PROTOCOLS:
+        return name
+    raise SystemExit(f"Cannot tell the protocol of {path}; pass --protocol")
+
+
+def check_files(args, stream, cancel_token):
+    for path in args.files:
+        if cancel_token.cancelled:
+            return
+        protocol = file_protocol(path, args.protocol)
+        ranking = LatencyRanking(args.fastest) if args.fastest else None
+        writer = JsonlWriter(stream, protocol, args.working_only, ranking)
+        started = time.perf_counter()
+        funnel = FunnelCounters()
+        live = "\r" if sys.stderr.isatty() else "\n"
+
+        def show_stats(stats, path=path):
+            print(f"{path}: {format_stats(stats)}", end=live, file=sys.stderr, flush=True)
+
+        profile = None
+        if args.profile_dir:
+            profile = os.path.join(args.profile_dir, os.path.basename(path) + ".prof")
+
+        proxy_checker_core.process_file(
+            path, protocol, writer,
+            concurrency=args.concurrency, connect_timeout=args.connect_timeout,
+            read_timeout=args.read_timeout, incremental=args.incremental,
+            cancel_token=cancel_token, check_mode="connect" if args.connect_only else "full",
+            processes=args.processes, adaptive=args.adaptive, on_stats=show_stats,
+            resume=not args.no_resume, prefilter=args.prefilter, prefilter_timeout=args.scan_timeout,
+            funnel=funnel, profile=profile, keep_failed=False,
+        )
+        if live == "\r":
+            print("\x1b[K", end="", file=sys.stderr)  # clear the live stats line
+        print(f"{path}: {writer.working}/{writer.checked} {protocol} proxies working "
+              f"in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        if args.prefilter and args.processes == 1:
+            print(f"{path}: {funnel}", file=sys.stderr)
+        if ranking is not None:
+            print(f"{path}: fastest {len(ranking)}", file=sys.stderr)
+            for proxy, latency in ranking.fastest():
+                print(f"  {proxy} {latency * 1000:.0f} ms", file=sys.stderr)
+
+
+def scan_timeout(value):
+    # "connect" waits as long as the full check would, so slow but live proxies pass
+    return None if value == "connect" else float(value)
+
+
+def export_database(args):
+    rows = proxy_checker_core.iter_proxy_rows(
+        protocol=args.protocol, country=args.country,
+        max_latency=args.max_latency / 1000 if args.max_latency is not None else None,
+        min_success_rate=args.min_success_rate, alive=None if args.include_dead else True,
+    )
+    written, skipped = proxy_export.export_rows(rows, args.output, args.format)
+    message = f"{args.output}: {written} proxies exported"
+    if skipped:
+        message += f", {skipped} non-IPv4 left out"
+    print(message, file=sys.stderr)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Headless proxy checker with JSONL output")
+    commands = parser.add_subparsers(dest="command", required=True)
+    check = commands.add_parser("check", help="check the files once and exit")
+    daemon = commands.add_parser("daemon", help="re-check the files on a schedule")
+    daemon.add_argument("--interval", type=float, default=1800, help="seconds between passes")
+    export = commands.add_parser("export", help="write proxies from the database to a file")
+    export.add_argument("output", help="file to write; .bin, .jsonl or .csv")
+    export.add_argument("--format", choices=proxy_export.FORMATS, help="default: from the file extension")
+    export.add_argument("--protocol", choices=PROTOCOLS)
+    export.add_argument("--country")
+    export.add_argument("--max-latency", type=float, help="milliseconds")
+    export.add_argument("--min-success-rate", type=float, help="0 to 1")
+    export.add_argument("--include-dead", action="store_true")
+    export.add_argument("--db", default=proxy_checker_core.DB_NAME)
+    for command in (check, daemon):
+        command.add_argument("files", nargs="+", help="proxy lists, one proxy per line")
+        command.add_argument("--protocol", choices=PROTOCOLS + ("auto",),
+                             help="'auto' sniffs each proxy's protocol before checking it")
+        command.add_argument("-o", "--output", default="-", help="JSONL file, '-' for stdout")
+        command.add_argument("--working-only", action="store_true")
+        command.add_argument("--fastest", type=int, metavar="N",
+                             help="list the N fastest working proxies of each file on stderr")
+        command.add_argument("--incremental", action="store_true",
+                             help="skip recently checked proxies and back off dead ones")
+        command.add_argument("--no-resume", action="store_true",
+                             help="start over instead of resuming an interrupted run of the same file")
+        command.add_argument("--prefilter", action="store_true",
+                             help="TCP connect scan first, fully check only open ports")
+        command.add_argument("--scan-timeout", type=scan_timeout, default=DEFAULT_SCAN_TIMEOUT,
+                             help="seconds a port may stay silent in the --prefilter scan, "
+                                  "or 'connect' for the --connect-timeout (default: %(default)s)")
+        command.add_argument("--connect-only", action="store_true",
+                             help="only open the tunnel, skip the judge request")
+        command.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                             help="checks in flight; the upper bound with --adaptive")
+        command.add_argument("--adaptive", action="store_true",
+                             help="tune the checks in flight to the network (AIMD)")
+        command.add_argument("--processes", type=int, default=1)
+        command.add_argument("--connect-timeout", type=float, default=DEFAULT_CONNECT_TIMEOUT)
+        command.add_argument("--read-timeout", type=float, default=DEFAULT_READ_TIMEOUT)
+        command.add_argument("--judge", action="append", help="judge URL, may be repeated")
+        command.add_argument("--db", default=proxy_checker_core.DB_NAME)
+        command.add_argument("--geoip", help="offline GeoIP CSV or MMDB file")
+        command.add_argument("--log-level", default="WARNING")
+        command.add_argument("--log-file")
+        command.add_argument("--metrics-port", type=int,
+                             help="serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+        command.add_argument("--metrics-json", help="keep a JSON snapshot of the metrics in this file")
+        command.add_argument("--metrics-interval", type=float, default=metrics.DEFAULT_SNAPSHOT_INTERVAL,
+                             help="seconds between JSON snapshots")
+        command.add_argument("--profile-dir", help="write cProfile stats of each file's run here")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "export":
+        proxy_checker_core.use_database(args.db)
+        proxy_checker_core.setup_database()
+        export_database(args)
+        return 0
+    proxy_checker_core.configure_logging(args.log_file, args.log_level.upper())
+    proxy_checker_core.use_database(args.db)
+    proxy_checker_core.setup_database()
+    proxy_checker_core.setup_geoip(args.geoip)
+    if args.judge:
+        proxy_checker_core.judge_pool = JudgePool(args.judge)
+
+    stop = threading.Event()
+    cancel_token = CancelToken()
+
+    def request_stop(signum, frame):
+        stop.set()
+        cancel_token.cancel()
+
+    previous_handlers = {
+        signum: signal.signal(signum, request_stop) for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+    mode = "a" if args.command == "daemon" else "w"
+    stream = sys.stdout if args.output == "-" else open(args.output, mode, encoding="utf-8")
+    server = metrics.serve_metrics(args.metrics_port) if args.metrics_port is not None else None
+    snapshots = None
+    if args.metrics_json:
+        snapshots = metrics.SnapshotWriter(args.metrics_json, args.metrics_interval)
+        snapshots.start()
+    if args.profile_dir:
+        os.makedirs(args.profile_dir, exist_ok=True)
+    try:
+        if args.command == "check":
+            check_files(args, stream, cancel_token)
+        else:
+            while not stop.is_set():
+                check_files(args, stream, cancel_token)
+                stop.wait(args.interval)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        if snapshots is not None:
+            snapshots.stop()
+        if stream is not sys.stdout:
+            stream.close()
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+    return 130 if stop.is_set() and args.command == "check" else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
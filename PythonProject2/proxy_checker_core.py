@@ -0,0 +1,741 @@
+"""
+Qt-free core of the proxy checker: the proxies database, single and bulk
+checks, incremental re-checks, GeoIP and list helpers.
+
+``proxy_checker_gui`` builds the desktop app on top of this module and
+``proxy_checker_cli`` runs the same checks headless.
+"""
+import os
+import asyncio
+import hashlib
+import itertools
+import math
+import socket
+from urllib.parse import urlsplit
+import sqlite3
+import logging
+import logging.handlers
+import queue
+import time
+import atexit
+import threading
+from collections import defaultdict
+import geoip
+from check_results import result_record
+from country_cache import CountryCache
+from db_writer import DatabaseWriter
+from judges import DEFAULT_JUDGES, JudgePool, classify_anonymity, detect_real_ip
+from latency import CheckTimings, format_latency, parse_latency
+from metrics import profiled
+from prefilter import DEFAULT_SCAN_TIMEOUT
+import proxy_export
+from proxy_input import InputStats, count_lines, iter_proxies, iter_proxy_file, split_endpoint
+from async_checker import (
+    AsyncProxyChecker, DEFAULT_CONCURRENCY, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, PROTOCOLS,
+    judge_address
+)
+
+LOG_FILE = "proxy_checker.log"
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+log_listener = None
+
+def configure_logging(filename=LOG_FILE, level=None):
+    """
+    Opt-in logging setup for the app entry points; ``filename=None`` logs to stderr.
+    Records go through a queue to a background thread, so checks never wait
+    on the log file. ``level`` defaults to $PROXY_CHECKER_LOG_LEVEL or DEBUG.
+    Like ``logging.basicConfig`` it does nothing if logging is already set up.
+    """
+    global log_listener
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    handler = logging.FileHandler(filename) if filename else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    records = queue.SimpleQueue()
+    log_listener = logging.handlers.QueueListener(records, handler)
+    log_listener.start()
+    atexit.register(log_listener.stop)
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.setLevel(level or os.environ.get("PROXY_CHECKER_LOG_LEVEL", "DEBUG"))
+
+# === SQLite Database Setup ===
+DB_NAME = "proxies.db"
+country_cache = CountryCache(DB_NAME, writer=lambda: db_writer)
+
+# Weight of the newest check in the rolling success rate
+SUCCESS_RATE_ALPHA = 0.2
+
+PROXIES_SCHEMA = '''CREATE TABLE IF NOT EXISTS proxies (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ip_port TEXT NOT NULL,
+    country TEXT NOT NULL,
+    ip TEXT NOT NULL DEFAULT '',
+    port INTEGER NOT NULL DEFAULT 0,
+    protocol TEXT NOT NULL DEFAULT '',
+    alive INTEGER NOT NULL DEFAULT 1,
+    last_checked REAL,
+    last_latency REAL,
+    last_connect_time REAL,
+    last_ttfb REAL,
+    success_count INTEGER NOT NULL DEFAULT 0,
+    failure_count INTEGER NOT NULL DEFAULT 0,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    success_rate REAL NOT NULL DEFAULT 0
+)'''
+
+# Verdicts of an unfinished run, so a restart only checks the remainder
+CHECKPOINTS_SCHEMA = '''CREATE TABLE IF NOT EXISTS checkpoints (
+    run_key TEXT NOT NULL,
+    proxy TEXT NOT NULL,
+    result TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (run_key, proxy)
+)'''
+
+def migrate_legacy_proxies_table(cursor):
+    """
+    Переносит старую append-only таблицу (ip_port, country) в новую схему,
+    схлопывая дубликаты в одну строку со счётчиком успехов.
+    """
+    cursor.execute("ALTER TABLE proxies RENAME TO proxies_legacy")
+    cursor.execute(PROXIES_SCHEMA)
+    cursor.execute('''INSERT OR IGNORE INTO proxies (ip_port, country, ip, port, alive, success_count, success_rate)
+        SELECT legacy.ip_port, legacy.country,
+               substr(legacy.ip_port, 1, instr(legacy.ip_port, ':') - 1),
+               CAST(substr(legacy.ip_port, instr(legacy.ip_port, ':') + 1) AS INTEGER),
+               1, latest.total, 1.0
+        FROM proxies_legacy AS legacy
+        JOIN (SELECT MAX(id) AS id, COUNT(*) AS total FROM proxies_legacy GROUP BY ip_port) AS latest
+            ON legacy.id = latest.id''')
+    cursor.execute("DROP TABLE proxies_legacy")
+    logging.info("Migrated legacy proxies table to the history schema")
+
+def setup_database():
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(proxies)")]
+    if columns and "protocol" not in columns:
+        migrate_legacy_proxies_table(cursor)
+    elif columns:
+        for column in ("last_connect_time", "last_ttfb"):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE proxies ADD COLUMN {column} REAL")
+    cursor.execute(PROXIES_SCHEMA)
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_proxies_endpoint ON proxies (ip, port, protocol)")
+    # Covering the "fastest alive" queries with and without a country filter
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_proxies_country_latency ON proxies (protocol, country, alive, last_latency)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_proxies_latency ON proxies (protocol, alive, last_latency)")
+    cursor.execute(CHECKPOINTS_SCHEMA)
+    conn.commit()
+    conn.close()
+    country_cache.setup()
+
+def use_database(path):
+    """
+    Переключает базу прокси и кэш стран на другой файл (до ``setup_database``).
+    """
+    global DB_NAME, country_cache
+    DB_NAME = path
+    country_cache = CountryCache(path, writer=lambda: db_writer)
+
+# Shared writer used while a check run is active; None means direct writes
+db_writer = None
+_db_writer_lock = threading.Lock()
+
+def start_database_writer():
+    global db_writer
+    with _db_writer_lock:
+        if db_writer is not None and db_writer.is_alive():
+            return False
+        db_writer = DatabaseWriter(DB_NAME)
+        db_writer.start()
+        return True
+
+def stop_database_writer():
+    global db_writer
+    with _db_writer_lock:
+        writer, db_writer = db_writer, None
+    if writer is not None:
+        writer.close()
+
+atexit.register(stop_database_writer)
+
+UPSERT_SUCCESS = f'''INSERT INTO proxies (ip_port, country, ip, port, protocol, alive, last_checked,
+        last_latency, last_connect_time, last_ttfb, success_count, failure_count, consecutive_failures, success_rate)
+    VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, ?, 1, 0, 0, 1.0)
+    ON CONFLICT (ip, port, protocol) DO UPDATE SET
+        ip_port = excluded.ip_port,
+        country = CASE WHEN excluded.country = 'Unknown' THEN country ELSE excluded.country END,
+        alive = 1,
+        last_checked = excluded.last_checked,
+        last_latency = COALESCE(excluded.last_latency, last_latency),
+        last_connect_time = COALESCE(excluded.last_connect_time, last_connect_time),
+        last_ttfb = COALESCE(excluded.last_ttfb, last_ttfb),
+        success_count = success_count + 1,
+        consecutive_failures = 0,
+        success_rate = success_rate * {1 - SUCCESS_RATE_ALPHA} + {SUCCESS_RATE_ALPHA}'''
+
+UPSERT_FAILURE = f'''INSERT INTO proxies (ip_port, country, ip, port, protocol, alive, last_checked,
+        success_count, failure_count, consecutive_failures, success_rate)
+    VALUES (?, 'Unknown', ?, ?, ?, 0, ?, 0, 1, 1, 0.0)
+    ON CONFLICT (ip, port, protocol) DO UPDATE SET
+        alive = 0,
+        last_checked = excluded.last_checked,
+        failure_count = failure_count + 1,
+        consecutive_failures = consecutive_failures + 1,
+        success_rate = success_rate * {1 - SUCCESS_RATE_ALPHA}'''
+
+def _write(sql, params, ip_port):
+    writer = db_writer
+    if writer is not None:
+        writer.execute(sql, params)
+        return True
+    try:
+        conn = sqlite3.connect(DB_NAME)
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        conn.commit()
+        conn.close()
+        return True
+    except sqlite3.Error as e:
+        logging.error(f"Failed to save {ip_port} to database: {e}")
+        return False
+
+def save_to_database(ip_port, country, protocol="", latency=None, connect_time=None, ttfb=None):
+    ip, port = split_endpoint(ip_port)
+    params = (ip_port, country, ip, port, protocol, time.time(), latency, connect_time, ttfb)
+    if _write(UPSERT_SUCCESS, params, ip_port):
+        logging.info(f"Saved to database: {ip_port} | {country}")
+
+def record_failure(ip_port, protocol=""):
+    ip, port = split_endpoint(ip_port)
+    _write(UPSERT_FAILURE, (ip_port, ip, port, protocol, time.time()), ip_port)
+
+def get_fastest_proxies(protocol, country=None, limit=10):
+    """
+    Самые быстрые живые прокси протокола (и страны), отвечает по индексу.
+    """
+    sql = "SELECT ip_port, country, last_latency, success_rate FROM proxies WHERE protocol = ? AND alive = 1"
+    params = [protocol]
+    if country is not None:
+        sql += " AND country = ?"
+        params.append(country)
+    sql += " AND last_latency IS NOT NULL ORDER BY last_latency LIMIT ?"
+    params.append(limit)
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+def iter_proxy_rows(protocol=None, country=None, max_latency=None, min_success_rate=None,
+                    alive=True, batch_size=1000):
+    """
+    Строки для экспорта ``(proxy, protocol, country, latency_ms, success_rate,
+    last_checked)``, прямо из курсора: фильтры уходят в запрос, в памяти не
+    больше ``batch_size`` строк. ``max_latency`` в секундах.
+    """
+    sql = ("SELECT ip_port, protocol, country, last_latency * 1000, success_rate, last_checked "
+           "FROM proxies WHERE 1")
+    params = []
+    alive = int(alive) if alive is not None else None
+    for column, value in (("protocol", protocol), ("country", country), ("alive", alive)):
+        if value is not None:
+            sql += f" AND {column} = ?"
+            params.append(value)
+    if max_latency is not None:
+        sql += " AND last_latency <= ?"
+        params.append(max_latency)
+    if min_success_rate is not None:
+        sql += " AND success_rate >= ?"
+        params.append(min_success_rate)
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+# === Pooled HTTP sessions ===
+GEO_API_URL = "http://ip-api.com/json/{ip}"
+_sessions = threading.local()
+
+def get_http_session():
+    """
+    Keep-alive session owned by the calling worker thread, for the geo and
+    control endpoints. Requests through a proxy use ``fetch_through_proxy``.
+    """
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        import requests  # ~80 ms to import; only paid once a check or lookup runs
+        session = _sessions.session = requests.Session()
+    return session
+
+def fetch_through_proxy(url, proxies, timeout=5):
+    """
+    One GET through a proxy on a session of its own. A pooled session keeps a
+    ProxyManager with open sockets for every proxy it has seen, so a long
+    list would pile them up on each worker thread.
+    """
+    import requests
+    with requests.Session() as session:
+        return session.get(url, proxies=proxies, timeout=timeout)
+
+# === Judges ===
+JUDGE_URLS = [url for url in os.environ.get("PROXY_CHECKER_JUDGES", "").split(",") if url.strip()] or DEFAULT_JUDGES
+judge_pool = JudgePool(JUDGE_URLS)
+real_ip = os.environ.get("PROXY_CHECKER_REAL_IP")
+
+def get_real_ip():
+    """
+    Наш внешний IP для определения прозрачных прокси; определяется один раз.
+    """
+    global real_ip
+    if real_ip is None:
+        real_ip = detect_real_ip(judge_pool.urls) or ""
+    return real_ip or None
+
+def describe_working(proxy, country, judge_body=None, ip=None, timings=None):
+    result = f"{proxy} is working | Country: {country}"
+    if judge_body:
+        result += f" | Anonymity: {classify_anonymity(judge_body, real_ip or None, ip)}"
+    if timings is not None:
+        result += format_latency(timings.total, timings.connect, timings.ttfb)
+    return result
+
+def check_http_tunnel(ip, port, target, timeout=5):
+    """
+    Облегчённая проверка: только CONNECT-туннель, без TLS и запроса к цели.
+    """
+    host, target_port = target
+    with socket.create_connection((ip, port), timeout=timeout) as sock:
+        sock.sendall(f"CONNECT {host}:{target_port} HTTP/1.1\r\nHost: {host}:{target_port}\r\n\r\n".encode())
+        status_line = sock.recv(1024).split(b"\r\n", 1)[0]
+    parts = status_line.split()
+    if len(parts) < 2 or parts[1] != b"200":
+        raise ConnectionError(f"CONNECT returned {status_line.decode('latin-1')!r}")
+
+def check_proxy(proxy, protocol, check_mode="full"):
+    logging.debug(f"Checking proxy: {proxy} with protocol: {protocol}")
+    try:
+        ip, port = proxy.split(":")
+        port = int(port)
+
+        if protocol == "http":
+            proxies = {"http": f"http://{proxy}", "https": f"http://{proxy}"}
+            judge = judge_pool.next()
+            judge_body = None
+            ttfb = None
+            try:
+                started = time.perf_counter()
+                if check_mode == "connect":
+                    check_http_tunnel(ip, port, judge_address(urlsplit(judge)))
+                else:
+                    response = fetch_through_proxy(judge, proxies)
+                    if response.status_code != 200:
+                        raise ConnectionError(f"Judge returned {response.status_code}")
+                    # requests stops the clock once the response headers are parsed
+                    ttfb = response.elapsed.total_seconds()
+                    try:
+                        judge_body = response.json()
+                    except ValueError:
+                        judge_body = None
+                timings = CheckTimings(connect=None, ttfb=ttfb, total=time.perf_counter() - started)
+                country = get_country_by_ip(ip)
+                save_to_database(proxy, country, protocol, timings.total, timings.connect, timings.ttfb)
+                result = describe_working(proxy, country, judge_body, ip, timings)
+                logging.info(result)
+                return result
+            except Exception as e:
+                logging.error(f"{proxy} HTTP check failed: {e}")
+                record_failure(proxy, protocol)
+                return f"{proxy} failed: {e}"
+
+        elif protocol in ["socks4", "socks5"]:
+            try:
+                # Own socket per check: the global default proxy is never touched,
+                # so concurrent checks and later requests calls can't be rerouted.
+                started = time.perf_counter()
+                import socks
+                sock = socks.create_connection(
+                    judge_address(urlsplit(judge_pool.next())), timeout=5,
+                    proxy_type=socks.SOCKS4 if protocol == "socks4" else socks.SOCKS5,
+                    proxy_addr=ip, proxy_port=port
+                )
+                sock.close()
+                latency = time.perf_counter() - started
+                timings = CheckTimings(connect=latency, ttfb=None, total=latency)
+                country = get_country_by_ip(ip)
+                save_to_database(proxy, country, protocol, timings.total, timings.connect, timings.ttfb)
+                result = describe_working(proxy, country, timings=timings)
+                logging.info(result)
+                return result
+            except Exception as e:
+                logging.error(f"{proxy} SOCKS check failed: {e}")
+                record_failure(proxy, protocol)
+                return f"{proxy} failed: {e}"
+
+    except ValueError:
+        logging.error(f"{proxy} has invalid format")
+        return f"{proxy} failed: Invalid format"
+    except Exception as e:
+        logging.critical(f"Unexpected error with {proxy}: {e}")
+        return f"{proxy} failed: {e}"
+
+# === Incremental re-check ===
+RECHECK_FRESH_FOR = 30 * 60
+RECHECK_BACKOFF_BASE = 10 * 60
+RECHECK_BACKOFF_MAX = 7 * 24 * 3600
+
+def recheck_backoff(consecutive_failures):
+    return min(RECHECK_BACKOFF_BASE * 2 ** (consecutive_failures - 1), RECHECK_BACKOFF_MAX)
+
+def plan_incremental_check(proxies, protocol, now=None):
+    """
+    Делит список на то, что нужно проверить, и готовые вердикты из истории.
+
+    Recently verified proxies reuse their stored verdict, repeatedly dead ones
+    wait out an exponential backoff, and the rest is ordered so that proxies
+    with the best history are checked first.
+    """
+    now = time.time() if now is None else now
+    # "auto" history is what the endpoint was found to speak
+    protocols = PROTOCOLS if protocol == "auto" else (protocol,)
+    sql = ("SELECT protocol, country, alive, last_checked, last_latency, consecutive_failures, success_rate "
+           f"FROM proxies WHERE ip = ? AND port = ? AND protocol IN ({', '.join('?' * len(protocols))})")
+    to_check = []
+    cached_results = []
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        for proxy in proxies:
+            try:
+                ip, port = split_endpoint(proxy)
+                rows = conn.execute(sql, (ip, port) + protocols).fetchall()
+            except (ValueError, sqlite3.Error):
+                rows = []
+            rows = [row for row in rows if row[3] is not None]
+            if not rows:
+                to_check.append((0.5, float("inf"), proxy))
+                continue
+            fresh = [row for row in rows if row[2] and now - row[3] < RECHECK_FRESH_FOR]
+            waiting = [row for row in rows if not row[2] and row[5] and now - row[3] < recheck_backoff(row[5])]
+            if fresh:
+                found_as, country, _, _, last_latency, _, _ = min(
+                    fresh, key=lambda row: row[4] if row[4] is not None else float("inf")
+                )
+                result = f"{proxy} is working"
+                if protocol == "auto":
+                    result += f" | Protocol: {found_as}"
+                result += f" | Country: {country} | Cached"
+                if last_latency is not None:
+                    result += format_latency(last_latency)
+                cached_results.append(result)
+            elif len(waiting) == len(rows):
+                failures = min(row[5] for row in waiting)
+                retry_in = int(min(recheck_backoff(row[5]) - (now - row[3]) for row in waiting) // 60) + 1
+                cached_results.append(
+                    f"{proxy} failed: skipped after {failures} consecutive failures (retry in {retry_in} min)"
+                )
+            else:
+                latencies = [row[4] for row in rows if row[4] is not None]
+                to_check.append((max(row[6] for row in rows), min(latencies, default=float("inf")), proxy))
+    finally:
+        conn.close()
+    to_check.sort(key=lambda item: (-item[0], item[1]))
+    logging.info(f"Incremental check: {len(to_check)} to check, {len(cached_results)} from history")
+    return [proxy for _, _, proxy in to_check], cached_results
+
+# === Checkpoint and resume ===
+SAVE_CHECKPOINT = "INSERT OR REPLACE INTO checkpoints (run_key, proxy, result, seq) VALUES (?, ?, ?, ?)"
+
+def checkpoint_key(file_path, protocol, check_mode="full", chunk_size=1 << 20):
+    """
+    Identifies a run: the SHA-256 of the input file plus what it is checked for.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return f"{digest.hexdigest()}:{protocol}:{check_mode}"
+
+def load_checkpoint(key):
+    """
+    Результаты, сохранённые прерванным прогоном, в порядке завершения.
+    """
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        conn.execute(CHECKPOINTS_SCHEMA)  # in case setup_database was not called
+        return [row[0] for row in conn.execute(
+            "SELECT result FROM checkpoints WHERE run_key = ? ORDER BY seq", (key,)
+        )]
+    finally:
+        conn.close()
+
+def clear_checkpoint(key):
+    _write("DELETE FROM checkpoints WHERE run_key = ?", (key,), key)
+
+class CheckpointSignal:
+    """
+    Progress-signal wrapper that saves every verdict before passing it on.
+    Rows go through the database writer, which commits them in batches.
+    """
+
+    def __init__(self, key, signal=None, start=0):
+        self.key = key
+        self.signal = signal
+        self._seq = itertools.count(start)
+
+    def emit(self, result):
+        _write(SAVE_CHECKPOINT, (self.key, result.split(" ", 1)[0], result, next(self._seq)), self.key)
+        if self.signal:
+            self.signal.emit(result)
+
+PROFILE_PATH = os.environ.get("PROXY_CHECKER_PROFILE")
+
+def process_file(file_path, protocol, progress_signal=None, progress_count_signal=None,
+                 checkpoint=True, resume=True, profile=None, **options):
+    """
+    With ``checkpoint`` every verdict is saved under the file's hash. A run of
+    the same file then picks up where an interrupted one stopped (unless
+    ``resume`` is False) and the checkpoint is dropped once a run completes.
+    ``profile`` (default $PROXY_CHECKER_PROFILE) names a file for the cProfile
+    stats of the run.
+    """
+    logging.info(f"Processing proxy file: {file_path} with protocol: {protocol}")
+    key = checkpoint_key(file_path, protocol, options.get("check_mode", "full")) if checkpoint else None
+    with profiled(profile or PROFILE_PATH):
+        return process_proxies(
+            iter_proxy_file(file_path, InputStats()), protocol, progress_signal, progress_count_signal,
+            total=count_lines(file_path), normalize=False, checkpoint_key=key, resume=resume, **options
+        )
+
+def process_proxies(proxies, protocol, progress_signal=None, progress_count_signal=None, total=None,
+                    concurrency=DEFAULT_CONCURRENCY, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                    read_timeout=DEFAULT_READ_TIMEOUT, incremental=False, cancel_token=None,
+                    check_mode="full", judges=None, processes=1, normalize=True,
+                    adaptive=False, on_stats=None, checkpoint_key=None, resume=True,
+                    prefilter=False, prefilter_timeout=DEFAULT_SCAN_TIMEOUT, funnel=None, keep_failed=True):
+    """
+    Checks an in-memory list or iterator of proxies; ``process_file`` without the file.
+    Unless ``normalize`` is False the input is cleaned up and de-duplicated
+    on the fly the same way file lines are. With ``adaptive`` the number of
+    checks in flight is tuned between a few and ``concurrency``, and
+    ``on_stats`` gets the controller's ``ControllerStats`` as they change.
+    ``checkpoint_key`` turns on checkpointing, see ``process_file``. With
+    ``prefilter`` a fast TCP connect scan runs ahead of the full check and
+    only open ports are verified; a port silent for ``prefilter_timeout``
+    seconds counts as closed (None: the connect timeout). ``funnel``
+    receives the per-stage counters of single-process runs. With
+    ``keep_failed=False`` failed verdicts are only emitted, and the returned
+    list holds just the working ones.
+    """
+    if total is None and hasattr(proxies, "__len__"):
+        total = len(proxies)
+    if normalize:
+        proxies = iter_proxies(proxies)
+
+    owns_writer = start_database_writer()
+    try:
+        results = []
+        if checkpoint_key is not None:
+            if resume:
+                results = load_checkpoint(checkpoint_key)
+            else:
+                clear_checkpoint(checkpoint_key)
+            if results:
+                logging.info(f"Resuming from checkpoint: {len(results)} proxies already checked")
+                finished = {result.split(" ", 1)[0] for result in results}
+                proxies = (proxy for proxy in proxies if proxy not in finished)
+                for result in results:
+                    if progress_signal:
+                        progress_signal.emit(result)
+                if not keep_failed:
+                    results = [result for result in results if "is working" in result]
+            progress_signal = CheckpointSignal(checkpoint_key, progress_signal, start=len(results))
+
+        if incremental:
+            checked = len(results)
+            proxies, cached = plan_incremental_check(proxies, protocol)
+            total = checked + len(proxies) + len(cached)
+            for result in cached:
+                results.append(result)
+                if progress_signal:
+                    progress_signal.emit(result)
+
+        options = dict(
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            check_mode=check_mode,
+            judges=judges or judge_pool,
+            real_ip=get_real_ip() if check_mode == "full" else None,
+            country_lookup=get_country_by_ip,
+            adaptive=adaptive,
+            prefilter=prefilter,
+            prefilter_timeout=prefilter_timeout,
+        )
+        if processes > 1:
+            from sharded_checker import check_sharded
+            # Concurrency stays the total number of checks in flight
+            results = check_sharded(
+                proxies, protocol, progress_signal, progress_count_signal,
+                processes=processes, results=results, total=total, cancel_token=cancel_token,
+                on_working=save_to_database, on_failed=record_failure,
+                initializer=prepare_worker_process, initargs=(DB_NAME, geoip_path), on_stats=on_stats,
+                concurrency=max(1, concurrency // processes), keep_failed=keep_failed, **options
+            )
+        else:
+            checker = AsyncProxyChecker(
+                protocol, concurrency=concurrency,
+                on_working=save_to_database, on_failed=record_failure, on_stats=on_stats,
+                funnel=funnel, **options
+            )
+            results = asyncio.run(
+                checker.run(proxies, progress_signal, progress_count_signal, results, total=total,
+                            keep_failed=keep_failed, cancel_token=cancel_token)
+            )
+        # Stopped runs keep their checkpoint; a completed one has nothing left to resume
+        if checkpoint_key is not None and not (cancel_token is not None and cancel_token.cancelled):
+            clear_checkpoint(checkpoint_key)
+    finally:
+        if owns_writer:
+            stop_database_writer()
+    logging.info(f"Country cache: {country_cache.stats()}")
+    return results
+
+# === Offline GeoIP ===
+GEOIP_PATH = os.environ.get("PROXY_CHECKER_GEOIP", "geoip.csv")
+REMOTE_GEOIP_FALLBACK = True
+geoip_database = None
+# The file the last setup_geoip() tried, so worker processes load the same one
+geoip_path = None
+
+def setup_geoip(path=None):
+    global geoip_database, geoip_path
+    path = geoip_path = path or GEOIP_PATH
+    if not os.path.exists(path):
+        logging.info(f"No GeoIP database at {path}, using remote lookups")
+        return None
+    try:
+        geoip_database = geoip.load_database(path)
+    except (OSError, ImportError) as e:
+        logging.error(f"Failed to load GeoIP database {path}: {e}")
+    return geoip_database
+
+def prepare_worker_process(db_path=None, geoip_file=None):
+    """
+    Запускается в каждом процессе шардированной проверки: GeoIP и кэш стран
+    из тех же файлов, что у родителя (spawn не наследует ``use_database``).
+    """
+    if db_path:
+        use_database(db_path)
+    country_cache.setup()
+    setup_geoip(geoip_file)
+
+def get_country_by_ip(ip):
+    if geoip_database is not None:
+        country = geoip_database.lookup(ip)
+        if country:
+            return country
+        if not REMOTE_GEOIP_FALLBACK:
+            return "Unknown"
+    country = country_cache.get(ip)
+    if country:
+        return country
+    try:
+        response = get_http_session().get(GEO_API_URL.format(ip=ip), timeout=5)
+        data = response.json()
+        country = data.get("country", "Unknown")
+    except Exception:
+        return "Unknown"
+    # Rate-limited or failed lookups come back as "Unknown" and are retried later
+    if country != "Unknown":
+        country_cache.put(ip, country)
+    return country
+
+def sort_proxies_by_country(proxies, countries=None):
+    """
+    Сортировка прокси по названию страны. Страны из ``countries``
+    (прокси -> страна) берутся как есть, без обращения к сети.
+    """
+    sorted_proxies = defaultdict(list)
+    for proxy in proxies:
+        if countries is not None:
+            country = countries.get(proxy, "Unknown")
+        else:
+            ip = proxy.split(":")[0]
+            country = get_country_by_ip(ip)  # Используем уже существующую функцию get_country_by_ip
+        sorted_proxies[country].append(proxy)
+
+    sorted_list = []
+    for country in sorted(sorted_proxies.keys()):
+        sorted_list.extend(sorted_proxies[country])
+    if countries is None:
+        logging.info(f"Country cache: {country_cache.stats()}")
+    return sorted_list
+
+def order_working_proxies(results, ranking, sort_by="country", percentile=100, limit=None):
+    """
+    Прокси из рабочих результатов для сохранения: по стране или от быстрых к
+    медленным, при ``percentile`` < 100 только самые быстрые из них.
+    Сортируется весь список: от ``ranking`` берётся порог перцентиля по
+    гистограмме, а при ``limit`` ещё и его топ из ``limit`` самых быстрых
+    (не больше размера топа). Страна берётся из результата, так что
+    сохранение не ходит в сеть.
+    """
+    proxies = []
+    countries = {}
+    for result in results:
+        if "is working" in result:
+            latency = parse_latency(result)
+            proxy = result.split(" ", 1)[0]
+            proxies.append((math.inf if latency is None else latency, proxy))
+            countries[proxy] = result_record(result, "").get("country", "Unknown")
+    if percentile < 100:
+        cutoff = ranking.histogram.percentile(percentile)
+        proxies = [(latency, proxy) for latency, proxy in proxies if cutoff is not None and latency <= cutoff]
+    if limit:
+        fastest = {proxy for proxy, _ in ranking.fastest(percentile)[:limit]}
+        proxies = [(latency, proxy) for latency, proxy in proxies if proxy in fastest]
+    if sort_by == "latency":
+        # Без задержки (из кэша) идут в конце, в исходном порядке
+        proxies.sort(key=lambda item: item[0])
+        return [proxy for _, proxy in proxies]
+    return sort_proxies_by_country((proxy for _, proxy in proxies), countries)
+def save_sorted_proxies(file_path, proxies):
+    """
+    Сохранение отсортированных прокси в файл.
+    """
+    try:
+        with open(file_path, "w") as file:
+            for proxy in proxies:
+                file.write(proxy + "\n")
+        logging.info(f"Отсортированные прокси сохранены в {file_path}")
+    except Exception as e:
+        logging.error(f"Ошибка при сохранении прокси в файл: {e}")
+
+def export_sorted_proxies(file_path, proxies, results, protocol=""):
+    """
+    Как ``save_sorted_proxies``, но для ``.bin``, ``.jsonl`` и ``.csv`` пишет
+    и метаданные из ``results`` (результатов проверки) в формате ``proxy_export``.
+    """
+    fmt = proxy_export.format_of(file_path, default=None)
+    if fmt is None:
+        save_sorted_proxies(file_path, proxies)
+        return
+    by_proxy = {result.split(" ", 1)[0]: result for result in results if "is working" in result}
+    try:
+        written, _ = proxy_export.export_rows(
+            proxy_export.result_rows((by_proxy[proxy] for proxy in proxies if proxy in by_proxy), protocol),
+            file_path, fmt
+        )
+        logging.info(f"{written} proxies exported to {file_path}")
+    except Exception as e:
+        logging.error(f"Ошибка при сохранении прокси в файл: {e}")
@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('background.png', '.'), ('proxies.db', '.')],
-    hiddenimports=['requests', 'socks', 'bs4'],
+    hiddenimports=['requests', 'socks', 'bs4', 'proxy_checker_widgets', 'proxy_sources'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,700 @@
+"""
+PyQt5 widgets and worker threads of the desktop app.
+
+Loaded on demand by ``proxy_checker_gui``, so importing the checker never
+pulls in Qt.
+"""
+import os
+import sys
+from types import SimpleNamespace
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget, QTextEdit,
+    QFileDialog, QLabel, QComboBox, QProgressBar, QMessageBox, QStackedWidget, QSpinBox, QCheckBox,
+    QDoubleSpinBox
+)
+from PyQt5.QtCore import QThread, pyqtSignal, Qt
+from PyQt5.QtGui import QFont, QPixmap
+from latency import DEFAULT_RANKING_SIZE, LatencyRanking
+from async_checker import CancelToken, DEFAULT_CONCURRENCY
+from prefilter import DEFAULT_SCAN_TIMEOUT
+from sharded_checker import default_processes
+from proxy_checker_core import process_file, process_proxies, order_working_proxies, export_sorted_proxies
+from proxy_input import ProxyFeed, ProxyList
+from results_view import ResultBuffer, ResultsTable
+
+# .txt keeps the plain ip:port list; the others carry protocol, country and latency
+SAVE_FILTERS = "Text Files (*.txt);;Packed binary (*.bin);;JSON Lines (*.jsonl);;CSV (*.csv)"
+
+# Next to the script, or unpacked next to the exe by PyInstaller (see the spec's datas)
+BACKGROUND_IMAGE = os.path.join(
+    getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__))), "background.png"
+)
+
+class ProxySearchThread(QThread):
+    progress = pyqtSignal(str)
+    progress_count = pyqtSignal(int, int)
+    found = pyqtSignal(list)
+    completed = pyqtSignal(object)  # ProxyList
+    stop_signal = False
+
+    def __init__(self, protocol):
+        super().__init__()
+        self.protocol = protocol
+
+    def run(self):
+        try:
+            proxies = self.fetch_proxies_from_internet()
+            if not self.stop_signal:
+                self.completed.emit(proxies)
+        except Exception as e:
+            self.progress.emit(f"Error in thread execution: {str(e)}")
+
+    def stop(self):
+        self.stop_signal = True
+
+    def fetch_proxies_from_internet(self):
+        # requests and bs4 are only needed here, so they load with the first search
+        import requests
+        from bs4 import BeautifulSoup
+        from proxy_sources import fetch_sources, make_session
+
+        search_query = f"free {self.protocol} proxy list"
+        search_url = f"https://www.google.com/search?q={search_query.replace(' ', '+')}"
+        proxies = ProxyList()
+        session = make_session()
+
+        try:
+            response = session.get(search_url, timeout=10)
+            if response.status_code == 200:
+                soup = BeautifulSoup(response.text, "html.parser")
+                links = [a["href"] for a in soup.find_all("a", href=True) if "http" in a["href"]]
+
+                total_links = len(links)
+                fetched = 0
+
+                def on_source(link, found, error):
+                    nonlocal fetched
+                    fetched += 1
+                    if error is None:
+                        self.progress.emit(f"Fetched {len(found)} proxies from {link}")
+                        if found:
+                            self.found.emit(found)
+                    else:
+                        self.progress.emit(f"Failed to fetch from {link}: {str(error)}")
+                    self.progress_count.emit(fetched, total_links)
+
+                proxies = fetch_sources(
+                    links, on_source, session=session, should_stop=lambda: self.stop_signal
+                )
+        except requests.RequestException as e:
+            self.progress.emit(f"Failed to perform dynamic search: {str(e)}")
+        except Exception as e:
+            self.progress.emit(f"Unexpected error: {str(e)}")
+
+        return proxies
+
+class MainMenu(QWidget):
+    def __init__(self, stacked_widget):
+        super().__init__()
+        self.stacked_widget = stacked_widget
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout()
+        layout.setAlignment(Qt.AlignCenter)
+
+        self.background = QLabel(self)
+        pixmap = QPixmap(BACKGROUND_IMAGE)
+        if not pixmap.isNull():
+            self.background.setPixmap(pixmap)
+            self.background.setScaledContents(True)
+        else:
+            self.background.setStyleSheet("background-color: black;")
+        self.background.setGeometry(0, 0, self.width(), self.height())
+
+        self.title_label = QLabel("Proxy Checker", self)
+        self.title_label.setFont(QFont("Arial", 24, QFont.Bold))
+        self.title_label.setStyleSheet("color: white; text-align: center;")
+        self.title_label.setAlignment(Qt.AlignCenter)
+
+        self.start_button = QPushButton("Start", self)
+        self.start_button.setStyleSheet(
+            "background-color: #333; color: white; padding: 15px; border: 1px solid white; border-radius: 10px; font-size: 26px;"
+        )
+        self.start_button.setFixedHeight(60)
+        self.start_button.setFixedWidth(200)
+        self.start_button.clicked.connect(self.go_to_checker)
+
+        self.start_online_button = QPushButton("Start Online", self)
+        self.start_online_button.setStyleSheet(
+            "background-color: #333; color: white; padding: 15px; border: 1px solid white; border-radius: 10px; font-size: 26px;"
+        )
+        self.start_online_button.setFixedHeight(60)
+        self.start_online_button.setFixedWidth(200)
+        self.start_online_button.clicked.connect(self.go_to_online_checker)
+
+        self.exit_button = QPushButton("Exit", self)
+        self.exit_button.setStyleSheet(
+            "background-color: #333; color: white; padding: 15px; border: 1px solid white; border-radius: 10px; font-size: 26px;"
+        )
+        self.exit_button.setFixedHeight(60)
+        self.exit_button.setFixedWidth(200)
+        self.exit_button.clicked.connect(self.close_application)
+
+        layout.addWidget(self.title_label)
+        layout.addSpacing(20)
+        layout.addWidget(self.start_button, alignment=Qt.AlignCenter)
+        layout.addWidget(self.start_online_button, alignment=Qt.AlignCenter)
+        layout.addWidget(self.exit_button, alignment=Qt.AlignCenter)
+
+        self.setLayout(layout)
+
+    def resizeEvent(self, event):
+        self.background.setGeometry(0, 0, self.width(), self.height())
+
+    def go_to_checker(self):
+        self.stacked_widget.setCurrentIndex(1)
+
+    def go_to_online_checker(self):
+        self.stacked_widget.setCurrentIndex(2)
+
+    def close_application(self):
+        QApplication.quit()
+
+class ProxyCheckerApp(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Proxy Checker")
+        self.resize(938, 669)
+        self.setStyleSheet("border: 2px solid #333; background-color: #222;")
+        self.stacked_widget = QStackedWidget()
+
+        self.main_menu = MainMenu(self.stacked_widget)
+        self.proxy_checker = ProxyCheckerWidget(self.stacked_widget)
+        self.online_proxy_checker = OnlineProxyCheckerWidget(self.stacked_widget)
+
+        self.stacked_widget.addWidget(self.main_menu)
+        self.stacked_widget.addWidget(self.proxy_checker)
+        self.stacked_widget.addWidget(self.online_proxy_checker)
+
+        self.setCentralWidget(self.stacked_widget)
+
+class ProxyCheckerWidget(QWidget):
+    def __init__(self, stacked_widget):
+        super().__init__()
+        self.stacked_widget = stacked_widget
+        self.working_proxies = []
+        self.working_results = []
+        self.ranking = LatencyRanking()
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout()
+        layout.setAlignment(Qt.AlignCenter)
+
+        self.background = QLabel(self)
+        pixmap = QPixmap(BACKGROUND_IMAGE)
+        if not pixmap.isNull():
+            self.background.setPixmap(pixmap)
+            self.background.setScaledContents(True)
+            self.background.setStyleSheet("opacity: 0.3;")
+        else:
+            self.background.setStyleSheet("background-color: black;")
+        self.background.setGeometry(0, 0, self.width(), self.height())
+
+        self.label = QLabel("Select proxy protocol:")
+        self.label.setFont(QFont("Arial", 12))
+        self.label.setStyleSheet("color: silver;")
+        layout.addWidget(self.label)
+
+        self.protocol_combo = QComboBox()
+        self.protocol_combo.addItems(["http", "socks4", "socks5", "auto"])
+        self.protocol_combo.setStyleSheet("padding: 5px; border-radius: 8px; border: 1px solid #CCCCCC; background-color: #333; color: silver;")
+        layout.addWidget(self.protocol_combo)
+
+        self.concurrency_label = QLabel("Concurrent checks:")
+        self.concurrency_label.setFont(QFont("Arial", 12))
+        self.concurrency_label.setStyleSheet("color: silver;")
+        layout.addWidget(self.concurrency_label)
+
+        self.concurrency_spin = QSpinBox()
+        self.concurrency_spin.setRange(1, 10000)
+        self.concurrency_spin.setValue(DEFAULT_CONCURRENCY)
+        self.concurrency_spin.setStyleSheet("padding: 5px; border-radius: 8px; border: 1px solid #CCCCCC; background-color: #333; color: silver;")
+        layout.addWidget(self.concurrency_spin)
+
+        self.adaptive_checkbox = QCheckBox("Adapt concurrent checks to the network (up to the value above)")
+        self.adaptive_checkbox.setChecked(True)
+        self.adaptive_checkbox.setStyleSheet("color: silver;")
+        layout.addWidget(self.adaptive_checkbox)
+
+        self.processes_spin = QSpinBox()
+        self.processes_spin.setRange(1, default_processes())
+        self.processes_spin.setValue(1)
+        self.processes_spin.setPrefix("Worker processes: ")
+        self.processes_spin.setStyleSheet("padding: 5px; border-radius: 8px; border: 1px solid #CCCCCC; background-color: #333; color: silver;")
+        layout.addWidget(self.processes_spin)
+
+        self.incremental_checkbox = QCheckBox("Skip recently checked proxies")
+        self.incremental_checkbox.setStyleSheet("color: silver;")
+        layout.addWidget(self.incremental_checkbox)
+
+        self.prefilter_checkbox = QCheckBox("Quick TCP scan first, fully check only open ports")
+        self.prefilter_checkbox.setStyleSheet("color: silver;")
+        layout.addWidget(self.prefilter_checkbox)
+
+        # Short by default: a dead host costs the scan this long instead of the connect timeout
+        self.scan_timeout_spin = QDoubleSpinBox()
+        self.scan_timeout_spin.setRange(0.1, 30)
+        self.scan_timeout_spin.setSingleStep(0.5)
+        self.scan_timeout_spin.setValue(DEFAULT_SCAN_TIMEOUT)
+        self.scan_timeout_spin.setPrefix("TCP scan timeout: ")
+        self.scan_timeout_spin.setSuffix(" s")
+        self.scan_timeout_spin.setEnabled(False)
+        self.scan_timeout_spin.setStyleSheet("padding: 5px; border-radius: 8px; border: 1px solid #CCCCCC; background-color: #333; color: silver;")
+        self.prefilter_checkbox.toggled.connect(self.scan_timeout_spin.setEnabled)
+        layout.addWidget(self.scan_timeout_spin)
+
+        self.resume_checkbox = QCheckBox("Resume an interrupted check of the same file")
+        self.resume_checkbox.setChecked(True)
+        self.resume_checkbox.setStyleSheet("color: silver;")
+        layout.addWidget(self.resume_checkbox)
+
+        self.tunnel_only_checkbox = QCheckBox("HTTP: only verify the CONNECT tunnel (skip TLS)")
+        self.tunnel_only_checkbox.setStyleSheet("color: silver;")
+        layout.addWidget(self.tunnel_only_checkbox)
+
+        self.file_button = QPushButton("Load Proxy File")
+        self.file_button.setStyleSheet("background-color: #333; color: white; padding: 10px; border-radius: 8px; border: 1px solid white;")
+        self.file_button.clicked.connect(self.load_file)
+        layout.addWidget(self.file_button)
+
+        self.check_button = QPushButton("Check Proxies")
+        self.check_button.setStyleSheet("background-color: #333; color: white; padding: 10px; border-radius: 8px; border: 1px solid white;")
+        self.check_button.clicked.connect(self.start_checking)
+        layout.addWidget(self.check_button)
+
+        self.stop_button = QPushButton("Stop Check")
+        self.stop_button.setStyleSheet("background-color: #333; color: white; padding: 10px; border-radius: 8px; border: 1px solid white;")
+        self.stop_button.clicked.connect(self.stop_checking)
+        layout.addWidget(self.stop_button)
+
+        self.sort_combo = QComboBox()
+        self.sort_combo.addItems(["Sort by country", "Sort by latency"])
+        self.sort_combo.setStyleSheet("padding: 5px; border-radius: 8px; border: 1px solid #CCCCCC; background-color: #333; color: silver;")
+        layout.addWidget(self.sort_combo)
+
+        self.percentile_spin = QSpinBox()
+        self.percentile_spin.setRange(1, 100)
+        self.percentile_spin.setValue(100)
+        self.percentile_spin.setPrefix("Keep fastest ")
+        self.percentile_spin.setSuffix(" %")
+        self.percentile_spin.setStyleSheet("padding: 5px; border-radius: 8px; border: 1px solid #CCCCCC; background-color: #333; color: silver;")
+        layout.addWidget(self.percentile_spin)
+
+        self.limit_spin = QSpinBox()
+        self.limit_spin.setRange(0, DEFAULT_RANKING_SIZE)
+        self.limit_spin.setSpecialValueText("Keep any number of proxies")
+        self.limit_spin.setPrefix("Keep at most ")
+        self.limit_spin.setSuffix(" fastest")
+        self.limit_spin.setStyleSheet("padding: 5px; border-radius: 8px; border: 1px solid #CCCCCC; background-color: #333; color: silver;")
+        layout.addWidget(self.limit_spin)
+
+        self.download_button = QPushButton("Download Working Proxies")
+        self.download_button.setStyleSheet("background-color: #333; color: white; padding: 10px; border-radius: 8px; border: 1px solid white;")
+        self.download_button.clicked.connect(self.download_working_proxies)
+        self.download_button.setEnabled(False)
+        layout.addWidget(self.download_button)
+
+        self.result_box = QTextEdit()
+        self.result_box.setReadOnly(True)
+        self.result_box.setMaximumHeight(100)
+        self.result_box.setStyleSheet("border: 1px solid #CCCCCC; border-radius: 8px; padding: 5px; background-color: rgba(34, 34, 34, 0.7); color: white;")
+        layout.addWidget(self.result_box)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setStyleSheet("QProgressBar {border: 1px solid #CCCCCC; border-radius: 8px; height: 20px; background-color: #333;} QProgressBar::chunk {background-color: #666; border-radius: 8px;}")
+
+        self.results_table = ResultsTable(progress_bar=self.progress_bar)
+        self.results_table.setStyleSheet("border: 1px solid #CCCCCC; border-radius: 8px; background-color: rgba(34, 34, 34, 0.7); color: white;")
+        layout.addWidget(self.results_table)
+        layout.addWidget(self.progress_bar)
+
+        self.back_to_menu_button = QPushButton("Back to Menu")
+        self.back_to_menu_button.setStyleSheet("background-color: #333; color: white; padding: 10px; border-radius: 8px; border: 1px solid white;")
+        self.back_to_menu_button.clicked.connect(self.go_to_menu)
+        layout.addWidget(self.back_to_menu_button)
+
+        self.setLayout(layout)
+
+    def resizeEvent(self, event):
+        self.background.setGeometry(0, 0, self.width(), self.height())
+
+    def load_file(self):
+        options = QFileDialog.Options()
+        file_path, _ = QFileDialog.getOpenFileName(self, "Open Proxy File", "", "Text Files (*.txt)", options=options)
+        if file_path:
+            self.proxy_file = file_path
+            self.result_box.append(f"Loaded proxy file: {file_path}")
+
+    def start_checking(self):
+        if hasattr(self, 'proxy_file') and os.path.exists(self.proxy_file):
+            protocol = self.protocol_combo.currentText()
+            self.result_box.append("Starting proxy check...")
+            self.progress_bar.setValue(0)
+            self.progress_bar.setTextVisible(False)
+            self.ranking = LatencyRanking()
+            self.results_table.results_model.clear()
+
+            self.thread = ProxyCheckerThread(
+                self.proxy_file, protocol, self.concurrency_spin.value(),
+                incremental=self.incremental_checkbox.isChecked(),
+                check_mode="connect" if self.tunnel_only_checkbox.isChecked() else "full",
+                processes=self.processes_spin.value(), adaptive=self.adaptive_checkbox.isChecked(),
+                resume=self.resume_checkbox.isChecked(), prefilter=self.prefilter_checkbox.isChecked(),
+                prefilter_timeout=self.scan_timeout_spin.value()
+            )
+            self.thread.progress.connect(self.result_box.append)
+            self.thread.completed.connect(self.save_working_proxies)
+            self.results_table.follow(self.thread.buffer, protocol, self.update_results)
+            self.thread.finished.connect(self.results_table.finish)
+            self.thread.start()
+        else:
+            self.result_box.append("No valid proxy file loaded.")
+
+    def stop_checking(self):
+        if hasattr(self, 'thread') and self.thread.isRunning():
+            self.result_box.append("Stopping proxy check...")
+            self.thread.stop()
+
+    def update_results(self, results):
+        for result in results:
+            self.ranking.add_result(result)
+
+    def save_working_proxies(self, results):
+        self.results_table.finish()
+        self.working_results = [result for result in results if "is working" in result]
+        self.working_proxies = [result.split(" ")[0] for result in self.working_results]
+        self.result_box.append(f"\nFound {len(self.working_proxies)} working proxies.")
+        self.download_button.setEnabled(True)
+
+    def download_working_proxies(self):
+        if self.working_proxies:
+            sorted_proxies = order_working_proxies(
+                self.working_results, self.ranking,
+                "latency" if self.sort_combo.currentIndex() == 1 else "country",
+                self.percentile_spin.value(), self.limit_spin.value()
+            )
+            options = QFileDialog.Options()
+            save_path, _ = QFileDialog.getSaveFileName(self, "Save Sorted Proxies", "sorted_proxies.txt", SAVE_FILTERS, options=options)
+            if save_path:
+                export_sorted_proxies(save_path, sorted_proxies, self.working_results, self.protocol_combo.currentText())
+                QMessageBox.information(self, "Success", f"Sorted proxies saved to {save_path}")
+
+    def go_to_menu(self):
+        self.stacked_widget.setCurrentIndex(0)
+class ProxyCheckerThread(QThread):
+    # Status messages only; results and counts go through ``buffer``
+    progress = pyqtSignal(str)
+    completed = pyqtSignal(list)  # working results only; failures stay in the bounded table
+
+    def __init__(self, file_path, protocol, concurrency=DEFAULT_CONCURRENCY, incremental=False,
+                 check_mode="full", judges=None, processes=1, proxies=None, adaptive=False,
+                 resume=True, prefilter=False, prefilter_timeout=DEFAULT_SCAN_TIMEOUT):
+        super().__init__()
+        self.file_path = file_path
+        self.proxies = proxies  # checked instead of the file when given
+        self.adaptive = adaptive
+        self.resume = resume  # file runs only: pick up an interrupted check of the same file
+        self.prefilter = prefilter
+        self.prefilter_timeout = prefilter_timeout
+        self.protocol = protocol
+        self.concurrency = concurrency
+        self.incremental = incremental
+        self.check_mode = check_mode
+        self.judges = judges
+        self.processes = processes
+        self.cancel_token = CancelToken()
+        self.buffer = ResultBuffer()
+
+    def run(self):
+        try:
+            count_signal = self.buffer.count_signal
+            options = {}
+            if isinstance(self.proxies, ProxyFeed):
+                # Search results come de-duplicated; the feed grows while it is
+                # checked, so progress is against what has been found so far
+                check, source = process_proxies, self.proxies
+                options["normalize"] = False
+                count_signal = SimpleNamespace(
+                    emit=lambda current, total: self.buffer.set_count(current, max(total or 0, len(self.proxies)))
+                )
+            elif self.proxies is not None:
+                check, source = process_proxies, self.proxies
+            else:
+                check, source = process_file, self.file_path
+            results = check(
+                source, self.protocol, self.buffer, count_signal, resume=self.resume,
+                concurrency=self.concurrency, incremental=self.incremental,
+                cancel_token=self.cancel_token, check_mode=self.check_mode,
+                judges=self.judges, processes=self.processes,
+                adaptive=self.adaptive, on_stats=self.buffer.set_stats, prefilter=self.prefilter,
+                prefilter_timeout=self.prefilter_timeout, keep_failed=False,
+                **options
+            )
+            if self.cancel_token.cancelled:
+                self.progress.emit("Check stopped.")
+            self.completed.emit(results)
+        except Exception as e:
+            self.progress.emit(f"Ошибка: {str(e)}")
+
+    def stop(self):
+        self.cancel_token.cancel()
+
+class OnlineProxyCheckerWidget(QWidget):
+    def __init__(self, stacked_widget):
+        super().__init__()
+        self.stacked_widget = stacked_widget
+        self.working_proxies = []
+        self.working_results = []
+        self.ranking = LatencyRanking()
+        self.search_thread = None
+        self.check_thread = None
+        self.found_proxies = ProxyList()
+        self.feed = None  # found proxies go here while a search is checked as it runs
+        self.initUI()
+
+    def initUI(self):
+        # Установка фонового изображения
+        self.background = QLabel(self)
+        pixmap = QPixmap(BACKGROUND_IMAGE)
+        if not pixmap.isNull():
+            self.background.setPixmap(pixmap)
+            self.background.setScaledContents(True)
+        else:
+            self.background.setStyleSheet("background-color: black;")
+        self.background.setGeometry(0, 0, self.width(), self.height())
+
+        # Настройка основного интерфейса
+        layout = QVBoxLayout()
+        layout.setAlignment(Qt.AlignCenter)
+
+        self.label = QLabel("Select proxy protocol:")
+        self.label.setFont(QFont("Arial", 12))
+        self.label.setStyleSheet("color: silver;")
+        layout.addWidget(self.label)
+
+        self.protocol_combo = QComboBox()
+        self.protocol_combo.addItems(["http", "socks4", "socks5"])
+        self.protocol_combo.setStyleSheet(
+            "padding: 5px; border-radius: 8px; border: 1px solid #CCCCCC; background-color: #333; color: silver;"
+        )
+        layout.addWidget(self.protocol_combo)
+
+        self.search_button = QPushButton("Search Proxies")
+        self.search_button.setStyleSheet(
+            "background-color: #333; color: white; padding: 10px; border-radius: 8px; border: 1px solid white;"
+        )
+        self.search_button.clicked.connect(self.start_search)
+        layout.addWidget(self.search_button)
+
+        self.stop_button = QPushButton("Stop Search")
+        self.stop_button.setStyleSheet(
+            "background-color: #333; color: white; padding: 10px; border-radius: 8px; border: 1px solid white;"
+        )
+        self.stop_button.clicked.connect(self.stop_search)
+        layout.addWidget(self.stop_button)
+
+        self.stream_checkbox = QCheckBox("Check proxies as they are found")
+        self.stream_checkbox.setChecked(True)
+        self.stream_checkbox.setStyleSheet("color: silver;")
+        layout.addWidget(self.stream_checkbox)
+
+        self.check_button = QPushButton("Check Proxies")
+        self.check_button.setStyleSheet(
+            "background-color: #333; color: white; padding: 10px; border-radius: 8px; border: 1px solid white;"
+        )
+        self.check_button.clicked.connect(self.start_checking)
+        layout.addWidget(self.check_button)
+
+        self.sort_combo = QComboBox()
+        self.sort_combo.addItems(["Sort by country", "Sort by latency"])
+        self.sort_combo.setStyleSheet(
+            "padding: 5px; border-radius: 8px; border: 1px solid #CCCCCC; background-color: #333; color: silver;"
+        )
+        layout.addWidget(self.sort_combo)
+
+        self.percentile_spin = QSpinBox()
+        self.percentile_spin.setRange(1, 100)
+        self.percentile_spin.setValue(100)
+        self.percentile_spin.setPrefix("Keep fastest ")
+        self.percentile_spin.setSuffix(" %")
+        self.percentile_spin.setStyleSheet(
+            "padding: 5px; border-radius: 8px; border: 1px solid #CCCCCC; background-color: #333; color: silver;"
+        )
+        layout.addWidget(self.percentile_spin)
+
+        self.limit_spin = QSpinBox()
+        self.limit_spin.setRange(0, DEFAULT_RANKING_SIZE)
+        self.limit_spin.setSpecialValueText("Keep any number of proxies")
+        self.limit_spin.setPrefix("Keep at most ")
+        self.limit_spin.setSuffix(" fastest")
+        self.limit_spin.setStyleSheet(
+            "padding: 5px; border-radius: 8px; border: 1px solid #CCCCCC; background-color: #333; color: silver;"
+        )
+        layout.addWidget(self.limit_spin)
+
+        self.download_button = QPushButton("Download Proxies")
+        self.download_button.setStyleSheet(
+            "background-color: #333; color: white; padding: 10px; border-radius: 8px; border: 1px solid white;"
+        )
+        self.download_button.clicked.connect(self.download_proxies)
+        self.download_button.setEnabled(False)
+        layout.addWidget(self.download_button)
+
+        self.result_box = QTextEdit()
+        self.result_box.setReadOnly(True)
+        self.result_box.setStyleSheet(
+            """
+            border: 1px solid #CCCCCC; 
+            border-radius: 8px; 
+            padding: 5px; 
+            background-color: rgba(34, 34, 34, 0.7); /* Adjust transparency to match the style */
+            color: white;
+            """
+        )
+        layout.addWidget(self.result_box)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setStyleSheet(
+            """
+            QProgressBar {
+                border: 1px solid #CCCCCC; 
+                border-radius: 8px; 
+                height: 20px; 
+                background-color: #333;
+            }
+            QProgressBar::chunk {
+                background-color: #666; 
+                border-radius: 8px;
+            }
+            """
+        )
+
+        self.results_table = ResultsTable(progress_bar=self.progress_bar)
+        self.results_table.setStyleSheet(
+            "border: 1px solid #CCCCCC; border-radius: 8px; background-color: rgba(34, 34, 34, 0.7); color: white;"
+        )
+        layout.addWidget(self.results_table)
+        layout.addWidget(self.progress_bar)
+
+        self.back_to_menu_button = QPushButton("Back to Menu")
+        self.back_to_menu_button.setStyleSheet(
+            "background-color: #333; color: white; padding: 10px; border-radius: 8px; border: 1px solid white;"
+        )
+        self.back_to_menu_button.clicked.connect(self.go_to_menu)
+        layout.addWidget(self.back_to_menu_button)
+
+        self.setLayout(layout)
+        self.background.lower()  # Убедитесь, что фон находится позади всех виджетов
+
+    def resizeEvent(self, event):
+        # Автоматическая подгонка фона под размер окна
+        self.background.setGeometry(0, 0, self.width(), self.height())
+
+    def start_search(self):
+        protocol = self.protocol_combo.currentText()
+        self.found_proxies = ProxyList()
+        self.progress_bar.setValue(0)
+        self.search_thread = ProxySearchThread(protocol)
+        self.search_thread.progress.connect(self.result_box.append)
+        self.search_thread.found.connect(self.add_found_proxies)
+        self.search_thread.completed.connect(self.save_proxies)
+        if self.stream_checkbox.isChecked() and not (self.check_thread and self.check_thread.isRunning()):
+            # The progress bar follows the check instead of the search
+            self.feed = ProxyFeed()
+            self.search_thread.finished.connect(self.close_feed)
+            self.run_check(self.feed)
+        else:
+            self.search_thread.progress_count.connect(self.update_progress_bar)
+        self.search_thread.start()
+
+    def stop_search(self):
+        if self.search_thread:
+            self.search_thread.stop()
+        self.close_feed()
+        if self.check_thread and self.check_thread.isRunning():
+            self.check_thread.stop()
+
+    def close_feed(self):
+        if self.feed is not None:
+            self.feed.close()
+            self.feed = None
+
+    def start_checking(self):
+        if self.check_thread and self.check_thread.isRunning():
+            self.result_box.append("A check is already running.")
+        elif self.found_proxies:
+            self.result_box.append(f"Checking {len(self.found_proxies)} found proxies...")
+            self.run_check(self.found_proxies)
+        else:
+            self.result_box.append("No proxies to check yet. Search first.")
+
+    def run_check(self, proxies):
+        protocol = self.protocol_combo.currentText()
+        self.progress_bar.setValue(0)
+        self.progress_bar.setTextVisible(False)
+        self.ranking = LatencyRanking()
+        self.results_table.results_model.clear()
+        self.check_thread = ProxyCheckerThread(None, protocol, proxies=proxies, adaptive=True)
+        self.check_thread.progress.connect(self.result_box.append)
+        self.check_thread.completed.connect(self.save_working_proxies)
+        self.results_table.follow(self.check_thread.buffer, protocol, self.update_results)
+        self.check_thread.finished.connect(self.results_table.finish)
+        self.check_thread.start()
+
+    def update_results(self, results):
+        for result in results:
+            self.ranking.add_result(result)
+
+    def update_progress_bar(self, current, total):
+        progress = int((current / total) * 100)
+        self.progress_bar.setValue(progress)
+
+    def add_found_proxies(self, proxies):
+        self.found_proxies.extend(proxies)
+        if self.feed is not None:
+            self.feed.add(proxies)
+
+    def save_proxies(self, proxies):
+        self.result_box.append(f"\nFound {len(proxies)} proxies.")
+
+    def save_working_proxies(self, results):
+        self.results_table.finish()
+        self.working_results = [result for result in results if "is working" in result]
+        self.working_proxies = [result.split(" ")[0] for result in self.working_results]
+        self.result_box.append(f"\nFound {len(self.working_proxies)} working proxies.")
+        self.download_button.setEnabled(True)
+
+    def download_proxies(self):
+        if self.working_proxies:
+            sorted_proxies = order_working_proxies(
+                self.working_results, self.ranking,
+                "latency" if self.sort_combo.currentIndex() == 1 else "country",
+                self.percentile_spin.value(), self.limit_spin.value()
+            )
+            options = QFileDialog.Options()
+            save_path, _ = QFileDialog.getSaveFileName(
+                self, "Save Proxies", "sorted_proxies.txt", SAVE_FILTERS, options=options
+            )
+            if save_path:
+                export_sorted_proxies(save_path, sorted_proxies, self.working_results,
+                                      self.protocol_combo.currentText())
+                QMessageBox.information(self, "Success", f"Proxies saved to {save_path}")
+
+    def go_to_menu(self):
+        self.stacked_widget.setCurrentIndex(0)
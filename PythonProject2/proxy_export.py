@@ -0,0 +1,244 @@
+"""
+Bulk export of checked proxies: packed columnar binary, JSON lines and CSV.
+
+Rows come from ``proxy_checker_core.iter_proxy_rows`` (streamed from SQLite
+with the filters in the query) or from checker result strings. Either way
+they pass through in batches, so an export never holds the whole table.
+
+The binary format is columnar. Each field is one contiguous little-endian
+array, so a consumer maps the file and reads a column with zero copies::
+
+    with ProxyColumns("proxies.bin") as export:
+        ips, ports = export.column("ip"), export.column("port")
+
+Layout: a 32-byte header (magic, version, record count, offset and length
+of the string tables), then the columns in ``COLUMNS`` order, each starting
+on an 8-byte boundary, then the string tables as JSON. ``protocol`` and
+``country`` are indexes into those tables, like the country codes in
+``geoip``. Only IPv4 endpoints fit the ``ip`` column; others are counted and
+left out of binary exports. ``ProxyColumns`` expects a little-endian host.
+"""
+import csv
+import json
+import math
+import mmap
+import shutil
+import socket
+import struct
+import sys
+import tempfile
+from array import array
+
+from check_results import result_record
+
+MAGIC = b"PXEX"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQQ")  # magic, version, reserved, count, tables offset, tables length
+# (name, array typecode); latency is NaN where unknown, checked_at in Unix seconds
+COLUMNS = (
+    ("ip", "I"),
+    ("port", "H"),
+    ("protocol", "B"),
+    ("country", "H"),
+    ("latency_ms", "f"),
+    ("success_rate", "f"),
+    ("checked_at", "I"),
+)
+FORMATS = ("bin", "jsonl", "csv")
+FIELDS = ("proxy", "protocol", "country", "latency_ms", "success_rate", "checked_at")
+DEFAULT_BATCH_SIZE = 65536
+
+_unpack_ip = struct.Struct("!I").unpack
+_pack_ip = struct.Struct("!I").pack
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def format_of(path, default="jsonl"):
+    """
+    Export format from a file name: ``.bin``, ``.jsonl`` or ``.csv``.
+    """
+    extension = path.rsplit(".", 1)[-1].lower() if "." in path else ""
+    return extension if extension in FORMATS else default
+
+
+def result_rows(results, protocol):
+    """
+    Export rows of checker result strings; failed results are skipped.
+    """
+    for result in results:
+        record = result_record(result, protocol)
+        if record["status"] != "working":
+            continue
+        latency = record.get("latency_ms")
+        yield (record["proxy"], record["protocol"], record.get("country", ""),
+               float(latency) if latency is not None else None, None, int(record["checked_at"]))
+
+
+class _Indexer:
+    def __init__(self):
+        self.values = []
+        self._index = {}
+
+    def __call__(self, value):
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+
+def write_binary(rows, file, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Writes rows to a seekable binary file; returns ``(written, skipped)``.
+    Columns are spilled to temporary files batch by batch and joined at the end.
+    """
+    protocols, countries = _Indexer(), _Indexer()
+    spills = [tempfile.TemporaryFile() for _ in COLUMNS]
+    written = skipped = 0
+    try:
+        batch = [array(typecode) for _, typecode in COLUMNS]
+        for proxy, protocol, country, latency, success_rate, checked_at in rows:
+            host, _, port = proxy.rpartition(":")
+            try:
+                address = _unpack_ip(socket.inet_aton(host))[0]
+            except OSError:
+                skipped += 1
+                continue
+            if host.count(".") != 3:  # inet_aton also takes "127.1"
+                skipped += 1
+                continue
+            values = (
+                address, int(port), protocols(protocol or ""), countries(country or ""),
+                math.nan if latency is None else latency,
+                math.nan if success_rate is None else success_rate,
+                int(checked_at or 0),
+            )
+            for column, value in zip(batch, values):
+                column.append(value)
+            written += 1
+            if len(batch[0]) >= batch_size:
+                _spill(batch, spills)
+        _spill(batch, spills)
+
+        file.write(HEADER.pack(MAGIC, VERSION, 0, written, 0, 0))
+        for spill in spills:
+            file.write(b"\0" * (_align(file.tell()) - file.tell()))
+            spill.seek(0)
+            shutil.copyfileobj(spill, file)
+        tables = json.dumps({"protocols": protocols.values, "countries": countries.values}).encode()
+        tables_offset = file.tell()
+        file.write(tables)
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, 0, written, tables_offset, len(tables)))
+        file.seek(0, 2)
+    finally:
+        for spill in spills:
+            spill.close()
+    return written, skipped
+
+
+def _spill(batch, spills):
+    for column, spill in zip(batch, spills):
+        if sys.byteorder == "big":
+            column.byteswap()
+        column.tofile(spill)
+        del column[:]
+
+
+def write_jsonl(rows, file):
+    written = 0
+    for row in rows:
+        file.write(json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + "\n")
+        written += 1
+    return written, 0
+
+
+def write_csv(rows, file):
+    writer = csv.writer(file)
+    writer.writerow(FIELDS)
+    written = 0
+    for row in rows:
+        writer.writerow(["" if value is None else value for value in row])
+        written += 1
+    return written, 0
+
+
+def export_rows(rows, path, fmt=None):
+    """
+    Writes export rows to ``path`` in ``fmt`` (default: from the extension);
+    returns ``(written, skipped)``.
+    """
+    fmt = fmt or format_of(path)
+    if fmt == "bin":
+        with open(path, "wb") as file:
+            return write_binary(rows, file)
+    with open(path, "w", encoding="utf-8", newline="" if fmt == "csv" else None) as file:
+        return write_csv(rows, file) if fmt == "csv" else write_jsonl(rows, file)
+
+
+class ProxyColumns:
+    """
+    Memory-mapped reader of a binary export. ``column(name)`` is a typed
+    ``memoryview`` straight into the mapping; release the views (or leave the
+    ``with`` block, which does) before the file is closed.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._views = []
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError(f"{path} is not a proxy export")
+        header = HEADER.unpack_from(self._map) if len(self._map) >= HEADER.size else (None,) * 6
+        magic, version, _, self.count, tables_offset, tables_length = header
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} proxy export")
+        tables = json.loads(self._map[tables_offset:tables_offset + tables_length])
+        self.protocols = tables["protocols"]
+        self.countries = tables["countries"]
+        self._offsets = {}
+        offset = HEADER.size
+        for name, typecode in COLUMNS:
+            offset = _align(offset)
+            self._offsets[name] = (offset, typecode)
+            offset += self.count * array(typecode).itemsize
+
+    def __len__(self):
+        return self.count
+
+    def column(self, name):
+        offset, typecode = self._offsets[name]
+        size = self.count * array(typecode).itemsize
+        view = memoryview(self._map)[offset:offset + size]
+        self._views.append(view)
+        typed = view.cast(typecode)
+        self._views.append(typed)
+        return typed
+
+    def __iter__(self):
+        """
+        ``(proxy, protocol, country, latency_ms, success_rate, checked_at)`` per record.
+        """
+        columns = [self.column(name) for name, _ in COLUMNS]
+        for ip, port, protocol, country, latency, success_rate, checked_at in zip(*columns):
+            yield (f"{socket.inet_ntoa(_pack_ip(ip))}:{port}", self.protocols[protocol], self.countries[country],
+                   None if math.isnan(latency) else latency,
+                   None if math.isnan(success_rate) else success_rate, checked_at)
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,263 @@
+"""
+Streaming proxy list reader.
+
+Lines are parsed, validated and de-duplicated one at a time, so a list with
+tens of millions of lines never has to be held in memory. IPv4 endpoints are
+remembered as packed ``ip << 16 | port`` ints; anything else (hostnames,
+credentials) falls back to a set of strings.
+"""
+import asyncio
+import logging
+import queue
+import re
+from array import array
+import socket
+import struct
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+SCHEMES = ("http", "https", "socks4", "socks4a", "socks5", "socks5h")
+
+_HOSTNAME_RE = re.compile(r"^(?=.{1,253}$)[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?(?:\.[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?)*$")
+_IPV4_PORT_RE = re.compile(r"\s*(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3}):(\d{1,5})\s*$")
+_NUMERIC_HOST_RE = re.compile(r"^[\d.]+$")
+_unpack_ip = struct.Struct("!I").unpack
+
+ProxyEndpoint = namedtuple("ProxyEndpoint", "host port scheme username password")
+
+
+def pack_endpoint(host, port):
+    """
+    ``ip << 16 | port`` for dotted IPv4 hosts, ``None`` for anything else.
+    """
+    if host.count(".") != 3:
+        return None
+    try:
+        return _unpack_ip(socket.inet_aton(host))[0] << 16 | port
+    except OSError:
+        return None
+
+
+def unpack_endpoint(packed):
+    return f"{socket.inet_ntoa(struct.pack('!I', packed >> 16))}:{packed & 0xFFFF}"
+
+
+def parse_proxy_line(line):
+    """
+    Parses ``host:port`` or ``scheme://[user:pass@]host:port``.
+    Returns a ``ProxyEndpoint`` or ``None`` when the line is not a proxy.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    scheme = username = password = None
+    if "://" in line:
+        try:
+            parts = urlsplit(line)
+            scheme = parts.scheme.lower()
+            host, port = parts.hostname, parts.port
+        except ValueError:
+            return None
+        if scheme not in SCHEMES:
+            return None
+        username, password = parts.username, parts.password
+    else:
+        host, _, port = line.rpartition(":")
+        if not port.isdigit():
+            return None
+        port = int(port)
+    if not host or not port or not 0 < port < 65536:
+        return None
+    if pack_endpoint(host, port) is None:
+        if _NUMERIC_HOST_RE.match(host) or not _HOSTNAME_RE.match(host):
+            return None
+    return ProxyEndpoint(host, port, scheme, username, password)
+
+
+def format_endpoint(endpoint):
+    if endpoint.scheme is None and endpoint.username is None:
+        return f"{endpoint.host}:{endpoint.port}"
+    credentials = ""
+    if endpoint.username is not None:
+        credentials = endpoint.username
+        if endpoint.password is not None:
+            credentials += f":{endpoint.password}"
+        credentials += "@"
+    return f"{endpoint.scheme or 'http'}://{credentials}{endpoint.host}:{endpoint.port}"
+
+
+def split_endpoint(proxy):
+    """
+    ``(host, port)`` of an ``ip:port`` or URL-form proxy string.
+    """
+    if "://" in proxy:
+        parts = urlsplit(proxy)
+        return parts.hostname, parts.port
+    host, port = proxy.rsplit(":", 1)
+    return host, int(port)
+
+
+class InputStats:
+    def __init__(self):
+        self.lines = 0
+        self.valid = 0
+        self.duplicates = 0
+        self.invalid = 0
+
+    def __repr__(self):
+        return (f"lines={self.lines} valid={self.valid} "
+                f"duplicates={self.duplicates} invalid={self.invalid}")
+
+
+def iter_proxies(lines, stats=None, seen=None):
+    """
+    Yields normalized, unique proxy strings from an iterable of lines.
+    """
+    stats = stats if stats is not None else InputStats()
+    packed_seen = seen if seen is not None else set()
+    other_seen = set()
+    match_ipv4 = _IPV4_PORT_RE.match
+    for line in lines:
+        stats.lines += 1
+        # Fast path for the common bare "ip:port" line
+        match = match_ipv4(line)
+        if match:
+            a, b, c, d, port = map(int, match.groups())
+            if a < 256 and b < 256 and c < 256 and d < 256 and 0 < port < 65536:
+                packed = (a << 24 | b << 16 | c << 8 | d) << 16 | port
+                if packed in packed_seen:
+                    stats.duplicates += 1
+                    continue
+                packed_seen.add(packed)
+                stats.valid += 1
+                yield f"{a}.{b}.{c}.{d}:{port}"
+                continue
+        endpoint = parse_proxy_line(line)
+        if endpoint is None:
+            if line.strip():
+                stats.invalid += 1
+            continue
+        proxy = format_endpoint(endpoint)
+        packed = pack_endpoint(endpoint.host, endpoint.port) if endpoint.username is None else None
+        if packed is not None:
+            if packed in packed_seen:
+                stats.duplicates += 1
+                continue
+            packed_seen.add(packed)
+        else:
+            if proxy in other_seen:
+                stats.duplicates += 1
+                continue
+            other_seen.add(proxy)
+        stats.valid += 1
+        yield proxy
+
+
+class ProxyList:
+    """
+    Append-only list of normalized proxy strings, kept compact in memory:
+    bare IPv4 ``ip:port`` entries take 8 bytes each in an ``array('Q')``,
+    anything else is kept as a string. Iterates IPv4 entries first.
+    """
+
+    def __init__(self, proxies=()):
+        self.packed = array("Q")
+        self.other = []
+        self.extend(proxies)
+
+    def append(self, proxy):
+        match = _IPV4_PORT_RE.match(proxy)
+        packed = pack_endpoint(*split_endpoint(proxy.strip())) if match else None
+        if packed is None:
+            self.other.append(proxy)
+        else:
+            self.packed.append(packed)
+
+    def extend(self, proxies):
+        for proxy in proxies:
+            self.append(proxy)
+
+    def __len__(self):
+        return len(self.packed) + len(self.other)
+
+    def __iter__(self):
+        for packed in self.packed:
+            yield unpack_endpoint(packed)
+        yield from self.other
+
+
+class ProxyFeed:
+    """
+    Proxies handed to a check that is already running, for example by the
+    online search as each source page arrives. ``add`` and ``close`` may be
+    called from any thread. The checker iterates it asynchronously, so the
+    event loop keeps running while the feed waits; a plain ``for`` loop
+    blocks instead, which suits a sharded run's feeder thread. ``len`` is
+    the number of proxies added so far.
+    """
+
+    POLL_INTERVAL = 0.2  # a stopped check leaves no executor thread waiting longer
+
+    def __init__(self):
+        self.added = 0
+        self._batches = queue.Queue()
+
+    def add(self, proxies):
+        proxies = list(proxies)
+        if proxies:
+            self.added += len(proxies)
+            self._batches.put(proxies)
+
+    def close(self):
+        self._batches.put(None)
+
+    def __len__(self):
+        return self.added
+
+    def _next_batch(self, timeout=None):
+        batch = self._batches.get(timeout=timeout)
+        if batch is None:
+            self._batches.put(None)  # later readers see the end too
+        return batch
+
+    def __iter__(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            yield from batch
+
+    async def __aiter__(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                batch = await loop.run_in_executor(None, self._next_batch, self.POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if batch is None:
+                return
+            for proxy in batch:
+                yield proxy
+
+
+def iter_proxy_file(file_path, stats=None):
+    with open(file_path, "r", encoding="utf-8", errors="replace") as file:
+        yield from iter_proxies(file, stats)
+    if stats is not None:
+        logging.info(f"Read {file_path}: {stats}")
+
+
+def count_lines(file_path, chunk_size=1 << 20):
+    """
+    Upper bound for progress reporting, counted without decoding the file.
+    """
+    count = 0
+    last = b"\n"
+    with open(file_path, "rb") as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            count += chunk.count(b"\n")
+            last = chunk[-1:]
+    return count + (last != b"\n")
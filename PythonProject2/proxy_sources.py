@@ -0,0 +1,84 @@
+"""
+Concurrent download of proxy list pages.
+
+Sources are fetched in parallel over one pooled ``requests.Session`` and each
+page is reduced to ``ip:port`` pairs with a compiled regex as soon as it
+arrives, so HTML around the list never reaches the checker.
+"""
+import logging
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from proxy_input import ProxyList, iter_proxies
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36"
+DEFAULT_FETCH_WORKERS = 16
+DEFAULT_FETCH_TIMEOUT = 10
+# How often a running fetch looks at ``should_stop``
+STOP_POLL_INTERVAL = 0.2
+
+# "1.2.3.4:8080" in plain lists and "1.2.3.4</td><td>8080" in HTML tables
+PROXY_RE = re.compile(
+    r"(?<![\d.])(\d{1,3}(?:\.\d{1,3}){3})(?:\s*:\s*|\s*</td>\s*<td[^>]*>\s*)(\d{2,5})(?!\d)"
+)
+
+
+def extract_proxies(text, seen=None):
+    """
+    Unique, validated ``ip:port`` strings found anywhere in ``text``.
+    """
+    return list(iter_proxies((f"{ip}:{port}" for ip, port in PROXY_RE.findall(text)), seen=seen))
+
+
+def make_session(pool_size=DEFAULT_FETCH_WORKERS):
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_sources(links, on_source=None, session=None, max_workers=DEFAULT_FETCH_WORKERS,
+                  timeout=DEFAULT_FETCH_TIMEOUT, should_stop=None):
+    """
+    Downloads ``links`` concurrently and returns all unique proxies found
+    as a compact ``ProxyList``.
+
+    ``on_source(link, proxies, error)`` is called from the calling thread for
+    every finished source, in completion order, with only the proxies that
+    source added. Once ``should_stop()`` returns true the call returns within
+    ``STOP_POLL_INTERVAL``; downloads in flight finish in the background.
+    """
+    session = session or make_session(max_workers)
+    seen = set()
+    found = ProxyList()
+
+    def fetch(link):
+        response = session.get(link, timeout=timeout)
+        response.raise_for_status()
+        return response.text
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        pending = {executor.submit(fetch, link): link for link in links}
+        while pending and not (should_stop and should_stop()):
+            done, _ = wait(pending, timeout=STOP_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                link = pending.pop(future)
+                try:
+                    proxies = extract_proxies(future.result(), seen)
+                    error = None
+                except Exception as e:
+                    proxies, error = [], e
+                    logging.error(f"Failed to fetch from {link}: {e}")
+                found.extend(proxies)
+                if on_source:
+                    on_source(link, proxies, error)
+    finally:
+        # Not waiting: a stop must not sit out the request timeout
+        executor.shutdown(wait=False, cancel_futures=True)
+    return found
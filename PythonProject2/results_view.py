@@ -0,0 +1,195 @@
+"""
+Batched, bounded result table for the desktop app.
+
+Checker threads used to emit one Qt signal per result, and each one became a
+``QTextEdit.append``: on long runs the UI thread fell behind and the window
+froze. Now the checker writes into a ``ResultBuffer`` under a lock, and
+``ResultsTable`` drains it on a timer, inserting each batch into the model with
+a single ``beginInsertRows`` call. The model keeps only the last
+``history`` rows, so memory use and repaint cost stay flat however long the
+run is. The view only paints the rows that are visible.
+"""
+import threading
+from collections import deque
+from types import SimpleNamespace
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt, QTimer
+from PyQt5.QtWidgets import QAbstractItemView, QHeaderView, QTableView
+
+from adaptive_concurrency import format_stats
+from check_results import result_record
+
+DEFAULT_HISTORY = 50000
+FLUSH_INTERVAL_MS = 100
+
+COLUMNS = ("Proxy", "Status", "Latency", "Country")
+
+
+class ResultBuffer:
+    """
+    Stands in for the progress signals of ``process_file``. Results and the
+    latest progress count wait here until the GUI thread drains them.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.results = []
+        self.count = None
+        self.count_signal = SimpleNamespace(emit=self.set_count)
+        self.stats = None  # latest ControllerStats of an adaptive run
+
+    def emit(self, result):
+        with self.lock:
+            self.results.append(result)
+
+    def set_count(self, current, total):
+        # Only the latest value matters to a progress bar
+        self.count = (current, total)
+
+    def set_stats(self, stats):
+        self.stats = stats
+
+    def drain(self):
+        """
+        Returns the buffered results and the latest count; clears the results.
+        """
+        with self.lock:
+            results, self.results = self.results, []
+        return results, self.count
+
+
+def result_row(result, protocol=""):
+    """
+    ``(proxy, status, latency ms or None, country)`` of a checker result string.
+    """
+    record = result_record(result, protocol)
+    if record["status"] == "failed":
+        status = f"failed: {record['error']}"
+    else:
+        status = "working"
+        if record["protocol"] != protocol:
+            status += f" as {record['protocol']}"  # found by an "auto" check
+        if "anonymity" in record:
+            status += f", {record['anonymity']}"
+    return record["proxy"], status, record.get("latency_ms"), record.get("country", "")
+
+
+class ResultsModel(QAbstractTableModel):
+    """
+    Last ``history`` results as rows; older rows drop off the top.
+    """
+
+    def __init__(self, history=DEFAULT_HISTORY, parent=None):
+        super().__init__(parent)
+        self.rows = deque(maxlen=history)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self.rows[index.row()][index.column()]
+        if role == Qt.DisplayRole:
+            if index.column() == 2:
+                return "" if value is None else f"{value} ms"
+            return value
+        if role == Qt.UserRole:
+            # Sort key: floats throughout (Qt compares int and double variants
+            # inconsistently); proxies without a latency go last
+            if index.column() == 2:
+                return float("inf") if value is None else float(value)
+            return value
+        return None
+
+    def add_results(self, results, protocol=""):
+        rows = [result_row(result, protocol) for result in results]
+        maxlen = self.rows.maxlen
+        if maxlen is not None and len(rows) > maxlen:
+            rows = rows[-maxlen:]
+        overflow = len(self.rows) + len(rows) - maxlen if maxlen is not None else 0
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self.rows.popleft()
+            self.endRemoveRows()
+        if rows:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows.clear()
+        self.endResetModel()
+
+
+class ResultsTable(QTableView):
+    """
+    Sortable table that follows a ``ResultBuffer`` while a check runs.
+    """
+
+    def __init__(self, history=DEFAULT_HISTORY, progress_bar=None, parent=None):
+        super().__init__(parent)
+        self.results_model = ResultsModel(history, self)
+        self.sorted_model = QSortFilterProxyModel(self)
+        self.sorted_model.setSourceModel(self.results_model)
+        self.sorted_model.setSortRole(Qt.UserRole)
+        self.setModel(self.sorted_model)
+        self.setSortingEnabled(True)
+        self.sortByColumn(-1, Qt.AscendingOrder)  # arrival order until a header is clicked
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.verticalHeader().setVisible(False)
+        # Fixed row heights and header widths, so Qt never measures every row
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.horizontalHeader().setStretchLastSection(True)
+        self.progress_bar = progress_bar
+        self.buffer = None
+        self.protocol = ""
+        self.on_results = None
+        self.timer = QTimer(self)
+        self.timer.setInterval(FLUSH_INTERVAL_MS)
+        self.timer.timeout.connect(self.flush)
+
+    def follow(self, buffer, protocol="", on_results=None):
+        """
+        Starts draining ``buffer``; ``on_results(batch)`` sees each batch.
+        """
+        self.flush()
+        self.buffer = buffer
+        self.protocol = protocol
+        self.on_results = on_results
+        self.timer.start()
+
+    def finish(self):
+        """
+        Drains what is left and stops the timer.
+        """
+        self.flush()
+        self.timer.stop()
+        self.buffer = None
+
+    def flush(self):
+        if self.buffer is None:
+            return
+        results, count = self.buffer.drain()
+        if results:
+            self.results_model.add_results(results, self.protocol)
+            if self.on_results:
+                self.on_results(results)
+        if count and self.progress_bar is not None:
+            current, total = count
+            self.progress_bar.setValue(int(current / total * 100) if total else 0)
+        if self.buffer.stats is not None and self.progress_bar is not None:
+            self.progress_bar.setFormat(f"%p% | {format_stats(self.buffer.stats)}")
+            self.progress_bar.setTextVisible(True)
@@ -0,0 +1,252 @@
+"""
+Multi-process sharded checking for very large lists.
+
+One process spends much of its time in the GIL on parsing, logging and result
+handling long before the network is saturated. Here the parent only reads the
+list and hands it out in small chunks through one shared queue, and each
+worker process runs its own ``AsyncProxyChecker``. A worker pulls its next
+chunk as soon as it has room for more, so a shard that hits a run of slow
+proxies just takes fewer chunks, and the load evens out the way work stealing
+would without per-shard queues.
+
+Results and ``on_working``/``on_failed`` calls travel back in batches and are
+replayed in the parent. The progress signals and database callbacks therefore
+see the same stream a single-process run would produce.
+"""
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import traceback
+
+from adaptive_concurrency import ControllerStats, combine_stats
+from async_checker import AsyncProxyChecker
+from judges import JudgePool
+
+DEFAULT_CHUNK_SIZE = 100
+# Worker-side batching of results sent back to the parent
+RESULT_BATCH_SIZE = 100
+RESULT_FLUSH_INTERVAL = 0.2
+
+
+class WorkerError(Exception):
+    """
+    A worker process crashed; the message is its traceback.
+    """
+
+
+def default_processes():
+    return os.cpu_count() or 1
+
+
+def _chunked(proxies, size):
+    iterator = iter(proxies)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class _EventBatch:
+    """
+    Worker-side buffer of events for the parent; doubles as the progress signal.
+    """
+
+    def __init__(self, result_queue):
+        self.result_queue = result_queue
+        self.events = []
+        self.lock = threading.Lock()  # callbacks arrive from executor threads
+
+    def add(self, event):
+        with self.lock:
+            self.events.append(event)
+            full = len(self.events) >= RESULT_BATCH_SIZE
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            events, self.events = self.events, []
+        if events:
+            self.result_queue.put(events)
+
+    def emit(self, result):
+        self.add(("result", result))
+
+
+def _worker_main(protocol, options, task_queue, result_queue, stop_event, initializer, initargs):
+    batch = _EventBatch(result_queue)
+    outcome = None
+    try:
+        if initializer is not None:
+            initializer(*initargs)
+        _check_chunks(protocol, options, task_queue, stop_event, batch)
+    except Exception:
+        # Sent as text: the exception itself may not pickle, and a bare None
+        # would pass for a shard that finished
+        outcome = WorkerError(f"worker process {os.getpid()} failed:\n{traceback.format_exc()}")
+    finally:
+        batch.flush()
+        result_queue.put(outcome)
+
+
+def _check_chunks(protocol, options, task_queue, stop_event, batch):
+    checker = AsyncProxyChecker(
+        protocol,
+        on_working=lambda *args: batch.add(("working", args)),
+        on_failed=lambda *args: batch.add(("failed", args)),
+        on_stats=lambda stats: batch.add(("stats", (os.getpid(), tuple(stats)))),
+        **options
+    )
+
+    async def chunks():
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await loop.run_in_executor(None, task_queue.get)
+            if chunk is None:
+                return
+            for proxy in chunk:
+                yield proxy
+
+    async def main():
+        async def flush_periodically():
+            # Polled rather than waited on: a blocked Event.wait() in a worker
+            # makes Event.set() in the parent wait for it to wake up
+            while True:
+                await asyncio.sleep(RESULT_FLUSH_INTERVAL)
+                batch.flush()
+                if stop_event.is_set():
+                    checker.stop()
+
+        flusher = asyncio.create_task(flush_periodically())
+        try:
+            await checker.run(chunks(), batch, keep_failed=False)
+        finally:
+            flusher.cancel()
+
+    asyncio.run(main())
+
+
+def check_sharded(proxies, protocol, progress_signal=None, progress_count_signal=None,
+                  processes=None, chunk_size=DEFAULT_CHUNK_SIZE, results=None, total=None,
+                  keep_failed=True, cancel_token=None, on_working=None, on_failed=None,
+                  initializer=None, initargs=(), on_stats=None, **options):
+    """
+    Checks ``proxies`` across ``processes`` worker processes.
+
+    Takes the same arguments as ``AsyncProxyChecker.run`` plus the checker
+    options; ``concurrency`` applies to each worker. ``country_lookup`` and
+    ``initializer`` run in the workers and must be picklable module-level
+    functions, ``initializer`` is called with ``initargs``; ``on_working``, ``on_failed`` and ``on_stats`` run in the
+    calling thread. With ``adaptive`` every worker runs its own controller
+    and ``on_stats`` sees their combined limit and throughput.
+    """
+    processes = max(1, int(processes or default_processes()))
+    if isinstance(options.get("judges"), JudgePool):
+        options["judges"] = options["judges"].urls
+    results = [] if results is None else results
+    done = len(results)
+    if total is None:
+        total = done + len(proxies) if hasattr(proxies, "__len__") else 0
+
+    context = multiprocessing.get_context("spawn")
+    task_queue = context.Queue(maxsize=processes * 2)
+    result_queue = context.Queue()
+    stop_event = context.Event()
+    workers = [
+        context.Process(
+            target=_worker_main, daemon=True,
+            args=(protocol, options, task_queue, result_queue, stop_event, initializer, tuple(initargs))
+        )
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    if cancel_token is not None:
+        cancel_token.add_callback(stop_event.set)
+
+    feed_errors = []
+    worker_errors = []
+    worker_stats = {}
+
+    def feed():
+        try:
+            for chunk in _chunked(proxies, chunk_size):
+                while not stop_event.is_set():
+                    try:
+                        task_queue.put(chunk, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop_event.is_set():
+                    break
+        except Exception as e:
+            feed_errors.append(e)
+            stop_event.set()
+        finally:
+            if stop_event.is_set():
+                try:
+                    while True:
+                        task_queue.get_nowait()
+                except queue.Empty:
+                    pass
+            for _ in workers:
+                task_queue.put(None)
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+
+    running = len(workers)
+    while running:
+        try:
+            events = result_queue.get(timeout=0.5)
+        except queue.Empty:
+            if not any(worker.is_alive() for worker in workers):
+                logging.error("Checker worker processes exited without finishing")
+                stop_event.set()
+                break
+            continue
+        if events is None or isinstance(events, WorkerError):
+            running -= 1
+            if events is not None:
+                logging.error(str(events))
+                worker_errors.append(events)
+                stop_event.set()
+            continue
+        for kind, payload in events:
+            if kind == "working":
+                if on_working:
+                    on_working(*payload)
+            elif kind == "failed":
+                if on_failed:
+                    on_failed(*payload)
+            elif kind == "stats":
+                pid, stats = payload
+                worker_stats[pid] = ControllerStats(*stats)
+                if on_stats:
+                    on_stats(combine_stats(worker_stats.values()))
+            else:
+                done += 1
+                if keep_failed or "is working" in payload:
+                    results.append(payload)
+                if progress_signal:
+                    progress_signal.emit(payload)
+                if progress_count_signal:
+                    progress_count_signal.emit(done, max(total, done))
+
+    feeder.join()
+    for worker in workers:
+        worker.join()
+    if feed_errors:
+        raise feed_errors[0]
+    if worker_errors:
+        raise worker_errors[0]
+    if stop_event.is_set():
+        logging.info(f"Sharded check stopped after {done} proxies")
+    elif progress_count_signal and total > done:
+        progress_count_signal.emit(done, done)
+    return results
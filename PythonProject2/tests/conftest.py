@@ -0,0 +1,15 @@
+import pytest
+
+
+@pytest.fixture
+def local_judge():
+    # Не резолвится: фейковые прокси отвечают на такие запросы сами
+    return ["http://judge.test/get"]
+
+
+@pytest.fixture
+def without_latency():
+    def strip(results):
+        # Задержка у каждого прогона своя
+        return [result.split(" | Latency: ")[0] for result in results]
+    return strip
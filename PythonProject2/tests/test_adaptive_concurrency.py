@@ -0,0 +1,78 @@
+import asyncio
+import errno
+
+from adaptive_concurrency import AdaptiveLimit, ControllerStats, combine_stats, format_stats
+from async_checker import AsyncProxyChecker
+from fake_proxies import FakeProxyFarm
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def run_window(limit, clock, working=20, timeouts=0, latency=0.1):
+    clock.now += 1
+    for _ in range(working):
+        limit.record("working", latency)
+    for _ in range(timeouts):
+        limit.record("timeout")
+    return limit.update()
+
+
+def test_slow_start_then_back_off_and_additive_increase():
+    clock = FakeClock()
+    limit = AdaptiveLimit(1000, initial=10, increase=5, clock=clock)
+    # Пока ничего не ухудшается, лимит удваивается
+    assert [run_window(limit, clock) for _ in range(3)] == [20, 40, 80]
+    # Всплеск таймаутов сверх базового уровня — мультипликативное снижение
+    assert run_window(limit, clock, working=10, timeouts=10) == 56
+    # После первого снижения рост только аддитивный
+    assert run_window(limit, clock) == 61
+    # Рост задержки вдвое тоже считается перегрузкой
+    assert run_window(limit, clock, latency=0.5) == 42
+    assert limit.stats == ControllerStats(42, 20.0, 0.0, 0.5)
+    assert format_stats(limit.stats) == "limit 42 | 20 checks/s | 0% timeouts | p50 500 ms"
+
+
+def test_local_errors_cut_the_limit_early():
+    clock = FakeClock()
+    limit = AdaptiveLimit(100, initial=40, clock=clock)
+    limit.record("local")
+    assert limit.update() == 40  # не чаще раза в четверть окна
+    clock.now += 0.3
+    assert limit.update() == 28
+    assert limit.update(saturated=False) == 28
+
+
+def test_combine_stats():
+    combined = combine_stats([ControllerStats(10, 30.0, 0.5, 0.2), ControllerStats(20, 10.0, 0.1, 0.4)])
+    assert combined.limit == 30 and combined.throughput == 40.0
+    assert round(combined.timeout_rate, 3) == 0.4 and round(combined.latency, 3) == 0.3
+
+
+def test_adaptive_checker_retries_local_errors(local_judge):
+    with FakeProxyFarm() as farm:
+        proxies = [p.address for p in farm.add("socks5", count=30)]
+        stats = []
+        checker = AsyncProxyChecker("socks5", concurrency=200, judges=local_judge, adaptive=True,
+                                    on_stats=stats.append)
+        checker.controller.window = 0
+        checker.controller.min_samples = 1
+        original_open = checker._open
+        failures = iter(range(5))
+
+        async def flaky_open(ip, port):
+            # Первые подключения упираются в лимит дескрипторов
+            if next(failures, None) is not None:
+                raise OSError(errno.EMFILE, "Too many open files")
+            return await original_open(ip, port)
+
+        checker._open = flaky_open
+        results = asyncio.run(checker.run(proxies))
+
+    assert len(results) == 30 and all("is working" in result for result in results)
+    assert stats and stats[0].limit < 50  # ошибки ресурсов сразу снизили лимит
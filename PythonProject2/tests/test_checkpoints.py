@@ -0,0 +1,53 @@
+from unittest.mock import patch
+
+import proxy_checker_core
+from async_checker import CancelToken
+from fake_proxies import FakeProxyFarm
+from judges import JudgePool
+from proxy_checker_core import checkpoint_key, load_checkpoint, process_file, setup_database
+
+
+class StopAfter:
+    # Имитирует падение: прогон останавливается после n вердиктов
+    def __init__(self, token, n):
+        self.token = token
+        self.n = n
+        self.seen = []
+
+    def emit(self, result):
+        self.seen.append(result)
+        if len(self.seen) == self.n:
+            self.token.cancel()
+
+
+@patch("proxy_checker_core.get_country_by_ip", return_value="Localland")
+def test_interrupted_run_resumes_remainder(mock_country, tmp_path, monkeypatch, without_latency):
+    monkeypatch.setattr(proxy_checker_core, "DB_NAME", str(tmp_path / "proxies.db"))
+    monkeypatch.setattr(proxy_checker_core, "judge_pool", JudgePool(["http://judge.test/get"]))
+    monkeypatch.setattr(proxy_checker_core, "real_ip", "")
+    setup_database()
+    with FakeProxyFarm() as farm:
+        stubs = farm.add("socks5", count=20) + farm.add("socks5", count=5, reject=True)
+        proxy_file = tmp_path / "socks5.txt"
+        proxy_file.write_text("\n".join(stub.address for stub in stubs))
+        key = checkpoint_key(str(proxy_file), "socks5")
+
+        token = CancelToken()
+        first = process_file(str(proxy_file), "socks5", StopAfter(token, 8), concurrency=2, cancel_token=token)
+        saved = load_checkpoint(key)
+        assert len(saved) >= 8 and saved == first[:len(saved)]
+        before = {stub.address: stub.connections for stub in stubs}
+
+        resumed = process_file(str(proxy_file), "socks5", concurrency=2)
+        # Уже проверенные прокси повторно не трогаются
+        finished = {result.split(" ", 1)[0] for result in saved}
+        assert all(stub.connections == before[stub.address] for stub in stubs if stub.address in finished)
+        assert resumed[:len(saved)] == saved
+        # Завершённый прогон чекпойнт удаляет
+        assert load_checkpoint(key) == []
+
+        uninterrupted = process_file(str(proxy_file), "socks5", concurrency=2)
+
+    assert len(resumed) == 25
+    assert sorted(without_latency(resumed)) == sorted(without_latency(uninterrupted))
+    assert checkpoint_key(str(proxy_file), "http") != key
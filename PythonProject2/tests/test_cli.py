@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess
+import sys
+
+import proxy_checker_core
+from check_results import result_record
+from fake_proxies import FakeProxyFarm
+from judge_server import start_judge_server
+from proxy_checker_cli import main
+
+
+def test_result_record_parses_checker_strings():
+    record = result_record(
+        "1.2.3.4:80 is working | Country: Germany | Anonymity: elite | Latency: 246 ms (connect 12 ms, TTFB 200 ms)",
+        "http", checked_at=1.0
+    )
+    assert record == {
+        "proxy": "1.2.3.4:80", "protocol": "http", "checked_at": 1.0, "status": "working",
+        "country": "Germany", "anonymity": "elite", "latency_ms": 246, "connect_ms": 12, "ttfb_ms": 200,
+    }
+    record = result_record("1.2.3.4:80 failed: timed out", "socks5", checked_at=1.0)
+    assert (record["status"], record["error"]) == ("failed", "timed out")
+
+
+def test_check_command_streams_jsonl(tmp_path, monkeypatch, capsys):
+    # main() переключает глобальные настройки ядра; monkeypatch вернёт их после теста
+    for name in ("DB_NAME", "country_cache", "judge_pool"):
+        monkeypatch.setattr(proxy_checker_core, name, getattr(proxy_checker_core, name))
+    monkeypatch.setattr(proxy_checker_core, "get_country_by_ip", lambda ip: "Localland")
+    monkeypatch.setattr(proxy_checker_core, "real_ip", None)
+    server, judge = start_judge_server()
+    try:
+        with FakeProxyFarm() as farm:
+            good = [p.address for p in farm.add("socks5", count=3)]
+            bad = farm.add("socks5", reject=True)[0].address
+            proxy_file = tmp_path / "socks5.txt"
+            proxy_file.write_text("\n".join(good + [bad, "garbage"]))
+            output = tmp_path / "results.jsonl"
+            code = main(["check", str(proxy_file), "--db", str(tmp_path / "proxies.db"),
+                         "--judge", judge, "-o", str(output), "--metrics-json", str(tmp_path / "metrics.json"),
+                         "--profile-dir", str(tmp_path / "profiles"), "--fastest", "2"])
+    finally:
+        server.shutdown()
+
+    assert code == 0
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(r["proxy"] for r in records if r["status"] == "working") == sorted(good)
+    assert [r["proxy"] for r in records if r["status"] == "failed"] == [bad]
+    assert all(r["protocol"] == "socks5" and r["country"] == "Localland" for r in records if r["status"] == "working")
+    assert json.loads((tmp_path / "metrics.json").read_text())["metrics"]["checks"]["outcome=working"] >= 3
+    assert (tmp_path / "profiles" / "socks5.txt.prof").exists()
+    fastest = capsys.readouterr().err.split(f"{proxy_file}: fastest 2\n", 1)[1].splitlines()[:2]
+    assert all(line.split()[0] in good and line.endswith(" ms") for line in fastest)
+
+
+def test_cli_does_not_import_qt():
+    # Консольный режим должен работать на серверах без PyQt5 и bs4
+    code = "import sys, proxy_checker_cli; print(sorted(m for m in sys.modules if m.startswith(('PyQt5', 'bs4'))))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
+
+
+def test_gui_module_imports_lazily(tmp_path):
+    # Импорт GUI-модуля не тянет Qt и сеть и не создаёт лог
+    code = ("import sys, proxy_checker_gui; "
+            "print(sorted(m for m in sys.modules if m.split('.')[0] in ('PyQt5', 'bs4', 'requests', 'socks')))")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=tmp_path, env=env).stdout
+    assert output.strip() == "[]"
+    assert not (tmp_path / "proxy_checker.log").exists()
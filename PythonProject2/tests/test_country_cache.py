@@ -0,0 +1,61 @@
+import time
+from unittest.mock import patch
+
+import proxy_checker_core
+from country_cache import CountryCache
+from db_writer import DatabaseWriter
+
+
+def test_country_cache_lru_ttl_and_persistence(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    cache = CountryCache(db_path, max_size=2, ttl=60)
+    cache.put("1.1.1.1", "Australia")
+    cache.put("8.8.8.8", "United States")
+    cache.put("9.9.9.9", "Switzerland")
+    assert len(cache) == 2  # самая старая запись вытеснена из памяти
+
+    # Вытесненная запись всё ещё читается из таблицы
+    assert cache.get("1.1.1.1") == "Australia"
+    assert cache.get("4.4.4.4") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    # Новый экземпляр стартует "тёплым" из proxies.db
+    restarted = CountryCache(db_path, max_size=10, ttl=60)
+    restarted.setup()
+    assert len(restarted) == 3
+    assert restarted.get("9.9.9.9") == "Switzerland"
+
+    expired = CountryCache(db_path, ttl=60)
+    with patch("country_cache.time.time", return_value=time.time() + 120):
+        assert expired.get("9.9.9.9") is None
+
+
+@patch("requests.Session.get")
+def test_get_country_by_ip_uses_cache(mock_get, monkeypatch, tmp_path):
+    mock_get.return_value.json.return_value = {"country": "Germany"}
+    monkeypatch.setattr(proxy_checker_core, "country_cache", CountryCache(str(tmp_path / "cache.db")))
+
+    assert proxy_checker_core.get_country_by_ip("5.5.5.5") == "Germany"
+    assert proxy_checker_core.sort_proxies_by_country(["5.5.5.5:80", "5.5.5.5:8080"]) == ["5.5.5.5:80", "5.5.5.5:8080"]
+    assert mock_get.call_count == 1
+    assert proxy_checker_core.country_cache.stats()["hits"] == 2
+
+
+def test_country_cache_stores_through_active_writer(tmp_path):
+    # Во время проверки записи кэша идут пачками через общий writer, а не отдельными коммитами
+    db_path = str(tmp_path / "cache.db")
+    active = None
+    cache = CountryCache(db_path, writer=lambda: active)
+    cache.setup()  # как setup_database: таблица есть до запуска writer
+    writer = active = DatabaseWriter(db_path)
+    writer.start()
+    for i in range(50):
+        cache.put(f"10.0.0.{i}", "Germany")
+    writer.close()
+    assert writer.rows_written == 50 and writer.batches_written < 50
+
+    active = None
+    cache.put("10.0.1.1", "France")
+    restarted = CountryCache(db_path)
+    restarted.setup()
+    assert len(restarted) == 51
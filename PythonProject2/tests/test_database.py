@@ -1,5 +1,5 @@
 import sqlite3
-from proxy_checker_gui import setup_database, save_to_database  # Подключаем функции из proxy_checker_gui.py
+from proxy_checker_core import setup_database, save_to_database  # Подключаем функции из proxy_checker_core.py
 
 def test_database_setup():
     # Тест на создание базы данных и таблицы
@@ -23,3 +23,80 @@ def test_save_to_database():
     assert result is not None  # Проверяем, что запись существует
     assert result[1] == "192.168.0.1:8080"  # Проверяем корректность IP
     assert result[2] == "TestCountry"  # Проверяем корректность страны
+
+def test_upsert_tracks_proxy_health(tmp_path, monkeypatch):
+    # Повторные проверки обновляют одну строку вместо новых дубликатов
+    import proxy_checker_core
+    monkeypatch.setattr(proxy_checker_core, "DB_NAME", str(tmp_path / "proxies.db"))
+    setup_database()
+    save_to_database("10.0.0.1:1080", "Germany", "socks5", 0.3)
+    save_to_database("10.0.0.1:1080", "Unknown", "socks5", 0.1)
+    proxy_checker_core.record_failure("10.0.0.1:1080", "socks5")
+    save_to_database("10.0.0.1:1080", "Germany", "http", 0.2)
+
+    conn = sqlite3.connect(proxy_checker_core.DB_NAME)
+    rows = conn.execute(
+        "SELECT protocol, country, alive, last_latency, success_count, failure_count, "
+        "consecutive_failures, success_rate FROM proxies ORDER BY protocol"
+    ).fetchall()
+    conn.close()
+    assert rows[0] == ("http", "Germany", 1, 0.2, 1, 0, 0, 1.0)
+    protocol, country, alive, latency, successes, failures, streak, rate = rows[1]
+    assert (protocol, country, alive, latency, successes, failures, streak) == ("socks5", "Germany", 0, 0.1, 2, 1, 1)
+    assert abs(rate - 0.8) < 1e-9
+
+
+def test_fastest_proxies_query_uses_index(tmp_path, monkeypatch):
+    import proxy_checker_core
+    monkeypatch.setattr(proxy_checker_core, "DB_NAME", str(tmp_path / "proxies.db"))
+    setup_database()
+    for i, latency in enumerate([0.5, 0.1, 0.3]):
+        save_to_database(f"10.0.0.{i}:1080", "Germany", "socks5", latency)
+    save_to_database("10.0.1.1:1080", "France", "socks5", 0.05)
+    proxy_checker_core.record_failure("10.0.0.1:1080", "socks5")
+
+    fastest = proxy_checker_core.get_fastest_proxies("socks5", "Germany", limit=2)
+    assert [row[0] for row in fastest] == ["10.0.0.2:1080", "10.0.0.0:1080"]
+
+    conn = sqlite3.connect(proxy_checker_core.DB_NAME)
+    plan = " ".join(row[-1] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT ip_port FROM proxies WHERE protocol = 'socks5' AND alive = 1 "
+        "AND country = 'Germany' AND last_latency IS NOT NULL ORDER BY last_latency LIMIT 5"
+    ))
+    conn.close()
+    assert "USING INDEX" in plan and "TEMP B-TREE" not in plan
+
+
+def test_legacy_table_is_migrated(tmp_path, monkeypatch):
+    import proxy_checker_core
+    monkeypatch.setattr(proxy_checker_core, "DB_NAME", str(tmp_path / "proxies.db"))
+    conn = sqlite3.connect(proxy_checker_core.DB_NAME)
+    conn.execute("CREATE TABLE proxies (id INTEGER PRIMARY KEY AUTOINCREMENT, ip_port TEXT NOT NULL, country TEXT NOT NULL)")
+    conn.executemany("INSERT INTO proxies (ip_port, country) VALUES (?, ?)",
+                     [("1.2.3.4:80", "Unknown"), ("1.2.3.4:80", "Spain"), ("5.6.7.8:3128", "Italy")])
+    conn.commit()
+    conn.close()
+
+    setup_database()
+    conn = sqlite3.connect(proxy_checker_core.DB_NAME)
+    rows = conn.execute("SELECT ip_port, country, ip, port, success_count FROM proxies ORDER BY ip_port").fetchall()
+    conn.close()
+    assert rows == [("1.2.3.4:80", "Spain", "1.2.3.4", 80, 2), ("5.6.7.8:3128", "Italy", "5.6.7.8", 3128, 1)]
+
+
+def test_timing_columns_are_stored_and_added_to_old_tables(tmp_path, monkeypatch):
+    import proxy_checker_core
+    monkeypatch.setattr(proxy_checker_core, "DB_NAME", str(tmp_path / "proxies.db"))
+    # Таблица из предыдущей версии схемы, без колонок разбивки задержки
+    conn = sqlite3.connect(proxy_checker_core.DB_NAME)
+    conn.execute(proxy_checker_core.PROXIES_SCHEMA.replace("last_connect_time REAL,", "").replace("last_ttfb REAL,", ""))
+    conn.commit()
+    conn.close()
+    setup_database()
+    save_to_database("10.0.0.1:1080", "Germany", "socks5", 0.3, 0.05, 0.25)
+    save_to_database("10.0.0.1:1080", "Germany", "socks5", 0.2)
+
+    conn = sqlite3.connect(proxy_checker_core.DB_NAME)
+    row = conn.execute("SELECT last_latency, last_connect_time, last_ttfb FROM proxies").fetchone()
+    conn.close()
+    assert row == (0.2, 0.05, 0.25)
@@ -0,0 +1,37 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from db_writer import DatabaseWriter
+
+
+def test_writer_batches_rows_from_many_threads(tmp_path):
+    db_path = str(tmp_path / "proxies.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE proxies (id INTEGER PRIMARY KEY AUTOINCREMENT, ip_port TEXT, country TEXT)")
+    conn.close()
+
+    writer = DatabaseWriter(db_path, batch_size=100, flush_interval=10)
+    writer.start()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for i in range(1000):
+            executor.submit(writer.execute, "INSERT INTO proxies (ip_port, country) VALUES (?, ?)",
+                            (f"10.0.{i // 256}.{i % 256}:80", "Testland"))
+    # Закрытие дописывает всё, что осталось в очереди
+    writer.close()
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM proxies").fetchone()[0] == 1000
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+    assert writer.batches_written <= 11
+
+
+def test_writer_flush_interval(tmp_path):
+    db_path = str(tmp_path / "proxies.db")
+    sqlite3.connect(db_path).execute("CREATE TABLE t (v INTEGER)").connection.close()
+    writer = DatabaseWriter(db_path, batch_size=1000, flush_interval=0.05)
+    writer.start()
+    writer.execute("INSERT INTO t (v) VALUES (?)", (1,))
+    writer.flush()
+    assert sqlite3.connect(db_path).execute("SELECT v FROM t").fetchall() == [(1,)]
+    writer.close()
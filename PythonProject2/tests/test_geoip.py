@@ -0,0 +1,37 @@
+from unittest.mock import patch
+
+import proxy_checker_core
+from geoip import GeoIPDatabase, load_database
+
+
+def test_geoip_csv_ranges_and_cidr(tmp_path):
+    path = tmp_path / "geoip.csv"
+    path.write_text(
+        "start,end,country\n"
+        "1.0.0.0,1.0.0.255,Australia\n"
+        "16777472,16778239,China\n"
+        "8.8.8.0/24,United States\n"
+        "2001:db8::/32,Nowhere\n"
+    )
+    database = load_database(str(path))
+    assert len(database) == 3
+    assert database.lookup("1.0.0.7") == "Australia"
+    assert database.lookup("1.0.1.0") == "China"
+    assert database.lookup("8.8.8.8") == "United States"
+    assert database.lookup("9.9.9.9") is None
+    assert database.lookup("not-an-ip") is None
+
+
+@patch("requests.Session.get")
+def test_get_country_prefers_offline_database(mock_get, monkeypatch):
+    mock_get.return_value.json.return_value = {"country": "Remote"}
+    database = GeoIPDatabase([(0x08080800, 0x080808FF, "United States")])
+    monkeypatch.setattr(proxy_checker_core, "geoip_database", database)
+
+    assert proxy_checker_core.get_country_by_ip("8.8.8.8") == "United States"
+    assert not mock_get.called
+
+    # Адрес вне базы уходит в удалённый lookup, если fallback включён
+    assert proxy_checker_core.get_country_by_ip("1.1.1.1") == "Remote"
+    monkeypatch.setattr(proxy_checker_core, "REMOTE_GEOIP_FALLBACK", False)
+    assert proxy_checker_core.get_country_by_ip("1.1.1.1") == "Unknown"
@@ -0,0 +1,132 @@
+import sqlite3
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import proxy_checker_core
+from fake_proxies import FakeProxyFarm
+from judges import JudgePool
+from proxy_checker_core import (
+    plan_incremental_check, process_file, process_proxies, record_failure, save_to_database, setup_database
+)
+from proxy_input import ProxyList
+
+
+def test_plan_skips_fresh_and_backs_off_dead(tmp_path, monkeypatch):
+    monkeypatch.setattr(proxy_checker_core, "DB_NAME", str(tmp_path / "proxies.db"))
+    setup_database()
+    save_to_database("10.0.0.1:1080", "Germany", "socks5", 0.2)
+    save_to_database("10.0.0.2:1080", "France", "socks5", 0.1)
+    for _ in range(3):
+        record_failure("10.0.0.3:1080", "socks5")
+    record_failure("10.0.0.2:1080", "socks5")
+
+    proxies = ["10.0.0.9:1080", "10.0.0.2:1080", "10.0.0.3:1080", "10.0.0.1:1080"]
+    to_check, cached = plan_incremental_check(proxies, "socks5")
+    assert to_check == ["10.0.0.9:1080"]
+    assert cached[0].startswith("10.0.0.2:1080 failed: skipped after 1 consecutive failures")
+    assert cached[1].startswith("10.0.0.3:1080 failed: skipped after 3 consecutive failures")
+    assert cached[2] == "10.0.0.1:1080 is working | Country: Germany | Cached | Latency: 200 ms"
+
+    # Свежесть и короткий бэкофф истекли, лучшие кандидаты идут первыми
+    to_check, cached = plan_incremental_check(proxies, "socks5", now=time.time() + 2000)
+    assert to_check == ["10.0.0.1:1080", "10.0.0.2:1080", "10.0.0.9:1080"]
+    assert len(cached) == 1
+
+
+@patch("proxy_checker_core.get_country_by_ip", return_value="Localland")
+def test_incremental_process_file_merges_cached(mock_country, tmp_path, monkeypatch):
+    monkeypatch.setattr(proxy_checker_core, "DB_NAME", str(tmp_path / "proxies.db"))
+    monkeypatch.setattr(proxy_checker_core, "judge_pool", JudgePool(["http://judge.test/get"]))
+    monkeypatch.setattr(proxy_checker_core, "real_ip", "")
+    setup_database()
+    with FakeProxyFarm() as farm:
+        stubs = farm.add("socks5", count=3)
+        save_to_database(stubs[0].address, "Cachedland", "socks5", 0.01)
+        proxy_file = tmp_path / "socks5.txt"
+        proxy_file.write_text("\n".join(stub.address for stub in stubs))
+
+        results = process_file(str(proxy_file), "socks5", incremental=True)
+        assert stubs[0].connections == 0
+        assert [stub.connections for stub in stubs[1:]] == [1, 1]
+
+    assert len(results) == 3
+    assert results[0] == f"{stubs[0].address} is working | Country: Cachedland | Cached | Latency: 10 ms"
+    assert all("is working" in result for result in results)
+
+
+@patch("proxy_checker_core.get_country_by_ip", return_value="Localland")
+def test_process_proxies_checks_in_memory_list(mock_country, tmp_path, monkeypatch):
+    monkeypatch.setattr(proxy_checker_core, "DB_NAME", str(tmp_path / "proxies.db"))
+    monkeypatch.setattr(proxy_checker_core, "judge_pool", JudgePool(["http://judge.test/get"]))
+    monkeypatch.setattr(proxy_checker_core, "real_ip", "")
+    setup_database()
+    with FakeProxyFarm() as farm:
+        stubs = farm.add("socks5", count=3)
+        # Без файла: список из поиска, с дублем и мусором
+        proxies = ProxyList(stub.address for stub in stubs)
+        proxies.extend([stubs[0].address, "not a proxy"])
+        results = process_proxies(proxies, "socks5")
+        assert [stub.connections for stub in stubs] == [1, 1, 1]
+
+    assert sorted(result.split(" ")[0] for result in results) == sorted(stub.address for stub in stubs)
+    assert all("is working | Country: Localland" in result for result in results)
+
+
+@patch("proxy_checker_core.get_country_by_ip", return_value="Localland")
+def test_failed_verdicts_are_emitted_but_not_kept(mock_country, tmp_path, monkeypatch):
+    # Так работает GUI: провалы видны в таблице, но не копятся до конца прогона
+    monkeypatch.setattr(proxy_checker_core, "DB_NAME", str(tmp_path / "proxies.db"))
+    monkeypatch.setattr(proxy_checker_core, "judge_pool", JudgePool(["http://judge.test/get"]))
+    monkeypatch.setattr(proxy_checker_core, "real_ip", "")
+    setup_database()
+    emitted = []
+    signal = SimpleNamespace(emit=emitted.append)
+    with FakeProxyFarm() as farm:
+        good = [p.address for p in farm.add("socks5", count=3)]
+        bad = [p.address for p in farm.add("socks5", count=4, reject=True)]
+        results = process_proxies(good + bad, "socks5", signal, keep_failed=False)
+    assert sorted(result.split(" ")[0] for result in results) == sorted(good)
+    assert len(emitted) == 7
+
+
+def test_plan_auto_uses_history_of_every_protocol(tmp_path, monkeypatch):
+    # В режиме auto история ищется по всем конкретным протоколам
+    monkeypatch.setattr(proxy_checker_core, "DB_NAME", str(tmp_path / "proxies.db"))
+    setup_database()
+    save_to_database("10.0.0.1:1080", "Germany", "socks5", 0.2)
+    for protocol in ("http", "socks4", "socks5"):
+        record_failure("10.0.0.2:1080", protocol)
+    record_failure("10.0.0.3:1080", "http")
+    save_to_database("10.0.0.3:1080", "France", "socks4", 0.1)
+    record_failure("10.0.0.3:1080", "socks4")
+
+    proxies = ["10.0.0.1:1080", "10.0.0.2:1080", "10.0.0.3:1080", "10.0.0.9:1080"]
+    to_check, cached = plan_incremental_check(proxies, "auto")
+    assert to_check == ["10.0.0.9:1080"]
+    assert cached == [
+        "10.0.0.1:1080 is working | Protocol: socks5 | Country: Germany | Cached | Latency: 200 ms",
+        cached[1],
+        cached[2],
+    ]
+    assert cached[1].startswith("10.0.0.2:1080 failed: skipped after 1 consecutive failures")
+    assert cached[2].startswith("10.0.0.3:1080 failed: skipped after 1 consecutive failures")
+
+
+@patch("proxy_checker_core.get_country_by_ip", return_value="Localland")
+def test_incremental_auto_run_reuses_its_own_verdicts(mock_country, tmp_path, monkeypatch):
+    monkeypatch.setattr(proxy_checker_core, "DB_NAME", str(tmp_path / "proxies.db"))
+    monkeypatch.setattr(proxy_checker_core, "judge_pool", JudgePool(["http://judge.test/get"]))
+    monkeypatch.setattr(proxy_checker_core, "real_ip", "")
+    setup_database()
+    with FakeProxyFarm() as farm:
+        stub = farm.add("socks5")[0]
+        first = process_proxies([stub.address], "auto", incremental=True)
+        second = process_proxies([stub.address], "auto", incremental=True)
+        assert stub.connections == 2
+
+    assert "is working | Protocol: socks5" in first[0]
+    assert second[0].startswith(f"{stub.address} is working | Protocol: socks5 | Country: Localland | Cached")
+    conn = sqlite3.connect(proxy_checker_core.DB_NAME)
+    assert conn.execute("SELECT DISTINCT protocol FROM proxies").fetchall() == [("socks5",)]
+    conn.close()
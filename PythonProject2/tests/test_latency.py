@@ -0,0 +1,80 @@
+import random
+
+import proxy_checker_core
+from latency import LatencyHistogram, LatencyRanking, format_latency, parse_latency
+from proxy_checker_core import order_working_proxies
+
+
+def test_format_and_parse_latency():
+    text = format_latency(0.2456, 0.012, 0.2)
+    assert text == " | Latency: 246 ms (connect 12 ms, TTFB 200 ms)"
+    assert parse_latency(f"1.2.3.4:80 is working | Country: Germany{text}") == 0.246
+    assert parse_latency("1.2.3.4:80 failed: timed out") is None
+
+
+def test_ranking_keeps_only_the_fastest():
+    ranking = LatencyRanking(size=3)
+    latencies = [0.5, 0.05, 0.9, 0.2, 0.01, 0.3]
+    for i, latency in enumerate(latencies):
+        ranking.add(f"10.0.0.{i}:80", latency)
+    assert len(ranking) == 3
+    assert ranking.fastest() == [("10.0.0.4:80", 0.01), ("10.0.0.1:80", 0.05), ("10.0.0.3:80", 0.2)]
+    # Перцентиль считается по всем прокси, а не только по попавшим в топ
+    assert ranking.histogram.count == 6
+    assert [proxy for proxy, _ in ranking.fastest(percentile=33)] == ["10.0.0.4:80", "10.0.0.1:80"]
+
+
+def test_ranking_consumes_result_strings():
+    ranking = LatencyRanking()
+    assert ranking.add_result("1.1.1.1:80 is working | Country: X | Latency: 300 ms (connect 20 ms)")
+    assert ranking.add_result("2.2.2.2:80 is working | Country: X | Cached | Latency: 100 ms")
+    assert not ranking.add_result("3.3.3.3:80 failed: timed out")
+    assert not ranking.add_result("4.4.4.4:80 is working | Country: X")
+    assert ranking.fastest() == [("2.2.2.2:80", 0.1), ("1.1.1.1:80", 0.3)]
+
+
+def test_histogram_percentiles_are_close():
+    rng = random.Random(1)
+    samples = [rng.uniform(0.01, 2.0) for _ in range(10000)]
+    histogram = LatencyHistogram()
+    for sample in samples:
+        histogram.add(sample)
+    samples.sort()
+    for percent in (10, 50, 90, 99):
+        exact = samples[len(samples) * percent // 100 - 1]
+        assert abs(histogram.percentile(percent) - exact) / exact < 0.06
+
+
+def test_saved_list_is_not_capped_by_the_ranking():
+    # Топ ограничен размером кучи, но в файл попадают все рабочие прокси
+    ranking = LatencyRanking(size=2)
+    results = [f"10.0.0.{i}:80 is working | Country: X{format_latency(latency)}"
+               for i, latency in enumerate([0.5, 0.05, 0.9, 0.2, 0.01])]
+    results += ["10.0.0.9:80 is working | Country: X", "10.0.0.8:80 failed: timed out"]
+    for result in results:
+        ranking.add_result(result)
+    assert order_working_proxies(results, ranking, "latency") == [
+        "10.0.0.4:80", "10.0.0.1:80", "10.0.0.3:80", "10.0.0.0:80", "10.0.0.2:80", "10.0.0.9:80"
+    ]
+    assert order_working_proxies(results, ranking, "latency", percentile=60) == [
+        "10.0.0.4:80", "10.0.0.1:80", "10.0.0.3:80"
+    ]
+    # «Не больше N самых быстрых» берётся из топа
+    assert order_working_proxies(results, ranking, "latency", limit=1) == ["10.0.0.4:80"]
+    assert order_working_proxies(results, ranking, "country", limit=5) == ["10.0.0.1:80", "10.0.0.4:80"]
+
+
+def test_country_order_comes_from_the_results(monkeypatch):
+    # Сохранение по странам не ходит в сеть: страна уже есть в строке результата
+    def offline(ip):
+        raise AssertionError(f"network lookup for {ip}")
+
+    monkeypatch.setattr(proxy_checker_core, "get_country_by_ip", offline)
+    results = ["1.1.1.1:80 is working | Country: Japan | Latency: 40 ms",
+               "2.2.2.2:80 is working | Country: Unknown",
+               "3.3.3.3:80 is working | Country: Brazil | Cached",
+               "4.4.4.4:80 is working | Country: Japan | Anonymity: elite",
+               "5.5.5.5:80 failed: timed out"]
+    assert order_working_proxies(results, LatencyRanking(), "country") == [
+        "3.3.3.3:80", "1.1.1.1:80", "4.4.4.4:80", "2.2.2.2:80"
+    ]
@@ -0,0 +1,66 @@
+import json
+import pstats
+import urllib.request
+
+import async_checker
+from async_checker import check_proxies
+from fake_proxies import FakeProxyFarm
+from metrics import MetricsRegistry, SnapshotWriter, profiled, serve_metrics
+
+
+def test_registry_snapshot_and_prometheus_text():
+    registry = MetricsRegistry()
+    registry.counter("checks", "Finished checks", outcome="working").inc(3)
+    assert registry.counter("checks", outcome="working").value == 3  # тот же объект
+    latency = registry.histogram("stage_seconds", "Stage time", buckets=(0.1, 1), stage="connect")
+    for value in (0.05, 0.5, 2):
+        latency.observe(value)
+    registry.gauge("checks_in_flight").set(7)
+
+    snapshot = registry.snapshot()["metrics"]
+    assert snapshot["checks"] == {"outcome=working": 3}
+    assert snapshot["stage_seconds"]["stage=connect"]["count"] == 3
+    assert snapshot["stage_seconds"]["stage=connect"]["p50"] == 1
+    assert snapshot["checks_in_flight"] == 7
+
+    text = registry.prometheus_text()
+    assert "# TYPE proxy_checker_checks counter" in text
+    assert 'proxy_checker_checks_total{outcome="working"} 3' in text
+    assert 'proxy_checker_stage_seconds_bucket{stage="connect",le="1.0"} 2' in text
+    assert 'proxy_checker_stage_seconds_bucket{stage="connect",le="+Inf"} 3' in text
+    assert 'proxy_checker_stage_seconds_count{stage="connect"} 3' in text
+
+
+def test_exporters_and_profile_hook(tmp_path):
+    registry = MetricsRegistry()
+    registry.counter("checks", outcome="failed").inc()
+    server = serve_metrics(0, registry)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        text = urllib.request.urlopen(f"{url}/metrics").read().decode()
+        snapshot = json.loads(urllib.request.urlopen(f"{url}/metrics.json").read())
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'proxy_checker_checks_total{outcome="failed"} 1' in text
+    assert snapshot["metrics"]["checks"] == {"outcome=failed": 1}
+
+    writer = SnapshotWriter(str(tmp_path / "metrics.json"), interval=60, registry=registry)
+    writer.start()
+    writer.stop()  # последний снимок пишется при остановке
+    assert json.loads((tmp_path / "metrics.json").read_text())["metrics"]["checks"] == {"outcome=failed": 1}
+
+    with profiled(str(tmp_path / "run.prof")):
+        sorted(range(1000))
+    assert pstats.Stats(str(tmp_path / "run.prof")).total_calls > 0
+
+
+def test_checks_record_stage_timings(local_judge):
+    stages = ("parse", "connect", "handshake", "judge")
+    before = {stage: async_checker.stage_timer(stage).count for stage in stages}
+    working = async_checker.check_counter("working").value
+    with FakeProxyFarm() as farm:
+        proxies = [p.address for p in farm.add("socks5", count=3)]
+        check_proxies(proxies, "socks5", judges=local_judge)
+    assert {stage: async_checker.stage_timer(stage).count - before[stage] for stage in stages} == dict.fromkeys(stages, 3)
+    assert async_checker.check_counter("working").value - working == 3
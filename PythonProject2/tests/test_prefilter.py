@@ -0,0 +1,91 @@
+import asyncio
+import errno
+import time
+
+import async_checker
+import prefilter
+from async_checker import AsyncProxyChecker
+from fake_proxies import FakeProxyFarm, black_hole_ports, closed_ports
+from prefilter import FunnelCounters, TcpPrefilter
+
+
+def test_prefilter_yields_open_ports():
+    with FakeProxyFarm() as farm:
+        live = [p.address for p in farm.add("http", count=3)]
+        dead = closed_ports(5)
+        rejected = []
+
+        async def on_closed(proxy, reason):
+            rejected.append((proxy, reason))
+
+        async def scan():
+            return [proxy async for proxy in TcpPrefilter(dead + live, on_closed, concurrency=4)]
+
+        passed = asyncio.run(scan())
+    assert sorted(passed) == sorted(live)
+    assert sorted(rejected) == sorted((proxy, "connection refused") for proxy in dead)
+
+
+def test_checker_funnel_skips_closed_ports(local_judge):
+    with FakeProxyFarm() as farm:
+        stubs = farm.add("socks5", count=5)
+        dead = closed_ports(20)
+        failed = []
+        funnel = FunnelCounters()
+        checker = AsyncProxyChecker(
+            "socks5", judges=local_judge, prefilter=True, prefilter_concurrency=1, funnel=funnel,
+            on_failed=lambda proxy, protocol: failed.append(proxy)
+        )
+        results = asyncio.run(checker.run([stub.address for stub in stubs] + dead))
+
+    assert len(results) == 25
+    assert sum("is working" in result for result in results) == 5
+    assert sorted(failed) == sorted(dead)
+    # Хэндшейк только с открытыми портами, и верификация начинается до конца сканирования
+    assert all(stub.connections == 2 for stub in stubs)
+    assert (funnel.scan.count, funnel.scan.passed, funnel.verify.count, funnel.verify.passed) == (25, 5, 5, 5)
+    assert funnel.verify.started < funnel.scan.finished
+
+
+def test_prefilter_passes_on_local_resource_errors(monkeypatch):
+    # EMFILE ничего не говорит о прокси: её проверит второй этап, а не запишет в мёртвые
+    async def out_of_descriptors(host, port):
+        raise OSError(errno.EMFILE, "Too many open files")
+
+    monkeypatch.setattr(prefilter.asyncio, "open_connection", out_of_descriptors)
+    rejected = []
+
+    async def on_closed(proxy, reason):
+        rejected.append(proxy)
+
+    async def scan():
+        return [proxy async for proxy in TcpPrefilter(["127.0.0.1:1", "127.0.0.1:2"], on_closed)]
+
+    assert sorted(asyncio.run(scan())) == ["127.0.0.1:1", "127.0.0.1:2"]
+    assert rejected == []
+
+
+def test_prefilter_limits_follow_descriptors(monkeypatch):
+    monkeypatch.setattr(async_checker, "descriptor_budget", lambda: 960)
+    checker = AsyncProxyChecker("http", concurrency=2000, connect_timeout=5, adaptive=True,
+                                prefilter=True, prefilter_concurrency=2000)
+    assert (checker.prefilter_concurrency, checker.concurrency) == (480, 480)
+    assert checker.controller.max_limit == 480
+    # Сканирование короткое, пока не попросили ждать как полная проверка
+    assert checker.prefilter_timeout == prefilter.DEFAULT_SCAN_TIMEOUT
+    assert AsyncProxyChecker("http", connect_timeout=5, prefilter_timeout=None).prefilter_timeout == 5
+
+
+def test_scan_timeout_bounds_the_wait_on_silent_ports(local_judge):
+    dead, sockets = black_hole_ports(3)
+    try:
+        checker = AsyncProxyChecker("socks5", judges=local_judge, connect_timeout=5,
+                                    prefilter=True, prefilter_timeout=0.3)
+        started = time.perf_counter()
+        results = asyncio.run(checker.run(dead))
+        elapsed = time.perf_counter() - started
+    finally:
+        for sock in sockets:
+            sock.close()
+    assert len(results) == 3 and not any("is working" in result for result in results)
+    assert elapsed < 2
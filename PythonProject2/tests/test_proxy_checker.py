@@ -1,17 +1,23 @@
-from proxy_checker_gui import check_proxy  # Импортируем функцию проверки прокси
+import proxy_checker_core
+from proxy_checker_core import check_proxy  # Импортируем функцию проверки прокси
+from datetime import timedelta
 from unittest.mock import patch  # Импортируем библиотеку для мока
+from fake_proxies import FakeProxyFarm
+from judges import JudgePool
 
-@patch("requests.get")  # Мокаем функцию requests.get
+@patch("requests.Session.get")  # Мокаем requests.Session.get: запрос к судье идёт через сессию
 def test_check_proxy_http(mock_get):
     # Устанавливаем поведение мока для успешного подключения
     mock_get.return_value.status_code = 200
     mock_get.return_value.json.return_value = {"origin": "8.8.8.8"}
+    mock_get.return_value.elapsed = timedelta(milliseconds=120)
 
     # Проверяем результат
     result = check_proxy("8.8.8.8:8080", "http")
     assert "is working" in result  # Проверяем, что прокси определён как рабочий
+    assert "TTFB 120 ms" in result  # Время до первого байта попадает в результат
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_check_proxy_invalid(mock_get):
     # Мокаем ошибку соединения
     mock_get.side_effect = Exception("Connection failed")
@@ -19,3 +25,16 @@ def test_check_proxy_invalid(mock_get):
     # Проверяем результат для невалидного прокси
     result = check_proxy("invalid:port", "http")
     assert "failed" in result  # Проверяем, что ошибка обработана корректно
+
+
+def test_judge_requests_do_not_pile_up_proxy_pools(monkeypatch):
+    # Пул сессии потока остаётся для geo-запросов, прокси в нём не копятся
+    monkeypatch.setattr(proxy_checker_core, "judge_pool", JudgePool(["http://judge.test/get"]))
+    monkeypatch.setattr(proxy_checker_core, "get_country_by_ip", lambda ip: "Localland")
+    monkeypatch.setattr(proxy_checker_core, "save_to_database", lambda *args: None)
+    with FakeProxyFarm() as farm:
+        proxies = [p.address for p in farm.add("http", count=5)]
+        results = [check_proxy(proxy, "http") for proxy in proxies]
+    assert all("is working" in result for result in results)
+    adapter = proxy_checker_core.get_http_session().get_adapter("http://judge.test/get")
+    assert len(adapter.proxy_manager) == 0
@@ -0,0 +1,72 @@
+import csv
+import json
+
+import proxy_checker_core
+from proxy_checker_cli import main
+from proxy_checker_core import iter_proxy_rows, record_failure, save_to_database, setup_database
+from proxy_export import ProxyColumns, export_rows, result_rows, write_binary
+
+
+def fill_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(proxy_checker_core, "DB_NAME", str(tmp_path / "proxies.db"))
+    setup_database()
+    save_to_database("10.0.0.1:1080", "Germany", "socks5", 0.1)
+    save_to_database("10.0.0.2:1080", "France", "socks5", 0.9)
+    save_to_database("10.0.0.3:8080", "Germany", "http", 0.2)
+    save_to_database("proxy.example:3128", "Germany", "socks5", 0.3)
+    save_to_database("10.0.0.4:1080", "Germany", "socks5", 0.05)
+    record_failure("10.0.0.4:1080", "socks5")
+
+
+def test_rows_stream_with_filters_in_the_query(tmp_path, monkeypatch):
+    fill_database(tmp_path, monkeypatch)
+    rows = list(iter_proxy_rows(protocol="socks5", country="Germany", max_latency=0.5, batch_size=1))
+    assert sorted(row[0] for row in rows) == ["10.0.0.1:1080", "proxy.example:3128"]
+    proxy, protocol, country, latency_ms, success_rate, checked_at = min(rows)
+    assert (protocol, country, round(latency_ms), success_rate) == ("socks5", "Germany", 100, 1.0)
+    assert [row[0] for row in iter_proxy_rows(alive=None, min_success_rate=0.9, max_latency=0.06)] == []
+    assert len(list(iter_proxy_rows(alive=None))) == 5
+
+
+def test_binary_export_maps_columns_without_copies(tmp_path, monkeypatch):
+    fill_database(tmp_path, monkeypatch)
+    path = str(tmp_path / "proxies.bin")
+    # Маленькие пачки: колонки собираются из нескольких сбросов на диск
+    with open(path, "wb") as file:
+        written, skipped = write_binary(iter_proxy_rows(), file, batch_size=2)
+    assert (written, skipped) == (3, 1)  # hostname не влезает в колонку IPv4
+
+    with ProxyColumns(path) as export:
+        assert len(export) == 3
+        ports = export.column("port")
+        assert isinstance(ports, memoryview) and ports.format == "H"
+        assert sorted(ports) == [1080, 1080, 8080]
+        assert sorted(export.protocols) == ["http", "socks5"]
+        records = sorted(export)
+    assert [(proxy, protocol, country) for proxy, protocol, country, *_ in records] == [
+        ("10.0.0.1:1080", "socks5", "Germany"),
+        ("10.0.0.2:1080", "socks5", "France"),
+        ("10.0.0.3:8080", "http", "Germany"),
+    ]
+    assert round(records[0][3]) == 100 and records[0][4] == 1.0
+
+
+def test_text_exports_and_cli(tmp_path, monkeypatch):
+    results = [
+        "1.2.3.4:80 is working | Country: Germany | Anonymity: elite | Latency: 246 ms",
+        "1.2.3.5:80 failed: timed out",
+        "1.2.3.6:1080 is working | Protocol: socks5 | Country: France",
+    ]
+    export_rows(result_rows(results, "auto"), str(tmp_path / "results.jsonl"))
+    records = [json.loads(line) for line in (tmp_path / "results.jsonl").read_text().splitlines()]
+    assert [(r["proxy"], r["protocol"], r["latency_ms"]) for r in records] == [
+        ("1.2.3.4:80", "auto", 246.0), ("1.2.3.6:1080", "socks5", None)
+    ]
+
+    fill_database(tmp_path, monkeypatch)
+    # main() переключает базу через use_database; monkeypatch вернёт кэш стран после теста
+    monkeypatch.setattr(proxy_checker_core, "country_cache", proxy_checker_core.country_cache)
+    output = tmp_path / "fast.csv"
+    assert main(["export", str(output), "--db", proxy_checker_core.DB_NAME, "--max-latency", "250"]) == 0
+    rows = list(csv.DictReader(output.read_text().splitlines()))
+    assert sorted(row["proxy"] for row in rows) == ["10.0.0.1:1080", "10.0.0.3:8080"]
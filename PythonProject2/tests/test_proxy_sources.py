@@ -0,0 +1,70 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from proxy_sources import extract_proxies, fetch_sources
+
+PAGES = {
+    "/plain.txt": "1.1.1.1:80\n2.2.2.2:8080\n1.1.1.1:80\n",
+    "/table.html": "<html><table><tr><td>3.3.3.3</td><td>3128</td></tr>"
+                   "<tr><td>2.2.2.2</td> <td class='port'>8080</td></tr></table>junk 999.1.1.1:80</html>",
+}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(5 if self.path == "/slow.txt" else 0.3)
+        body = PAGES.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+def test_extract_proxies_from_html():
+    assert extract_proxies(PAGES["/table.html"]) == ["3.3.3.3:3128", "2.2.2.2:8080"]
+
+
+def test_fetch_sources_concurrently():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    links = [f"{base}/plain.txt", f"{base}/table.html", f"{base}/missing"] + [f"{base}/plain.txt"] * 5
+    reported = []
+    try:
+        started = time.perf_counter()
+        proxies = fetch_sources(links, lambda link, found, error: reported.append((link, found, error)))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.shutdown()
+
+    assert sorted(proxies) == ["1.1.1.1:80", "2.2.2.2:8080", "3.3.3.3:3128"]
+    assert len(reported) == len(links)
+    assert sum(error is not None for _, _, error in reported) == 1
+    # Восемь страниц по 0.3 с загружаются параллельно, а не последовательно
+    assert elapsed < 1.5
+
+
+def test_fetch_sources_stops_without_waiting_for_slow_sources():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    stop = threading.Event()
+    threading.Timer(0.5, stop.set).start()
+    try:
+        started = time.perf_counter()
+        proxies = fetch_sources([f"{base}/plain.txt", f"{base}/slow.txt"], should_stop=stop.is_set)
+        elapsed = time.perf_counter() - started
+    finally:
+        server.shutdown()
+
+    # Быстрая страница успела, медленная не держит остановку до своего таймаута
+    assert sorted(proxies) == ["1.1.1.1:80", "2.2.2.2:8080"]
+    assert elapsed < 1.5
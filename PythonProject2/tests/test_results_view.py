@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+from PyQt5.QtCore import Qt  # noqa: E402
+
+from results_view import ResultBuffer, ResultsTable, result_row  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def column(model, index):
+    return [model.index(row, index).data() for row in range(model.rowCount())]
+
+
+def test_result_row():
+    assert result_row("1.2.3.4:80 is working | Country: Germany | Anonymity: elite | Latency: 246 ms (connect 12 ms)") == (
+        "1.2.3.4:80", "working, elite", 246, "Germany"
+    )
+    assert result_row("1.2.3.4:80 failed: timed out") == ("1.2.3.4:80", "failed: timed out", None, "")
+    assert result_row("1.2.3.4:80 is working | Protocol: socks4 | Country: Germany", "auto")[1] == "working as socks4"
+
+
+def test_table_batches_sorts_and_bounds_history(app):
+    progress = QtWidgets.QProgressBar()
+    table = ResultsTable(history=3, progress_bar=progress)
+    buffer = ResultBuffer()
+    batches = []
+    table.follow(buffer, "http", batches.append)
+    for i, latency in enumerate([50, 10, None, 30]):
+        if latency:
+            buffer.emit(f"10.0.0.{i}:80 is working | Country: X | Latency: {latency} ms")
+        else:
+            buffer.emit(f"10.0.0.{i}:80 failed: timed out")
+        buffer.count_signal.emit(i + 1, 4)
+    # Пока таймер не сработал, таблица пуста
+    assert table.sorted_model.rowCount() == 0
+    table.finish()
+
+    # Все результаты пришли одной пачкой, старейший вытеснен
+    assert len(batches) == 1 and len(batches[0]) == 4
+    assert progress.value() == 100
+    assert column(table.sorted_model, 0) == ["10.0.0.1:80", "10.0.0.2:80", "10.0.0.3:80"]
+
+    # Сортировка по задержке: без задержки — в конце, новые строки встают на место
+    table.sortByColumn(2, Qt.AscendingOrder)
+    assert column(table.sorted_model, 0) == ["10.0.0.1:80", "10.0.0.3:80", "10.0.0.2:80"]
+    buffer = ResultBuffer()
+    table.follow(buffer)
+    buffer.emit("10.0.0.9:80 is working | Country: Y | Latency: 1 ms")
+    table.flush()
+    assert column(table.sorted_model, 0) == ["10.0.0.9:80", "10.0.0.3:80", "10.0.0.2:80"]
+    assert column(table.sorted_model, 2) == ["1 ms", "30 ms", ""]
@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+
+import pytest
+
+from async_checker import CancelToken
+from fake_proxies import FakeProxyFarm
+from proxy_checker_core import get_country_by_ip, prepare_worker_process
+from sharded_checker import WorkerError, check_sharded
+
+
+class Signal:
+    def __init__(self):
+        self.calls = []
+
+    def emit(self, *args):
+        self.calls.append(args)
+
+
+def test_sharded_results_and_callbacks_are_merged(local_judge):
+    progress, progress_count = Signal(), Signal()
+    working, failed = [], []
+    with FakeProxyFarm() as farm:
+        good = [p.address for p in farm.add("socks5", count=60)]
+        bad = [p.address for p in farm.add("socks5", count=5, reject=True)]
+        results = check_sharded(
+            good + bad, "socks5", progress, progress_count, processes=3, chunk_size=7,
+            judges=local_judge, on_working=lambda *args: working.append(args),
+            on_failed=lambda *args: failed.append(args),
+        )
+
+    # Колбэки и сигналы отрабатывают в родительском процессе
+    assert sorted(r.split(" ")[0] for r in results) == sorted(good + bad)
+    assert sum("is working" in r for r in results) == 60
+    assert sorted(args[0] for args in working) == sorted(good)
+    assert sorted(failed) == sorted((proxy, "socks5") for proxy in bad)
+    assert [call[0] for call in progress.calls] == results
+    assert progress_count.calls == [(i, 65) for i in range(1, 66)]
+
+
+def test_sharded_check_can_be_cancelled(local_judge):
+    token = CancelToken()
+    with FakeProxyFarm() as farm:
+        slow = [p.address for p in farm.add("socks5", count=40, latency=5)]
+        threading.Timer(1.0, token.cancel).start()
+        started = time.perf_counter()
+        results = check_sharded(slow, "socks5", processes=2, judges=local_judge,
+                                read_timeout=10, cancel_token=token)
+        assert time.perf_counter() - started < 4
+    assert results == []
+
+
+def test_sharded_workers_use_the_parents_database_and_geoip(tmp_path, monkeypatch, local_judge):
+    # spawn не наследует use_database/setup_geoip родителя: пути приходят через initargs
+    geoip_file = tmp_path / "geo.csv"
+    geoip_file.write_text("127.0.0.0/8,Localland\n")
+    work_dir = tmp_path / "cwd"
+    work_dir.mkdir()
+    monkeypatch.chdir(work_dir)
+    with FakeProxyFarm() as farm:
+        proxies = [p.address for p in farm.add("socks5", count=4)]
+        results = check_sharded(
+            proxies, "socks5", processes=2, judges=local_judge, country_lookup=get_country_by_ip,
+            initializer=prepare_worker_process, initargs=(str(tmp_path / "proxies.db"), str(geoip_file)),
+        )
+    assert len(results) == 4
+    assert all("is working | Country: Localland" in result for result in results)
+    assert (tmp_path / "proxies.db").exists()
+    assert not (work_dir / "proxies.db").exists()
+
+
+def test_crashed_worker_is_not_a_finished_shard(local_judge):
+    # Исключение в воркере доходит до родителя, а не выглядит как обычное завершение
+    with FakeProxyFarm() as farm:
+        proxies = [p.address for p in farm.add("socks5", count=10)]
+        started = time.perf_counter()
+        with pytest.raises(WorkerError, match="FileNotFoundError"):
+            check_sharded(proxies, "socks5", processes=2, judges=local_judge,
+                          initializer=os.chdir, initargs=("/nonexistent/dir",))
+        assert time.perf_counter() - started < 10
@@ -0,0 +1,32 @@
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import socks
+
+import proxy_checker_core
+from fake_proxies import FakeProxyFarm
+from judges import JudgePool
+from proxy_checker_core import check_proxy
+
+
+@patch("proxy_checker_core.save_to_database")
+@patch("proxy_checker_core.get_country_by_ip", return_value="Localland")
+def test_concurrent_socks_checks_do_not_cross_talk(mock_country, mock_save, monkeypatch):
+    monkeypatch.setattr(proxy_checker_core, "judge_pool", JudgePool(["http://judge.test/get"]))
+    original_socket = socket.socket
+    with FakeProxyFarm() as farm:
+        stubs = [(stub, "socks4") for stub in farm.add("socks4", count=40)]
+        stubs += [(stub, "socks5") for stub in farm.add("socks5", count=40)]
+        with ThreadPoolExecutor(max_workers=len(stubs)) as executor:
+            results = list(executor.map(lambda item: check_proxy(item[0].address, item[1]), stubs))
+
+        # Каждый stub-сервер получил ровно одно своё соединение
+        for (stub, _), result in zip(stubs, results):
+            assert result.startswith(f"{stub.address} is working | Country: Localland | Latency: ")
+            assert stub.connections == 1
+            assert stub.requests == ["judge.test:80"]
+
+    # Глобальное состояние сокетов не изменилось
+    assert socket.socket is original_socket
+    assert socks.get_default_proxy() is None